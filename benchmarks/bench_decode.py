@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Decode microbenchmark: raw-string handling vs. decoding once into CaptionEvent objects.
+
+The baseline mirrors the current consumers: every frame arrives as a string and
+each of CONSUMERS services parses it with json.loads on its own. The decoder
+paths parse each frame once into __slots__ events, with stdlib json, with orjson
+(if installed), and with a type subscription that skips partial transcripts.
+
+Usage:
+    python benchmarks/bench_decode.py [--frames 200000] [--consumers 3] [--json]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lingopal_ws_client import events  # noqa: E402
+from lingopal_ws_client.events import EventDecoder  # noqa: E402
+
+
+def make_frames(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    words = "the quick brown fox jumps over the lazy dog while the crowd cheers loudly".split()
+    frames = []
+    for i in range(count):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(4, 16)))
+        roll = rng.random()
+        payload = {"segment_id": i, "start": i * 0.5, "end": i * 0.5 + 0.5,
+                   "timestamp": 1700000000.0 + i * 0.5, "speaker": "S1"}
+        if roll < 0.7:
+            payload.update(type="partial_transcript", text=text, language="en")
+        elif roll < 0.9:
+            payload.update(type="final_transcript", text=text, language="en")
+        else:
+            payload.update(type="translation", text=text, language="es", source_language="en")
+        frames.append(json.dumps(payload))
+    return frames
+
+
+def bench_string_path(frames, consumers):
+    start = time.perf_counter()
+    for frame in frames:
+        for _ in range(consumers):
+            data = json.loads(frame)
+            data.get("text")
+    return time.perf_counter() - start
+
+
+def bench_decoder(frames, decoder):
+    decode = decoder.decode
+    start = time.perf_counter()
+    for frame in frames:
+        decode("stream", frame)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Caption event decode microbenchmark")
+    parser.add_argument("--frames", type=int, default=200_000)
+    parser.add_argument("--consumers", type=int, default=3,
+                        help="Number of consumers re-parsing each frame in the baseline")
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    args = parser.parse_args()
+
+    frames = make_frames(args.frames)
+    cases = [("string path (json.loads x%d)" % args.consumers,
+              lambda: bench_string_path(frames, args.consumers))]
+    cases.append(("decode once (json)",
+                  lambda: bench_decoder(frames, EventDecoder(json_loads=json.loads))))
+    if events.orjson is not None:
+        cases.append(("decode once (orjson)",
+                      lambda: bench_decoder(frames, EventDecoder(json_loads=events.orjson.loads))))
+    cases.append(("decode once, finals+translations only (%s)" % events.JSON_BACKEND,
+                  lambda: bench_decoder(frames, EventDecoder(types=["final_transcript", "translation"]))))
+    cases.append(("decode once, text field only (%s)" % events.JSON_BACKEND,
+                  lambda: bench_decoder(frames, EventDecoder(fields=["text"]))))
+
+    results = []
+    baseline = None
+    for name, run in cases:
+        elapsed = run()
+        rate = len(frames) / elapsed
+        baseline = baseline or rate
+        results.append({"case": name, "seconds": round(elapsed, 4),
+                        "events_per_sec": round(rate), "speedup": round(rate / baseline, 2)})
+
+    if args.json:
+        print(json.dumps({"benchmark": "decode", "frames": len(frames), "results": results}, indent=2))
+        return
+    print(f"{len(frames)} frames")
+    for r in results:
+        print(f"  {r['case']:<50} {r['events_per_sec']:>10,} events/s  x{r['speedup']}")
+
+
+if __name__ == "__main__":
+    main()
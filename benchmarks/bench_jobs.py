@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Job-pipeline load test: transcription clients against benchmarks/mock_api.py.
+
+Starts the mock job API in a subprocess for each client, so server work does
+not count towards client CPU, then runs ``--jobs`` transcriptions with
+``--concurrency`` in flight: upload, wait for completion, download the
+results. The async client is ``AsyncTranscribeTranslateClient``; the sync one
+is the example ``TranscribeTranslateClient`` driven from a thread pool.
+
+Reported per client:
+- jobs/hour
+- poll overhead: status polls per job, and the lag between a job finishing
+  on the server and the client noticing
+- API requests per job
+- download throughput
+- client CPU per job
+
+Usage:
+    python benchmarks/bench_jobs.py --jobs 200 --concurrency 50 --job-seconds 3
+    python benchmarks/bench_jobs.py --client async --latency 0.02 --error-rate 0.02 --json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "examples" / "translation_transcription_examples"))
+
+STATUS_ENDPOINT = "/api/v1/jobs/{id}/status"
+
+
+def percentile(sorted_values, q: float):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def _start_server(args) -> tuple:
+    server = subprocess.Popen(
+        [sys.executable, str(Path(__file__).with_name("mock_api.py")), "--port", "0",
+         "--job-seconds", str(args.job_seconds), "--job-jitter", str(args.job_jitter),
+         "--job-failure-rate", str(args.job_failure_rate), "--latency", str(args.latency),
+         "--error-rate", str(args.error_rate), "--result-bytes", str(args.result_bytes)],
+        stdout=subprocess.PIPE, text=True)
+    line = server.stdout.readline()
+    if not line.startswith("Mock job API on "):
+        server.kill()
+        raise RuntimeError(f"Mock API did not start: {line!r}")
+    return server, line.split()[-1]
+
+
+def _server_stats(base_url: str) -> dict:
+    import httpx
+    return httpx.get(f"{base_url}/_stats", timeout=30).json()
+
+
+async def _run_async(base_url: str, audio: str, output_dir: str, args) -> list:
+    from lingopal_ws_client.jobs import AsyncTranscribeTranslateClient
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(client) -> dict:
+        async with semaphore:
+            record = {"job_id": None, "ok": False, "detected": None, "download_seconds": 0.0, "bytes": 0}
+            try:
+                record["job_id"] = await client.start_transcription(audio_file_path=audio)
+                ok = await client.wait_for_job_completion(record["job_id"], "transcription", args.timeout)
+                record["detected"] = time.time()
+                if ok:
+                    started = time.perf_counter()
+                    files = await client.download_job_results(record["job_id"], output_dir)
+                    record["download_seconds"] = time.perf_counter() - started
+                    record["bytes"] = sum(os.path.getsize(path) for path in files.values())
+                    record["ok"] = bool(files)
+            except Exception as e:
+                record["error"] = repr(e)
+            return record
+
+    async with AsyncTranscribeTranslateClient(base_url, "bench") as client:
+        return list(await asyncio.gather(*(one(client) for _ in range(args.jobs))))
+
+
+def _run_sync(base_url: str, audio: str, output_dir: str, args) -> list:
+    from transcribe_and_translate import TranscribeTranslateClient
+
+    client = TranscribeTranslateClient(base_url, "bench")
+
+    def one(_) -> dict:
+        record = {"job_id": None, "ok": False, "detected": None, "download_seconds": 0.0, "bytes": 0}
+        try:
+            record["job_id"] = client.start_transcription(audio_file_path=audio)
+            ok = client.wait_for_job_completion(record["job_id"], "transcription", args.timeout)
+            record["detected"] = time.time()
+            if ok:
+                started = time.perf_counter()
+                files = client.download_job_results(record["job_id"], output_dir)
+                record["download_seconds"] = time.perf_counter() - started
+                record["bytes"] = sum(os.path.getsize(path) for path in files.values())
+                record["ok"] = bool(files)
+        except Exception as e:
+            record["error"] = repr(e)
+        return record
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        return list(executor.map(one, range(args.jobs)))
+
+
+def run_client(name: str, args, audio: str) -> dict:
+    server, base_url = _start_server(args)
+    try:
+        with tempfile.TemporaryDirectory(prefix="lingopal-bench-jobs-") as output_dir:
+            cpu_start = time.process_time()
+            wall_start = time.perf_counter()
+            # The sync example client narrates every step on stdout
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                if name == "async":
+                    records = asyncio.run(_run_async(base_url, audio, output_dir, args))
+                else:
+                    records = _run_sync(base_url, audio, output_dir, args)
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+        stats = _server_stats(base_url)
+    finally:
+        server.terminate()
+        server.wait()
+
+    done_at = {job["job_id"]: job["done_at"] for job in stats["jobs"]}
+    lags = sorted(r["detected"] - done_at[r["job_id"]] for r in records
+                  if r["detected"] is not None and r["job_id"] in done_at)
+    ok = [r for r in records if r["ok"]]
+    downloaded = sum(r["bytes"] for r in ok)
+    download_seconds = sum(r["download_seconds"] for r in ok)
+    requests = stats["requests"]
+    api_requests = sum(count for endpoint, count in requests.items() if endpoint.startswith("/api/"))
+    errors = sorted({r["error"] for r in records if "error" in r})
+    return {
+        "client": name,
+        "jobs": args.jobs,
+        "completed": len(ok),
+        "failed": len(records) - len(ok),
+        "seconds": round(wall, 3),
+        "jobs_per_hour": round(len(ok) / wall * 3600) if wall else None,
+        "status_polls_per_job": round(requests.get(STATUS_ENDPOINT, 0) / args.jobs, 2),
+        "api_requests_per_job": round(api_requests / args.jobs, 2),
+        # Time from a job finishing on the server to the client noticing
+        "completion_lag_p50_s": round(percentile(lags, 0.5), 3) if lags else None,
+        "completion_lag_p95_s": round(percentile(lags, 0.95), 3) if lags else None,
+        "download_mb": round(downloaded / 1e6, 2),
+        "download_mb_per_sec": round(downloaded / download_seconds / 1e6, 2) if download_seconds else None,
+        "cpu_ms_per_job": round(cpu / args.jobs * 1000, 2),
+        "errors": errors[:5],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Job pipeline load test against the mock API")
+    parser.add_argument("--client", choices=["async", "sync", "both"], default="both")
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--job-seconds", type=float, default=3.0, help="Mean server-side job duration")
+    parser.add_argument("--job-jitter", type=float, default=0.5)
+    parser.add_argument("--job-failure-rate", type=float, default=0.0)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of API requests answered with 503")
+    parser.add_argument("--result-bytes", type=int, default=256 << 10, help="Size of each result artifact")
+    parser.add_argument("--audio-bytes", type=int, default=256 << 10, help="Size of the uploaded audio file")
+    parser.add_argument("--timeout", type=int, default=10, help="Per-job timeout in minutes")
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    args = parser.parse_args()
+    # Retry warnings from injected errors would drown the report
+    logging.getLogger("lingopal_ws_client").setLevel(logging.ERROR)
+
+    clients = ["async", "sync"] if args.client == "both" else [args.client]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        audio = os.path.join(tmp, "bench.mp3")
+        with open(audio, "wb") as f:
+            f.write(os.urandom(args.audio_bytes))
+        for name in clients:
+            print(f"running {name} client ...", file=sys.stderr, flush=True)
+            results.append(run_client(name, args, audio))
+
+    if args.json:
+        print(json.dumps({"benchmark": "jobs", "config": vars(args), "results": results}, indent=2))
+        return
+    print(f"{args.jobs} jobs, concurrency {args.concurrency}, job time {args.job_seconds}s "
+          f"(+/-{args.job_jitter:.0%}), latency {args.latency}s, error rate {args.error_rate}")
+    for r in results:
+        print(f"  {r['client']:<6} {r['completed']:>4}/{r['jobs']} ok  {r['jobs_per_hour']:>8,} jobs/h  "
+              f"{r['status_polls_per_job']:>5} polls/job  lag p50 {r['completion_lag_p50_s']}s "
+              f"p95 {r['completion_lag_p95_s']}s  {r['api_requests_per_job']} req/job  "
+              f"download {r['download_mb_per_sec']} MB/s  cpu {r['cpu_ms_per_job']} ms/job")
+        for error in r["errors"]:
+            print(f"         error: {error}")
+
+
+if __name__ == "__main__":
+    main()
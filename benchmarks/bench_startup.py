@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for the ``lingopal`` command and the example scripts.
+
+Every scenario is a fresh interpreter, as in cron jobs and serverless
+wrappers that start one process per operation. Reported per scenario:
+median wall time over ``--repeat`` runs, and total import time from
+``python -X importtime``, with the slowest top-level imports.
+
+Two checks guard the lazy imports:
+
+- each scenario lists modules it must not load, e.g. ``lingopal --help`` must
+  not import httpx, websockets or requests. A violation fails the run;
+- with ``--baseline``, import time may not grow by more than ``--tolerance``.
+
+Usage:
+    python benchmarks/bench_startup.py --output startup.json
+    python benchmarks/bench_startup.py --baseline startup.json --tolerance 0.3
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+EXAMPLES = ROOT / "examples"
+JOB_EXAMPLES = EXAMPLES / "translation_transcription_examples"
+
+HEAVY = ("httpx", "websockets", "requests", "dotenv")
+
+# name -> (interpreter arguments, modules that must not be imported)
+SCENARIOS = {
+    "python (no imports)": (["-c", "pass"], ()),
+    "lingopal --help": (["-m", "lingopal_ws_client", "--help"], HEAVY + ("lingopal_ws_client.jobs",)),
+    "lingopal listen --help": (["-m", "lingopal_ws_client", "listen", "--help"], ("httpx", "requests")),
+    "lingopal stream --help": (["-m", "lingopal_ws_client", "stream", "--help"],
+                               ("websockets", "requests", "lingopal_ws_client.jobs")),
+    "lingopal transcribe --help": (["-m", "lingopal_ws_client", "transcribe", "--help"], ("websockets", "requests")),
+    "lingopal batch --help": (["-m", "lingopal_ws_client", "batch", "--help"], ("websockets", "requests")),
+    "schedule_stream.py --help": ([str(EXAMPLES / "schedule_stream.py"), "--help"], ("httpx", "websockets")),
+    "import transcribe_and_translate": (
+        ["-c", f"import sys; sys.path.insert(0, {str(JOB_EXAMPLES)!r}); import transcribe_and_translate"],
+        ("httpx", "requests", "dotenv", "lingopal_ws_client")),
+}
+
+
+def _run(arguments: list, importtime: bool = False) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])))
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + arguments
+    return subprocess.run(command, capture_output=True, text=True, env=env, cwd=ROOT)
+
+
+def parse_importtime(stderr: str) -> list:
+    """(module, self us, cumulative us, depth) per line of ``-X importtime`` output."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), int(fields[0]), int(fields[1]), depth))
+    return imports
+
+
+def run_scenario(name: str, arguments: list, forbidden: tuple, repeat: int) -> dict:
+    walls = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        _run(arguments)
+        walls.append((time.perf_counter() - started) * 1000)
+    imports = parse_importtime(_run(arguments, importtime=True).stderr)
+    modules = {module for module, _, _, _ in imports}
+    top = sorted((i for i in imports if i[3] == 0), key=lambda i: -i[2])[:5]
+    return {
+        "name": name,
+        "wall_ms": round(statistics.median(walls), 1),
+        "import_ms": round(sum(i[1] for i in imports) / 1000, 1),
+        "modules": len(modules),
+        "slowest_imports": {module: round(cumulative / 1000, 1) for module, _, cumulative, _ in top},
+        "forbidden_imported": sorted(m for m in forbidden if m in modules),
+    }
+
+
+def compare(results: list, baseline_path: str, tolerance: float) -> list:
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        before = baseline.get(result["name"])
+        if not before or not before.get("import_ms"):
+            continue
+        change = result["import_ms"] / before["import_ms"] - 1
+        result["import_ms_change"] = round(change, 3)
+        if change > tolerance:
+            regressions.append(result["name"])
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time of the lingopal command and example scripts")
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per scenario for the wall time median")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), metavar="NAME",
+                        help="Run only these scenarios (default: all)")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    parser.add_argument("--baseline", help="Previous results JSON to compare import time against")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="Allowed import time growth versus the baseline (fraction)")
+    args = parser.parse_args()
+
+    results = []
+    for name in args.scenarios or SCENARIOS:
+        arguments, forbidden = SCENARIOS[name]
+        result = run_scenario(name, arguments, forbidden, args.repeat)
+        results.append(result)
+        slowest = ", ".join(f"{module} {ms}" for module, ms in list(result["slowest_imports"].items())[:3])
+        print(f"{name:<34} {result['wall_ms']:>7} ms wall  {result['import_ms']:>7} ms imports  "
+              f"{result['modules']:>4} modules  ({slowest})", file=sys.stderr)
+
+    regressions = compare(results, args.baseline, args.tolerance) if args.baseline else []
+    violations = {r["name"]: r["forbidden_imported"] for r in results if r["forbidden_imported"]}
+    report = {
+        "benchmark": "startup",
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": results,
+        "regressions": regressions,
+        "violations": violations,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if violations:
+        print(f"❌ Heavy modules imported eagerly: {violations}", file=sys.stderr)
+    if regressions:
+        print(f"❌ Import time grew by more than {args.tolerance:.0%}: {regressions}", file=sys.stderr)
+    if violations or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
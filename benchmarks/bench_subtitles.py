@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Subtitle parsing microbenchmark: naive line-by-line parser vs. lingopal_ws_client.subtitles.
+
+The naive parser is what one would write ad hoc: read the whole file, split it
+into blocks, regex every timestamp and keep a dict per cue. It is compared with
+the streaming parser loading into array-backed ``Cues`` and with a streaming
+SRT -> VTT conversion that never materialises the cues. Reported per case:
+time, cues/sec and peak traced memory.
+
+Usage:
+    python benchmarks/bench_subtitles.py [--cues 200000] [--json]
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lingopal_ws_client import subtitles  # noqa: E402
+
+NAIVE_TIMING = re.compile(r"(\d+):(\d+):(\d+),(\d+)\s*-->\s*(\d+):(\d+):(\d+),(\d+)")
+
+
+def make_srt(path: str, count: int, seed: int = 0):
+    rng = random.Random(seed)
+    words = "the quick brown fox jumps over the lazy dog while the crowd cheers loudly".split()
+    with open(path, "w", encoding="utf-8") as f:
+        subtitles.write_srt((subtitles.Cue(i * 2000, i * 2000 + 1800,
+                                           " ".join(rng.choice(words) for _ in range(rng.randint(4, 12))))
+                             for i in range(count)), f)
+
+
+def naive_parse(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    cues = []
+    for block in content.strip().split("\n\n"):
+        lines = block.split("\n")
+        match = NAIVE_TIMING.search(lines[1])
+        h1, m1, s1, ms1, h2, m2, s2, ms2 = map(int, match.groups())
+        cues.append({"index": int(lines[0]),
+                     "start": ((h1 * 60 + m1) * 60 + s1) * 1000 + ms1,
+                     "end": ((h2 * 60 + m2) * 60 + s2) * 1000 + ms2,
+                     "text": "\n".join(lines[2:])})
+    return cues
+
+
+def measure(run):
+    # Time and memory are separate runs: tracemalloc slows allocation-heavy code severalfold
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Subtitle parsing microbenchmark")
+    parser.add_argument("--cues", type=int, default=200_000)
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        srt = os.path.join(tmp, "bench.srt")
+        make_srt(srt, args.cues)
+        size = os.path.getsize(srt)
+        cases = [
+            ("naive (read all, dict per cue)", lambda: naive_parse(srt)),
+            ("streaming parser -> Cues", lambda: subtitles.load(srt)),
+            ("streaming SRT -> VTT conversion", lambda: subtitles.convert(srt, os.path.join(tmp, "bench.vtt"))),
+        ]
+        results = []
+        baseline = None
+        for name, run in cases:
+            elapsed, peak = measure(run)
+            rate = args.cues / elapsed
+            baseline = baseline or rate
+            results.append({"case": name, "seconds": round(elapsed, 4), "cues_per_sec": round(rate),
+                            "speedup": round(rate / baseline, 2), "peak_mb": round(peak / 1e6, 1)})
+
+    if args.json:
+        print(json.dumps({"benchmark": "subtitles", "cues": args.cues, "file_mb": round(size / 1e6, 1),
+                          "results": results}, indent=2))
+        return
+    print(f"{args.cues} cues ({size / 1e6:.1f} MB SRT)")
+    for r in results:
+        print(f"  {r['case']:<35} {r['cues_per_sec']:>10,} cues/s  x{r['speedup']:<5} peak {r['peak_mb']} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+WebSocket client benchmark suite.
+
+Starts benchmarks/mock_server.py in a subprocess for every scenario and drives
+the client from a second subprocess, so server work and earlier scenarios do
+not skew CPU and RSS. The sweep varies message size (single stream through
+``connect_to_server``), message rate and stream count (``StreamPool``), plus one
+``StreamPool`` + ``EventDecoder`` run.
+
+Reported per scenario: msgs/sec, p50/p99 handling latency (server send to the
+end of the client callback), client CPU microseconds per message, and peak RSS.
+
+Usage:
+    python benchmarks/bench_ws.py --output results.json
+    python benchmarks/bench_ws.py --baseline results.json --tolerance 0.15
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from array import array
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+
+def scenario_name(scenario: dict) -> str:
+    return (f"{scenario['client']} size={scenario['size']} rate={scenario['rate']} "
+            f"streams={scenario['streams']} messages={scenario['messages']}")
+
+
+def build_scenarios(args) -> list:
+    scenarios = []
+    rates = [int(rate) if rate == int(rate) else rate for rate in args.rates]
+    for size in args.sizes:
+        scenarios.append({"client": "connect_to_server", "size": size, "rate": 0,
+                          "streams": 1, "messages": args.messages})
+    for rate in rates:
+        messages = max(1, int(rate * args.duration)) if rate else args.messages
+        scenarios.append({"client": "pool", "size": args.base_size, "rate": rate,
+                          "streams": args.rate_streams, "messages": messages})
+    for streams in args.streams:
+        scenarios.append({"client": "pool", "size": args.base_size, "rate": 0,
+                          "streams": streams, "messages": args.messages_per_stream})
+    scenarios.append({"client": "pool+decode", "size": args.base_size, "rate": 0,
+                      "streams": args.rate_streams, "messages": args.messages_per_stream})
+    return scenarios
+
+
+def percentile(sorted_values, q: float):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[index]
+
+
+# Client side (runs in a child process)
+
+async def _drive(scenario: dict, base_url: str, on_message):
+    from lingopal_ws_client.client import connect_to_server
+    from lingopal_ws_client.pool import StreamPool
+
+    if scenario["client"] == "connect_to_server":
+        await connect_to_server("bench-0", "bench", base_url, on_message=on_message)
+        return
+    async with StreamPool("bench", base_url, on_message=on_message, reconnect=None) as pool:
+        pool.add_streams(f"bench-{i}" for i in range(scenario["streams"]))
+        await pool.wait()
+
+
+def run_scenario(scenario: dict, base_url: str) -> dict:
+    from mock_server import sent_ns
+
+    latencies = array("q")
+    record = latencies.append
+    span = [0, 0]  # first and last receive time (ns)
+
+    def on_raw(message):
+        now = time.time_ns()
+        if not span[0]:
+            span[0] = now
+        span[1] = now
+        record(now - sent_ns(message))
+
+    if scenario["client"] == "pool+decode":
+        from lingopal_ws_client.events import EventDecoder
+        decode = EventDecoder().decode
+
+        def on_message(stream_id, message):
+            decode(stream_id, message)
+            on_raw(message)
+    else:
+        def on_message(stream_id, message):
+            on_raw(message)
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        asyncio.run(_drive(scenario, base_url, on_message))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    count = len(latencies)
+    ordered = sorted(latencies)
+    p50, p99 = percentile(ordered, 0.5), percentile(ordered, 0.99)
+    return {
+        "name": scenario_name(scenario),
+        **scenario,
+        "received": count,
+        "expected": scenario["streams"] * scenario["messages"],
+        "seconds": round(wall, 4),
+        # Throughput over the receive window, excluding process start and handshakes
+        "msgs_per_sec": round(count / ((span[1] - span[0]) / 1e9), 1) if count > 1 and span[1] > span[0] else None,
+        "p50_latency_ms": round(p50 / 1e6, 3) if p50 is not None else None,
+        "p99_latency_ms": round(p99 / 1e6, 3) if p99 is not None else None,
+        "cpu_us_per_msg": round(cpu / count * 1e6, 2) if count else None,
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                             / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1),
+    }
+
+
+# Orchestration (parent process)
+
+def _start_server(scenario: dict, port: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, str(Path(__file__).with_name("mock_server.py")), "--port", str(port),
+         "--size", str(scenario["size"]), "--rate", str(scenario["rate"]),
+         "--messages", str(scenario["messages"])],
+        stdout=subprocess.PIPE, text=True)
+    line = server.stdout.readline()
+    if not line:
+        server.kill()
+        raise RuntimeError("Mock server failed to start")
+    return server
+
+
+def run_in_subprocess(scenario: dict, port: int) -> dict:
+    server = _start_server(scenario, port)
+    try:
+        base_url = f"ws://127.0.0.1:{port}/v1/live/transcription"
+        output = subprocess.run(
+            [sys.executable, __file__, "--run-scenario", json.dumps(scenario), "--base-url", base_url],
+            check=True, capture_output=True, text=True).stdout
+        return json.loads(output.strip().splitlines()[-1])
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def client_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version("lingopal-ws-client")
+    except Exception:
+        return "unknown"
+
+
+def compare(results: list, baseline_path: str, tolerance: float) -> list:
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        before = baseline.get(result["name"])
+        if not before or not before.get("msgs_per_sec") or not result.get("msgs_per_sec"):
+            continue
+        change = result["msgs_per_sec"] / before["msgs_per_sec"] - 1
+        result["msgs_per_sec_change"] = round(change, 3)
+        if change < -tolerance:
+            regressions.append(result["name"])
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Lingopal WebSocket client against a local mock server")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--rates", type=float, nargs="+", default=[100, 1000, 0],
+                        help="Frames/sec per stream for the rate sweep (0 = max)")
+    parser.add_argument("--streams", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--base-size", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=5000, help="Frames per stream for the size sweep")
+    parser.add_argument("--messages-per-stream", type=int, default=500)
+    parser.add_argument("--rate-streams", type=int, default=10, help="Stream count for the rate sweep")
+    parser.add_argument("--duration", type=float, default=2.0, help="Seconds per rate-limited scenario")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    parser.add_argument("--baseline", help="Previous results JSON to compare msgs/sec against")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Allowed msgs/sec drop versus the baseline (fraction)")
+    parser.add_argument("--run-scenario", help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_scenario:
+        print(json.dumps(run_scenario(json.loads(args.run_scenario), args.base_url)))
+        return
+
+    results = []
+    for scenario in build_scenarios(args):
+        result = run_in_subprocess(scenario, args.port)
+        results.append(result)
+        shown = {key: "-" if value is None else value for key, value in result.items()}
+        print(f"{shown['name']:<75} {shown['msgs_per_sec']:>10} msg/s  "
+              f"p50 {shown['p50_latency_ms']} ms  p99 {shown['p99_latency_ms']} ms  "
+              f"{shown['cpu_us_per_msg']} us/msg  {shown['peak_rss_mb']} MB", file=sys.stderr)
+
+    regressions = compare(results, args.baseline, args.tolerance) if args.baseline else []
+    report = {
+        "benchmark": "websocket_client",
+        "meta": {
+            "client_version": client_version(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": results,
+        "regressions": regressions,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if regressions:
+        print(f"❌ msgs/sec regressed by more than {args.tolerance:.0%}: {regressions}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
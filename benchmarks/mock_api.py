@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the Lingopal job API, for local testing and load tests.
+
+Implements the job endpoints of ``TranscribeTranslateClient`` /
+``AsyncTranscribeTranslateClient`` and the resumable upload-session endpoints
+of ``lingopal_ws_client.uploads``::
+
+    POST /api/v1/transcribe             multipart file | form s3_presigned_url | form upload_id -> {"job_id"}
+    POST /api/v1/translate              multipart file | form s3_presigned_url, form languages   -> {"job_id"}
+    GET  /api/v1/jobs/<id>/status       -> {"job_id", "status", "progress", "message"}
+    GET  /api/v1/jobs/<id>/result       -> {"job_id", "status", "download_urls": {file type: url}}
+    GET  /files/<id>/<name>             result artifact (supports Range)
+    POST /api/v1/uploads                {"filename", "size"}   -> {"upload_id", "offset"}
+    PUT  /api/v1/uploads/<id>           Upload-Offset: <n>, body = chunk -> {"offset"}
+    GET  /api/v1/uploads/<id>           -> {"upload_id", "offset", "size", "complete"}
+    GET  /_stats                        request counters and per-job timings
+
+A job is "processing" for ``--job-seconds`` (+/- ``--job-jitter``), with
+progress rising linearly, then "completed", or "failed" for
+``--job-failure-rate`` of jobs. Transcriptions produce transcript (SRT), vtt
+and json artifacts and translations one SRT per language plus the original.
+Each artifact is ``--result-bytes`` long. Download URLs point back at this
+server.
+
+Fault injection:
+- ``--latency`` adds a delay to every response.
+- ``--error-rate`` answers that fraction of API requests with 503 and
+  ``Retry-After: 1``.
+- ``--chunk-failure-rate`` makes that fraction of chunk PUTs fail, half with
+  503 and half by dropping the connection after reading part of the body.
+
+Uploaded files and chunks are written straight to disk or discarded as they
+arrive, so memory stays flat. A PUT whose ``Upload-Offset`` does not match
+the bytes received so far gets 409 with the current offset.
+
+Usage:
+    python benchmarks/mock_api.py --port 8791 --job-seconds 5 --latency 0.02 --error-rate 0.01
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+COPY_BUFFER = 1 << 16
+UPLOAD_PATH = re.compile(r"^/api/v1/uploads/([\w-]+)$")
+JOB_PATH = re.compile(r"^/api/v1/jobs/([\w-]+)/(status|result)$")
+FILE_PATH = re.compile(r"^/files/([\w-]+)/([\w.-]+)$")
+RANGE = re.compile(r"^bytes=(\d+)-(\d*)$")
+TRANSCRIPTION_ARTIFACTS = {"transcript": ".srt", "vtt": ".vtt", "json": ".json"}
+# Small multipart fields (languages, s3_presigned_url) are parsed; file parts are only counted
+MULTIPART_FIELD = re.compile(rb'name="(\w+)"\r\n\r\n([^\r]*)\r\n')
+
+
+def make_artifact(size: int) -> bytes:
+    """An SRT-looking payload of ``size`` bytes."""
+    block = b"1\n00:00:01,000 --> 00:00:02,500\nThe quick brown fox jumps over the lazy dog.\n\n"
+    return (block * (size // len(block) + 1))[:size]
+
+
+class MockAPIState:
+    def __init__(self, directory: str, chunk_failure_rate: float = 0.0, *, job_seconds: float = 2.0,
+                 job_jitter: float = 0.5, job_failure_rate: float = 0.0, latency: float = 0.0,
+                 error_rate: float = 0.0, result_bytes: int = 64 << 10, seed: int = None):
+        self.directory = directory
+        self.chunk_failure_rate = chunk_failure_rate
+        self.job_seconds = job_seconds
+        self.job_jitter = job_jitter
+        self.job_failure_rate = job_failure_rate
+        self.latency = latency
+        self.error_rate = error_rate
+        self.artifact = make_artifact(result_bytes)
+        self.random = random.Random(seed)  # injected failures and job durations
+        self.uploads = {}
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.chunk_failures = 0
+        self.requests = Counter()  # endpoint -> count
+        self.bytes_received = 0
+        self.bytes_served = 0
+
+    def create_job(self, job_type: str, languages=()) -> str:
+        job_id = str(uuid.uuid4())
+        duration = max(0.0, self.job_seconds * (1 + self.random.uniform(-self.job_jitter, self.job_jitter)))
+        with self.lock:
+            self.jobs[job_id] = {"type": job_type, "created": time.time(), "duration": duration,
+                                 "failed": self.random.random() < self.job_failure_rate,
+                                 "languages": list(languages)}
+        return job_id
+
+    def job_status(self, job_id: str) -> dict:
+        job = self.jobs[job_id]
+        elapsed = time.time() - job["created"]
+        if elapsed < job["duration"]:
+            progress = int(100 * elapsed / job["duration"]) if job["duration"] else 100
+            return {"job_id": job_id, "status": "processing" if progress else "pending",
+                    "progress": progress, "message": f"{job['type']} in progress"}
+        if job["failed"]:
+            return {"job_id": job_id, "status": "failed", "progress": 100, "message": "Injected job failure"}
+        return {"job_id": job_id, "status": "completed", "progress": 100, "message": "Done"}
+
+    def artifacts(self, job_id: str) -> dict:
+        """File type -> file name of a finished job's results."""
+        job = self.jobs[job_id]
+        if job["type"] == "transcription":
+            return {file_type: file_type + extension for file_type, extension in TRANSCRIPTION_ARTIFACTS.items()}
+        return {**{language: f"{language}.srt" for language in job["languages"]}, "original": "original.srt"}
+
+    def stats(self) -> dict:
+        with self.lock:
+            jobs = [{"job_id": job_id, "type": job["type"], "created": job["created"],
+                     "done_at": job["created"] + job["duration"], "failed": job["failed"]}
+                    for job_id, job in self.jobs.items()]
+            return {"requests": dict(self.requests), "bytes_received": self.bytes_received,
+                    "bytes_served": self.bytes_served, "chunk_failures": self.chunk_failures, "jobs": jobs}
+
+
+class MockAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state: MockAPIState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, status: int, body: dict, headers: dict = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self) -> bytes:
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.state.bytes_received += len(body)
+        return body
+
+    def _drain(self, length: int):
+        while length:
+            block = self.rfile.read(min(COPY_BUFFER, length))
+            if not block:
+                break
+            length -= len(block)
+            self.state.bytes_received += len(block)
+
+    def _form(self) -> dict:
+        """Form fields of a urlencoded, JSON or multipart body; file contents are read and dropped."""
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("multipart/form-data"):
+            length = int(self.headers.get("Content-Length") or 0)
+            # Fields come before the file part from both clients; only the head is kept
+            head = self.rfile.read(min(length, COPY_BUFFER))
+            self.state.bytes_received += len(head)
+            self._drain(length - len(head))
+            return {name.decode(): value.decode() for name, value in MULTIPART_FIELD.findall(head)
+                    if name != b"file"}
+        body = self._read_body().decode()
+        if content_type.startswith("application/json"):
+            return json.loads(body or "{}")
+        return {k: v[0] for k, v in parse_qs(body).items()}
+
+    def _begin(self, endpoint: str) -> bool:
+        """Count the request and apply latency and error injection; False if it was failed."""
+        with self.state.lock:
+            self.state.requests[endpoint] += 1
+        if self.state.latency:
+            time.sleep(self.state.latency)
+        if endpoint.startswith("/api/") and self.state.random.random() < self.state.error_rate:
+            self._drain(int(self.headers.get("Content-Length") or 0))
+            self._json(503, {"detail": "Injected error"}, {"Retry-After": "1"})
+            return False
+        return True
+
+    def do_POST(self):
+        if self.path == "/api/v1/uploads":
+            if not self._begin("/api/v1/uploads"):
+                return
+            request = json.loads(self._read_body() or b"{}")
+            upload_id = uuid.uuid4().hex
+            path = os.path.join(self.state.directory, upload_id)
+            open(path, "wb").close()
+            with self.state.lock:
+                self.state.uploads[upload_id] = {"path": path, "size": int(request["size"]),
+                                                 "filename": request.get("filename"), "offset": 0}
+            self._json(201, {"upload_id": upload_id, "offset": 0})
+        elif self.path == "/api/v1/transcribe":
+            if not self._begin("/api/v1/transcribe"):
+                return
+            form = self._form()
+            upload = self.state.uploads.get(form.get("upload_id"))
+            if form.get("upload_id") and (upload is None or upload["offset"] != upload["size"]):
+                self._json(400, {"detail": "Upload missing or incomplete"})
+                return
+            self._json(200, {"job_id": self.state.create_job("transcription")})
+        elif self.path == "/api/v1/translate":
+            if not self._begin("/api/v1/translate"):
+                return
+            form = self._form()
+            languages = [language for language in form.get("languages", "").split(",") if language]
+            if not languages:
+                self._json(422, {"detail": "languages is required"})
+                return
+            self._json(200, {"job_id": self.state.create_job("translation", languages)})
+        else:
+            self._drain(int(self.headers.get("Content-Length") or 0))
+            self._json(404, {"detail": "Not Found"})
+
+    def do_GET(self):
+        if self.path == "/_stats":
+            self._json(200, self.state.stats())
+            return
+        match = JOB_PATH.match(self.path)
+        if match:
+            self._job(*match.groups())
+            return
+        match = FILE_PATH.match(self.path)
+        if match:
+            self._file(*match.groups())
+            return
+        match = UPLOAD_PATH.match(self.path)
+        upload = self.state.uploads.get(match.group(1)) if match else None
+        if upload is None:
+            self._json(404, {"detail": "Not Found"})
+            return
+        if not self._begin("/api/v1/uploads"):
+            return
+        self._json(200, {"upload_id": match.group(1), "offset": upload["offset"], "size": upload["size"],
+                         "complete": upload["offset"] == upload["size"]})
+
+    def _job(self, job_id: str, action: str):
+        if not self._begin(f"/api/v1/jobs/{{id}}/{action}"):
+            return
+        if job_id not in self.state.jobs:
+            self._json(404, {"detail": "Job not found"})
+            return
+        status = self.state.job_status(job_id)
+        if action == "status":
+            self._json(200, status)
+        elif status["status"] != "completed":
+            self._json(400, {"detail": f"Job is {status['status']}"})
+        else:
+            base = f"http://{self.headers.get('Host')}"
+            self._json(200, {"job_id": job_id, "status": "completed",
+                             "download_urls": {file_type: f"{base}/files/{job_id}/{name}"
+                                               for file_type, name in self.state.artifacts(job_id).items()}})
+
+    def _file(self, job_id: str, name: str):
+        self._begin("/files")
+        if job_id not in self.state.jobs or name not in self.state.artifacts(job_id).values():
+            self._json(404, {"detail": "Not Found"})
+            return
+        data = self.state.artifact
+        start, end = 0, len(data)
+        match = RANGE.match(self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = min(end, int(match.group(2)) + 1) if match.group(2) else end
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(data)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(end - start))
+        self.end_headers()
+        view = memoryview(data)[start:end]
+        for offset in range(0, len(view), COPY_BUFFER):
+            self.wfile.write(view[offset:offset + COPY_BUFFER])
+        with self.state.lock:
+            self.state.bytes_served += end - start
+
+    def do_PUT(self):
+        match = UPLOAD_PATH.match(self.path)
+        upload = self.state.uploads.get(match.group(1)) if match else None
+        length = int(self.headers.get("Content-Length") or 0)
+        if upload is None:
+            self.rfile.read(length)
+            self._json(404, {"detail": "Not Found"})
+            return
+        with self.state.lock:
+            self.state.requests["/api/v1/uploads"] += 1
+        offset = int(self.headers.get("Upload-Offset", -1))
+        if offset != upload["offset"] or offset + length > upload["size"]:
+            self.rfile.read(length)
+            self._json(409, {"detail": "Offset mismatch", "offset": upload["offset"]})
+            return
+        failure = self.state.random.random() < self.state.chunk_failure_rate
+        if failure and self.state.random.random() < 0.5:
+            self.rfile.read(length)
+            self.state.chunk_failures += 1
+            self._json(503, {"detail": "Injected failure"})
+            return
+        # A dropped connection keeps whatever arrived before it, like a real server
+        to_read = length // 2 if failure else length
+        with open(upload["path"], "r+b") as f:
+            f.seek(offset)
+            while to_read:
+                block = self.rfile.read(min(COPY_BUFFER, to_read))
+                if not block:
+                    break
+                f.write(block)
+                to_read -= len(block)
+                upload["offset"] += len(block)
+        self.state.bytes_received += upload["offset"] - offset
+        if failure:
+            self.state.chunk_failures += 1
+            self.close_connection = True
+            self.connection.shutdown(2)
+            return
+        self._json(200, {"offset": upload["offset"]})
+
+
+class MockAPIServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8791, chunk_failure_rate: float = 0.0,
+                 directory: str = None, **job_options):
+        """
+        Args:
+            job_options: ``job_seconds``, ``job_jitter``, ``job_failure_rate``,
+                ``latency``, ``error_rate``, ``result_bytes`` and ``seed`` (see ``MockAPIState``)
+        """
+        self._tempdir = None
+        if directory is None:
+            directory = self._tempdir = tempfile.mkdtemp(prefix="lingopal-mock-api-")
+        self.state = MockAPIState(directory, chunk_failure_rate, **job_options)
+        handler = type("Handler", (MockAPIHandler,), {"state": self.state})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._tempdir:
+            shutil.rmtree(self._tempdir, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Lingopal job API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8791)
+    parser.add_argument("--job-seconds", type=float, default=2.0, help="Mean job processing time")
+    parser.add_argument("--job-jitter", type=float, default=0.5,
+                        help="Job times vary uniformly by this fraction of --job-seconds")
+    parser.add_argument("--job-failure-rate", type=float, default=0.0, help="Fraction of jobs that fail")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of API requests answered with 503 + Retry-After")
+    parser.add_argument("--result-bytes", type=int, default=64 << 10, help="Size of every result artifact")
+    parser.add_argument("--chunk-failure-rate", type=float, default=0.0,
+                        help="Fraction of upload chunk PUTs that fail")
+    parser.add_argument("--directory", help="Where uploads are stored (default: a temporary directory)")
+    args = parser.parse_args()
+    server = MockAPIServer(args.host, args.port, args.chunk_failure_rate, args.directory,
+                           job_seconds=args.job_seconds, job_jitter=args.job_jitter,
+                           job_failure_rate=args.job_failure_rate, latency=args.latency,
+                           error_rate=args.error_rate, result_bytes=args.result_bytes)
+    print(f"Mock job API on {server.base_url}", flush=True)
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
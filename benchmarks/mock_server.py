@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the Lingopal transcription WebSocket service, for benchmarks.
+
+Serves ``/v1/live/transcription/<stream_id>``: every connection receives
+``--messages`` synthetic caption frames of about ``--size`` bytes at ``--rate``
+frames per second (0 = as fast as the client reads), then a normal close.
+Frames start with the send time so clients can measure latency without
+parsing JSON::
+
+    {"sent_ns":1700000000000000000,"type":"final_transcript","seq":0,"text":"..."}
+
+Usage:
+    python benchmarks/mock_server.py --port 8790 --size 500 --rate 100 --messages 1000
+"""
+
+import argparse
+import asyncio
+import time
+
+import websockets
+
+PATH_PREFIX = "/v1/live/transcription/"
+SENT_PREFIX = '{"sent_ns":'
+
+
+def make_frame(seq: int, text: str) -> str:
+    return f'{SENT_PREFIX}{time.time_ns()},"type":"final_transcript","seq":{seq},"text":"{text}"}}'
+
+
+def sent_ns(frame: str) -> int:
+    """Extract the send timestamp from a frame made by make_frame."""
+    return int(frame[len(SENT_PREFIX):frame.index(",", len(SENT_PREFIX))])
+
+
+class MockTranscriptionServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8790, size: int = 200,
+                 rate: float = 0, messages: int = 1000):
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.messages = messages
+        overhead = len(make_frame(0, ""))
+        self.text = "x" * max(size - overhead, 0)
+        self.connections = 0
+        self._server = None
+
+    @property
+    def base_url(self) -> str:
+        return f"ws://{self.host}:{self.port}{PATH_PREFIX.rstrip('/')}"
+
+    async def _handler(self, websocket):
+        if not websocket.request.path.startswith(PATH_PREFIX):
+            await websocket.close(1008, "Unknown path")
+            return
+        self.connections += 1
+        started = time.monotonic()
+        text = self.text
+        try:
+            for seq in range(self.messages):
+                if self.rate:
+                    delay = started + seq / self.rate - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                await websocket.send(make_frame(seq, text))
+            await websocket.close(1000, "Done")
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    async def start(self):
+        self._server = await websockets.serve(self._handler, self.host, self.port,
+                                              max_queue=None, compression=None)
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+async def _serve(args):
+    async with MockTranscriptionServer(args.host, args.port, args.size, args.rate, args.messages) as server:
+        print(f"Mock transcription server on {server.base_url}/<stream_id>", flush=True)
+        await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Lingopal transcription WebSocket server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--size", type=int, default=200, help="Approximate frame size in bytes")
+    parser.add_argument("--rate", type=float, default=0, help="Frames per second per stream (0 = max)")
+    parser.add_argument("--messages", type=int, default=1000, help="Frames per connection")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import asyncio
+import logging
 import sys
 from lingopal_ws_client.client import connect_to_server
 
@@ -11,4 +12,7 @@ if __name__ == "__main__":
     api_key = sys.argv[2]
     env = sys.argv[3] if len(sys.argv) > 3 else "prod"
 
+    # Connection events are logged by the client
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     asyncio.run(connect_to_server(stream_id, api_key, env))
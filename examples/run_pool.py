@@ -0,0 +1,25 @@
+import asyncio
+import sys
+from lingopal_ws_client.pool import StreamPool
+
+
+def on_message(stream_id, message):
+    print(f"[{stream_id}] {message}")
+
+
+async def main(stream_ids, api_key, env):
+    async with StreamPool(api_key, env, on_message=on_message) as pool:
+        pool.add_streams(stream_ids)
+        await pool.wait()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python run_pool.py <stream_id>[,<stream_id>...] <api_key> [env]")
+        sys.exit(1)
+
+    stream_ids = [s for s in sys.argv[1].split(",") if s]
+    api_key = sys.argv[2]
+    env = sys.argv[3] if len(sys.argv) > 3 else "prod"
+
+    asyncio.run(main(stream_ids, api_key, env))
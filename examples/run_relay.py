@@ -0,0 +1,24 @@
+import asyncio
+import logging
+import sys
+from lingopal_ws_client.relay import Relay
+
+
+async def main(api_key, port, unix_path, env):
+    async with Relay(api_key, env, port=port, unix_path=unix_path) as relay:
+        await relay.serve_forever()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python run_relay.py <api_key> [port] [unix_socket_path] [env]")
+        sys.exit(1)
+
+    api_key = sys.argv[1]
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8770
+    unix_path = sys.argv[3] if len(sys.argv) > 3 else None
+    env = sys.argv[4] if len(sys.argv) > 4 else "prod"
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    asyncio.run(main(api_key, port, unix_path, env))
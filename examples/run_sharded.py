@@ -0,0 +1,29 @@
+import sys
+from lingopal_ws_client.shard import ShardSupervisor
+
+
+def on_message(stream_id, message):
+    print(f"[{stream_id}] {message}")
+
+
+def on_metrics(report):
+    print(f"Worker {report['worker']}: {report['streams']} streams, {report['messages']} messages, "
+          f"{report['cpu_seconds']:.1f}s CPU")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python run_sharded.py <stream_ids_file> <api_key> [workers] [env]")
+        sys.exit(1)
+
+    with open(sys.argv[1]) as f:
+        stream_ids = [line.strip() for line in f if line.strip()]
+    api_key = sys.argv[2]
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    env = sys.argv[4] if len(sys.argv) > 4 else "prod"
+
+    supervisor = ShardSupervisor(api_key, stream_ids, env, workers=workers)
+    try:
+        supervisor.run(on_message=on_message, on_metrics=on_metrics)
+    except KeyboardInterrupt:
+        pass
@@ -1,8 +1,17 @@
-import httpx
+"""
+Schedule one stream. For many streams at once use a manifest:
+    python -m lingopal_ws_client.streams schedule weekend.yaml
+"""
+
+import argparse
+import asyncio
 import json
 import os
-import argparse
-import sys
+
+# Full endpoint URL, as before; requests are posted to it unchanged. The client (and
+# httpx) is imported when the request is sent, so --help and argument errors stay fast.
+API_URL = os.getenv("LINGOPAL_API_URL", "https://streaming.lingopal.ai/v1/scheduled_streams")
+
 
 def parse_arguments():
     parser = argparse.ArgumentParser(
@@ -36,52 +45,34 @@ Examples:
     
     return parser.parse_args()
 
-# Get command line arguments
-args = parse_arguments()
+async def schedule_stream(api_key: str, args):
+    from lingopal_ws_client.streams import SCHEDULE, StreamsClient
 
-# Required environment variables
-API_KEY = os.getenv("LINGOPAL_API_KEY")
-API_URL = os.getenv("LINGOPAL_API_URL", "https://streaming.lingopal.ai/v1/scheduled_streams")
-
-# Check required environment variables
-if not API_KEY:
-    raise ValueError("❌ Please set the LINGOPAL_API_KEY environment variable.")
+    async with StreamsClient(api_key, API_URL, endpoints={SCHEDULE: ""}) as client:
+        return await client.schedule({
+            "ingest_url": args.ingest_url,
+            "channel_uuid": "string",
+            "scheduled_time": args.scheduled_time,
+            "timezone": args.timezone,
+        })
 
-# Payload for scheduling a stream
-payload = {
-    "ingest_url": args.ingest_url,
-    "vocals_track": "0",
-    "background_track": -1,
-    "mix": "-9,-6",
-    "enable_captions_708": False,
-    "enable_captions_608": False,
-    "dst_language": ["es"],
-    "src_language": "en",
-    "start_wowza": False,
-    "use_contextual_translation": False,
-    "lipsync": True,
-    "channel_uuid": "string",
-    "is_hls_stream": False,
-    "use_reserved_resources": False,
-    "stitching": False,
-    "voice_cloning": True,
-    "scheduled_time": args.scheduled_time,  
-    "timezone": args.timezone
-}
 
-headers = {
-    "Content-Type": "application/json",
-    "Accept": "application/json",
-    "X-API-Key": API_KEY
-}
+def main():
+    args = parse_arguments()
+    api_key = os.getenv("LINGOPAL_API_KEY")
+    if not api_key:
+        raise ValueError("❌ Please set the LINGOPAL_API_KEY environment variable.")
 
-if __name__ == "__main__":
-    response = httpx.post(API_URL, headers=headers, json=payload, timeout=30.0)
-    print(f"Request URL: {response.url}")
-    print(f"Status Code: {response.status_code}")
-    try:
+    result = asyncio.run(schedule_stream(api_key, args))
+    print(f"Request URL: {API_URL}")
+    print(f"Status Code: {result.status_code if result.status_code is not None else result.error}")
+    if isinstance(result.response, (dict, list)):
         print("Response:")
-        print(json.dumps(response.json(), indent=2))
-    except Exception:
+        print(json.dumps(result.response, indent=2))
+    else:
         print("Non-JSON response:")
-        print(response.text)
+        print(result.response)
+
+
+if __name__ == "__main__":
+    main()
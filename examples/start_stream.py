@@ -1,48 +1,42 @@
-import httpx
+"""
+Start one stream. For many streams at once use a manifest:
+    python -m lingopal_ws_client.streams start lineup.csv
+"""
+
+import asyncio
 import json
 import os
 
-# Required environment variables
-API_KEY = os.getenv("LINGOPAL_API_KEY")
-INGEST_URL = os.getenv("LINGOPAL_INGEST_URL")
+# Full endpoint URL, as before; requests are posted to it unchanged. The client (and
+# httpx) is imported when the request is sent, so --help and argument errors stay fast.
 API_URL = os.getenv("LINGOPAL_API_URL", "https://streaming.lingopal.ai/v1/streams/start")
 
-# Check required variables
-if not API_KEY:
-    raise ValueError("❌ Please set the LINGOPAL_API_KEY environment variable.")
-if not INGEST_URL:
-    raise ValueError("❌ Please set the LINGOPAL_INGEST_URL environment variable.")
-
-# Payload
-payload = {
-    "ingest_url": INGEST_URL,
-    "vocals_track": "0",
-    "background_track": 1,
-    "mix": "-9,-6",
-    "enable_captions_708": True,
-    "enable_captions_608": False,
-    "src_language": "en",
-    "dst_language": ["es"],
-    "use_paraphrasing_transcription": True,
-    "start_wowza": True,
-    "is_hls_stream": False,
-    "use_contextual_translation": False,
-    "lipsync": False
-}
-
-headers = {
-    "Content-Type": "application/json",
-    "Accept": "application/json",
-    "X-API-Key": API_KEY
-}
 
-if __name__ == "__main__":
-    response = httpx.post(API_URL, headers=headers, json=payload, timeout=30.0)
-    print(f"Request URL: {response.url}")
-    print(f"Status Code: {response.status_code}")
-    try:
+async def start_stream(api_key: str, ingest_url: str):
+    from lingopal_ws_client.streams import START, StreamsClient
+
+    async with StreamsClient(api_key, API_URL, endpoints={START: ""}) as client:
+        return await client.start({"ingest_url": ingest_url})
+
+
+def main():
+    api_key = os.getenv("LINGOPAL_API_KEY")
+    ingest_url = os.getenv("LINGOPAL_INGEST_URL")
+    if not api_key:
+        raise ValueError("❌ Please set the LINGOPAL_API_KEY environment variable.")
+    if not ingest_url:
+        raise ValueError("❌ Please set the LINGOPAL_INGEST_URL environment variable.")
+
+    result = asyncio.run(start_stream(api_key, ingest_url))
+    print(f"Request URL: {API_URL}")
+    print(f"Status Code: {result.status_code if result.status_code is not None else result.error}")
+    if isinstance(result.response, (dict, list)):
         print("Response:")
-        print(json.dumps(response.json(), indent=2))
-    except Exception:
+        print(json.dumps(result.response, indent=2))
+    else:
         print("Non-JSON response:")
-        print(response.text)
+        print(result.response)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,49 +4,185 @@ Transcribe and Translate Script
 This script calls the transcribe and translate API endpoints in sequence:
 1. Upload audio file and start transcription
 2. Wait for transcription to complete
-3. Download the SRT file
-4. Upload SRT file and start translation with 3 languages
-5. Wait for translation to complete
-6. Download the translated SRT files
+3. Start translation with 3 languages from the transcript's S3 URL
+   (the transcription results are downloaded in the background)
+4. Wait for translation to complete
+5. Download the translated SRT files
 """
 
-import requests
+import hashlib
+import importlib
 import json
 import time
 import os
+import random
 import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional, Dict, Any
-import urllib.request
-
-# Load environment variables from .env file
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-    print("✅ Loaded environment variables from .env file")
-except ImportError:
-    print("⚠️  python-dotenv not installed. Install with: pip install python-dotenv")
-except Exception as e:
-    print(f"⚠️  Could not load .env file: {e}")
+from typing import Optional, Dict, Any, List
+
+def load_env():
+    """Load environment variables from the .env file (called by main(), not on import)"""
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+        print("✅ Loaded environment variables from .env file")
+    except ImportError:
+        print("⚠️  python-dotenv not installed. Install with: pip install python-dotenv")
+    except Exception as e:
+        print(f"⚠️  Could not load .env file: {e}")
+
+def lingopal_module(name: str):
+    """
+    lingopal_ws_client.<name> if the package is installed, else None.
+
+    Imported on first use, so importing this script does not load the package (and httpx).
+    The package adds rate limiting, Retry-After handling, retries, a circuit breaker
+    and health verdicts shared with every other client in the process.
+    """
+    try:
+        return importlib.import_module(f'lingopal_ws_client.{name}')
+    except ImportError:
+        return None
+
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+# Keep-alive connections per host kept by the client's session (one per concurrent thread)
+POOL_CONNECTIONS = 32
+HEALTH_TTL = 30.0
+
+def result_file_extension(file_type: str, url: str) -> str:
+    """File extension for a result file, based on its type and URL"""
+    path = url.split('?', 1)[0]
+    if file_type in ['transcript', 'diarization'] or path.endswith('.srt'):
+        return '.srt'
+    elif file_type == 'vtt' or path.endswith('.vtt'):
+        return '.vtt'
+    elif file_type == 'json' or path.endswith('.json'):
+        return '.json'
+    elif file_type == 'original_audio' or path.endswith(('.mp3', '.wav', '.m4a')):
+        # Extract original file extension from URL
+        for extension in ['.mp3', '.wav', '.m4a']:
+            if extension in url:
+                return extension
+        return '.mp3'  # default
+    return '.txt'
+
+class StreamingMultipartFile:
+    """
+    multipart/form-data body that streams one file from disk.
+
+    requests would otherwise build the whole multipart body in memory; this
+    file-like object is read in small blocks while sending, so memory stays flat
+    for any file size, and upload progress and throughput are printed.
+    """
+    def __init__(self, file_path: str, field_name: str = 'file', content_type: str = 'application/octet-stream'):
+        self.boundary = uuid.uuid4().hex
+        filename = os.path.basename(file_path).replace('"', '')
+        self._head = (f'--{self.boundary}\r\n'
+                      f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
+                      f'Content-Type: {content_type}\r\n\r\n').encode()
+        self._tail = f'\r\n--{self.boundary}--\r\n'.encode()
+        self.file_size = os.path.getsize(file_path)
+        self._file = open(file_path, 'rb')
+        self._pending = self._head
+        self._sent = 0
+        self._reported = 0
+        self._started = time.time()
+
+    @property
+    def content_type(self) -> str:
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    def __len__(self) -> int:
+        return len(self._head) + self.file_size + len(self._tail)
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = len(self)
+        data = self._pending[:size]
+        self._pending = self._pending[size:]
+        if len(data) < size and self._file is not None:
+            block = self._file.read(size - len(data))
+            self._sent += len(block)
+            data += block
+            if not block:
+                self._file.close()
+                self._file = None
+                self._pending = self._tail
+                data += self.read(size - len(data))
+            self._report()
+        return data
+
+    def _report(self):
+        # Print roughly every 10% (and at the end)
+        if self._sent == self._reported or (self._sent - self._reported < self.file_size / 10
+                                            and self._sent < self.file_size):
+            return
+        self._reported = self._sent
+        elapsed = max(time.time() - self._started, 1e-6)
+        percent = 100 * self._sent / self.file_size if self.file_size else 100
+        print(f"   ⬆️  {percent:5.1f}% ({self._sent / 1e6:.1f} MB, {self._sent / elapsed / 1e6:.2f} MB/s)")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def next_poll_interval(elapsed: float, progress: float = 0, errors: int = 0,
+                       min_interval: float = 0.5, max_interval: float = 30.0) -> float:
+    """
+    Seconds until the next status poll.
+
+    Uses half of the remaining time estimated from the reported progress (or a
+    quarter of the elapsed time when there is none), backs off exponentially
+    after errors, and adds +/-20% jitter so concurrent jobs spread their polls.
+    """
+    if errors:
+        interval = 2.0 ** errors
+    elif 0 < progress < 100 and elapsed > 0:
+        interval = elapsed * (100 - progress) / progress / 2
+    else:
+        interval = max(1.0, elapsed / 4)
+    interval = min(max(interval, min_interval), max_interval)
+    return interval * random.uniform(0.8, 1.2)
 
 class TranscribeTranslateClient:
-    def __init__(self, api_base_url: str, api_key: Optional[str] = None):
+    def __init__(self, api_base_url: str, api_key: Optional[str] = None, transport_policy=None):
         """
         Initialize the client
         
         Args:
             api_base_url: Base URL of the API (e.g., "http://localhost:8000" or "https://your-api-domain.com")
             api_key: Optional API key for authentication
+            transport_policy: lingopal_ws_client.transport.TransportPolicy for API requests
+                (default: a new one if the package is installed, else plain requests)
         """
         self.api_base_url = api_base_url.rstrip('/')
         self.api_key = api_key
         self.headers = {}
+        self.transport_policy = transport_policy
+        transport = lingopal_module('transport') if transport_policy is None else None
+        if transport is not None:
+            self.transport_policy = transport.TransportPolicy()
+        # requests is imported here rather than at module level, so importing this
+        # script (or running it with bad arguments) does not pay for it
+        import requests
+
+        # One pooled session: polls and downloads reuse connections instead of a
+        # new TCP/TLS handshake per request
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=POOL_CONNECTIONS)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         
         if api_key:
             self.headers['X-API-Key'] = api_key
     
     def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         """Make HTTP request to the API"""
+        import requests
+
         url = f"{self.api_base_url}{endpoint}"
         
         # Add headers to kwargs
@@ -54,8 +190,30 @@ class TranscribeTranslateClient:
             kwargs['headers'] = {}
         kwargs['headers'].update(self.headers)
         
+        # File objects of a multipart upload are read to the end by each attempt:
+        # rewind them before a retry, or never retry when they cannot be rewound
+        files = kwargs.get('files') or {}
+        files = files.values() if isinstance(files, dict) else [value for _, value in files]
+        handles = [value[1] if isinstance(value, tuple) else value for value in files]
+        handles = [handle for handle in handles if hasattr(handle, 'read')]
+        replayable = (not isinstance(kwargs.get('data'), StreamingMultipartFile)
+                      and all(getattr(handle, 'seekable', lambda: False)() for handle in handles))
+        positions = [handle.tell() for handle in handles] if replayable else []
+
+        def send():
+            for handle, position in zip(handles, positions):
+                handle.seek(position)
+            return self.session.request(method, url, **kwargs)
+
         try:
-            response = requests.request(method, url, **kwargs)
+            if self.transport_policy is not None:
+                # A streamed upload body cannot be rewound, so it is never resent
+                response = self.transport_policy.send(
+                    send, method, replayable=replayable,
+                    errors=(requests.exceptions.ConnectionError, requests.exceptions.Timeout),
+                    connect_errors=(requests.exceptions.ConnectTimeout,))
+            else:
+                response = self.session.request(method, url, **kwargs)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -65,21 +223,50 @@ class TranscribeTranslateClient:
                 print(f"   Response: {e.response.text}")
             raise
     
-    def health_check(self) -> bool:
-        """Check if the API is accessible by testing a simple endpoint"""
+    def _probe_health(self) -> tuple:
+        """(healthy, status code or None, error or None) from one request for an unknown job"""
+        import requests
+
+        # There is no health endpoint: any response below 500 shows the API is up
+        # (an unknown job gives 404); 401/403 mean the API key is rejected
         try:
-            # Since there's no health endpoint in the new API spec, we'll test with a simple request
-            # that should return an error but confirms the API is reachable
-            response = self._make_request('GET', '/api/v1/jobs/invalid-job-id/status')
-            return False  # This should fail, but if it doesn't, something is wrong
-        except Exception as e:
-            # If we get a 404 or similar error, the API is reachable
-            if "404" in str(e) or "Not Found" in str(e):
-                print(f"✅ API is accessible")
-                return True
-            else:
-                print(f"❌ API health check failed: {e}")
-                return False
+            response = self.session.get(f"{self.api_base_url}/api/v1/jobs/health-probe/status",
+                                        headers=self.headers, timeout=(5, 10))
+        except requests.exceptions.RequestException as e:
+            return False, None, str(e)
+        healthy = response.status_code < 500 and response.status_code not in (401, 403)
+        return healthy, response.status_code, None if healthy else f"HTTP {response.status_code}"
+
+    def health_check(self, force: bool = False) -> bool:
+        """
+        Check that the API is reachable and accepts the API key.
+
+        The verdict is cached for HEALTH_TTL seconds, shared with every client in
+        the process when the lingopal_ws_client package is installed. The probe
+        also opens the session's first connection.
+        """
+        health = lingopal_module('health')
+        if health is None:
+            healthy, status_code, error = self._probe_health()
+        else:
+            # Keyed by URL and API key: another key's verdict says nothing about this one
+            key = health.cache_key(self.api_base_url, self.headers)
+            if force:
+                health.DEFAULT_CACHE.invalidate(key)
+
+            def probe():
+                started = time.perf_counter()
+                healthy, status_code, error = self._probe_health()
+                return health.HealthVerdict(healthy, status_code=status_code, error=error,
+                                     latency_ms=round((time.perf_counter() - started) * 1000, 2))
+
+            verdict = health.DEFAULT_CACHE.get_or_probe_sync(key, probe, HEALTH_TTL)
+            healthy, error = verdict.healthy, verdict.error
+        if healthy:
+            print("✅ API is accessible")
+        else:
+            print(f"❌ API health check failed: {error}")
+        return healthy
     
     def start_transcription(self, audio_file_path: str = None, s3_presigned_url: str = None) -> str:
         """
@@ -110,9 +297,13 @@ class TranscribeTranslateClient:
             if not os.path.exists(audio_file_path):
                 raise FileNotFoundError(f"Audio file not found: {audio_file_path}")
             
-            with open(audio_file_path, 'rb') as f:
-                files = {'file': (os.path.basename(audio_file_path), f, 'audio/mpeg')}
-                response = self._make_request('POST', '/api/v1/transcribe', files=files)
+            # Stream the multipart body from disk instead of building it in memory
+            body = StreamingMultipartFile(audio_file_path, 'file', 'audio/mpeg')
+            try:
+                response = self._make_request('POST', '/api/v1/transcribe', data=body,
+                                              headers={'Content-Type': body.content_type})
+            finally:
+                body.close()
         
         job_id = response['job_id']
         print(f"✅ Transcription job started: {job_id}")
@@ -184,16 +375,20 @@ class TranscribeTranslateClient:
         
         start_time = time.time()
         timeout_seconds = timeout_minutes * 60
+        progress = 0
+        errors = 0
         
         while True:
             if time.time() - start_time > timeout_seconds:
                 print(f"❌ {job_type.capitalize()} job timed out after {timeout_minutes} minutes")
                 return False
             
+            elapsed = time.time() - start_time
             try:
                 status_response = self._make_request('GET', f'/api/v1/jobs/{job_id}/status')
                 status = status_response['status']
-                progress = status_response.get('progress', 0)
+                progress = status_response.get('progress') or 0
+                errors = 0
                 message = status_response.get('message', '')
                 
                 print(f"   Status: {status} | {message}")
@@ -204,15 +399,15 @@ class TranscribeTranslateClient:
                 elif status == 'failed':
                     print(f"❌ {job_type.capitalize()} job failed: {message}")
                     return False
-                elif status in ['pending', 'processing']:
-                    time.sleep(10)  # Wait 10 seconds before checking again
-                else:
+                elif status not in ['pending', 'processing']:
                     print(f"⚠️  Unknown status: {status}")
-                    time.sleep(10)
                     
             except Exception as e:
                 print(f"❌ Error checking job status: {e}")
-                time.sleep(10)
+                errors += 1
+
+            remaining = timeout_seconds - (time.time() - start_time)
+            time.sleep(max(0, min(next_poll_interval(elapsed, progress, errors), remaining)))
     
     def get_job_result_urls(self, job_id: str) -> Dict[str, str]:
         """
@@ -246,13 +441,66 @@ class TranscribeTranslateClient:
             print(f"❌ Error getting result URLs: {e}")
             return {}
     
-    def download_job_results(self, job_id: str, output_dir: str = "downloads") -> Dict[str, str]:
+    def _download_file(self, url: str, file_path: str, checksum: Optional[str] = None,
+                       retries: int = 3) -> str:
+        """
+        Stream a file to ``<file_path>.part`` and rename it into place when complete.
+
+        An interrupted download is resumed from the end of the .part file with an
+        HTTP Range request. ``checksum`` is ``"<algorithm>:<hexdigest>"`` (a bare
+        hex digest is taken as MD5, like a single-part S3 ETag).
+        """
+        import requests
+
+        part_path = file_path + '.part'
+        for attempt in range(retries + 1):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            headers = {'Range': f'bytes={offset}-'} if offset else {}
+            try:
+                # No API key here: presigned URLs carry their own authorization
+                with self.session.get(url, headers=headers, stream=True, timeout=(10, 60)) as response:
+                    if response.status_code == 416 and offset:
+                        break  # .part already holds the whole file
+                    response.raise_for_status()
+                    mode = 'ab' if response.status_code == 206 else 'wb'
+                    with open(part_path, mode) as f:
+                        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                            f.write(chunk)
+                break
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError) as e:
+                if attempt == retries:
+                    raise
+                print(f"   ⚠️  Download interrupted ({e}), resuming...")
+                time.sleep(0.5 * 2 ** attempt)
+
+        if checksum:
+            algorithm, _, expected = checksum.rpartition(':')
+            digest = hashlib.new(algorithm or 'md5')
+            with open(part_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+            if digest.hexdigest() != expected.strip('"').lower():
+                os.remove(part_path)
+                raise ValueError(f"Checksum mismatch for {file_path}")
+        os.replace(part_path, file_path)
+        return file_path
+
+    def download_job_results(self, job_id: str, output_dir: str = "downloads",
+                             download_urls: Optional[Dict[str, str]] = None,
+                             file_types: Optional[List[str]] = None,
+                             checksums: Optional[Dict[str, str]] = None,
+                             max_workers: int = 4) -> Dict[str, str]:
         """
         Download job results
         
         Args:
             job_id: Job ID
             output_dir: Directory to save downloaded files
+            download_urls: URLs from get_job_result_urls (skips requesting them again)
+            file_types: Only download these file types, e.g. ["transcript", "vtt"]
+            checksums: Optional mapping of file type to "<algorithm>:<hexdigest>"
+            max_workers: Number of files downloaded in parallel
             
         Returns:
             Dictionary mapping file types to local file paths
@@ -264,65 +512,38 @@ class TranscribeTranslateClient:
         os.makedirs(job_dir, exist_ok=True)
         print(f"📁 Created job directory: {job_dir}")
         
-        try:
-            result_response = self._make_request('GET', f'/api/v1/jobs/{job_id}/result')
-            download_urls = result_response.get('download_urls', {})
-            
-            print(f"🔍 Available download URLs: {list(download_urls.keys())}")
-            print()
-            
-            # Show S3 URLs in logs
-            print("🌐 S3 Download URLs:")
-            for file_type, url in download_urls.items():
-                if url:
-                    print(f"   {file_type}: {url}")
-            print()
-            
-            downloaded_files = {}
-            
-            for file_type, url in download_urls.items():
-                if url:
-                    # Determine file extension based on file type and URL
-                    if file_type in ['transcript', 'diarization'] or url.endswith('.srt'):
-                        extension = '.srt'
-                    elif file_type == 'vtt' or url.endswith('.vtt'):
-                        extension = '.vtt'
-                    elif file_type == 'json' or url.endswith('.json'):
-                        extension = '.json'
-                    elif file_type == 'original_audio' or url.endswith(('.mp3', '.wav', '.m4a')):
-                        # Extract original file extension from URL
-                        if '.mp3' in url:
-                            extension = '.mp3'
-                        elif '.wav' in url:
-                            extension = '.wav'
-                        elif '.m4a' in url:
-                            extension = '.m4a'
-                        else:
-                            extension = '.mp3'  # default
-                    else:
-                        extension = '.txt'
-                    
-                    # Create filename (without job_id prefix since it's in job directory)
-                    filename = f"{file_type}{extension}"
-                    file_path = os.path.join(job_dir, filename)
-                    
-                    print(f"📥 Downloading {file_type}: {filename}")
-                    print(f"   From: {url}")
-                    
-                    # Download file
-                    urllib.request.urlretrieve(url, file_path)
-                    downloaded_files[file_type] = file_path
-                    print(f"   ✅ Downloaded: {file_path}")
-                    print()
-            
-            return downloaded_files
-            
-        except Exception as e:
-            print(f"❌ Error downloading results: {e}")
-            return {}
+        if download_urls is None:
+            download_urls = self.get_job_result_urls(job_id)
+        
+        downloads = {}
+        for file_type, url in download_urls.items():
+            if not url or (file_types is not None and file_type not in file_types):
+                continue
+            # Create filename (without job_id prefix since it's in job directory)
+            filename = f"{file_type}{result_file_extension(file_type, url)}"
+            downloads[file_type] = (url, os.path.join(job_dir, filename))
+        
+        downloaded_files = {}
+        checksums = checksums or {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._download_file, url, file_path, checksums.get(file_type)): file_type
+                for file_type, (url, file_path) in downloads.items()
+            }
+            for future in as_completed(futures):
+                file_type = futures[future]
+                try:
+                    downloaded_files[file_type] = future.result()
+                    print(f"   ✅ Downloaded {file_type}: {downloaded_files[file_type]}")
+                except Exception as e:
+                    print(f"   ❌ Error downloading {file_type}: {e}")
+        print()
+        
+        return downloaded_files
 
 def main():
     """Main function"""
+    load_env()
     # Configuration
     API_BASE_URL = os.getenv('API_BASE_URL', 'http://34.212.19.243:8000')
     API_KEY = os.getenv('API_KEY', None)
@@ -368,49 +589,47 @@ def main():
             sys.exit(1)
         print()
         
-        # Step 3: Download transcription results
-        transcription_files = client.download_job_results(transcription_job_id, OUTPUT_DIR)
-        print()
-        
-        if not transcription_files:
-            print("❌ No transcription files downloaded. Exiting.")
-            sys.exit(1)
-        
-        # Find the SRT file for translation (prefer transcript, then diarization)
-        srt_file = None
+        # Step 3: Get the transcript's S3 URL. The translation job reads it straight
+        # from S3, so the SRT is never downloaded and re-uploaded on the critical path.
+        transcription_urls = client.get_job_result_urls(transcription_job_id)
+        srt_url = None
         preferred_types = ['transcript', 'diarization']
         
         # First try to find transcript or diarization files
         for preferred_type in preferred_types:
-            if preferred_type in transcription_files:
-                srt_file = transcription_files[preferred_type]
-                print(f"📄 Using {preferred_type} file for translation: {srt_file}")
+            if transcription_urls.get(preferred_type):
+                srt_url = transcription_urls[preferred_type]
+                print(f"📄 Using {preferred_type} file for translation")
                 break
         
         # If not found, look for any .srt file
-        if not srt_file:
-            for file_type, file_path in transcription_files.items():
-                if file_path.endswith('.srt'):
-                    srt_file = file_path
-                    print(f"📄 Using {file_type} file for translation: {srt_file}")
+        if not srt_url:
+            for file_type, url in transcription_urls.items():
+                if url and url.split('?', 1)[0].endswith('.srt'):
+                    srt_url = url
+                    print(f"📄 Using {file_type} file for translation")
                     break
         
-        if not srt_file:
+        if not srt_url and not SRT_S3_URL:
             print("❌ No SRT file found in transcription results. Available files:")
-            for file_type, file_path in transcription_files.items():
-                print(f"   - {file_type}: {file_path}")
+            for file_type in transcription_urls:
+                print(f"   - {file_type}")
             sys.exit(1)
-        
-        # This line is now handled in the logic above
         print()
+        
+        # Download the transcription results locally in the background
+        executor = ThreadPoolExecutor(max_workers=1)
+        transcription_download = executor.submit(
+            client.download_job_results, transcription_job_id, OUTPUT_DIR, transcription_urls)
+        executor.shutdown(wait=False)
+        
         # Step 4: Start translation
         if SRT_S3_URL:
-            # Use S3 URL for translation instead of downloaded file
+            # Use the S3 URL from the environment instead of the transcript
             print(f"🌐 Using S3 URL for translation: {SRT_S3_URL}")
             translation_job_id = client.start_translation(s3_presigned_url=SRT_S3_URL, target_languages=TRANSLATION_LANGUAGES)
         else:
-            # Use downloaded SRT file for translation
-            translation_job_id = client.start_translation(srt_file_path=srt_file, target_languages=TRANSLATION_LANGUAGES)
+            translation_job_id = client.start_translation(s3_presigned_url=srt_url, target_languages=TRANSLATION_LANGUAGES)
         print()
         
         # Step 5: Wait for translation to complete
@@ -422,6 +641,7 @@ def main():
         # Step 6: Download translation results
         translation_files = client.download_job_results(translation_job_id, OUTPUT_DIR)
         print()
+        transcription_files = transcription_download.result()
         
         # Summary
         print("📋 Summary:")
@@ -6,20 +6,11 @@ This script demonstrates how to use S3 presigned URLs for translation only (skip
 
 import os
 import sys
-from transcribe_and_translate import TranscribeTranslateClient
-
-# Load environment variables from .env file
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-    print("✅ Loaded environment variables from .env file")
-except ImportError:
-    print("⚠️  python-dotenv not installed. Install with: pip install python-dotenv")
-except Exception as e:
-    print(f"⚠️  Could not load .env file: {e}")
+from transcribe_and_translate import TranscribeTranslateClient, load_env
 
 def main():
     """Example using S3 presigned URL for translation only"""
+    load_env()
     
     # Configuration
     API_BASE_URL = os.getenv('API_BASE_URL', 'http://34.212.19.243:8000')
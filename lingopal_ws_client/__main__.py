@@ -0,0 +1,5 @@
+import sys
+
+from lingopal_ws_client.cli import main
+
+sys.exit(main())
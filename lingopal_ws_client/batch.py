@@ -0,0 +1,285 @@
+"""
+Bulk transcription of directories, globs and manifests.
+
+Inputs are read lazily and at most ``concurrency`` jobs are in flight, so
+memory stays flat however many files there are. Every finished item is
+appended (and flushed) to a JSONL results manifest as soon as it completes.
+
+Accepted sources:
+    - a directory (searched recursively for audio files)
+    - a glob pattern, e.g. ``"recordings/**/*.wav"``
+    - a ``.csv`` manifest with a ``path`` or ``s3_presigned_url`` column (optional ``id``)
+    - a ``.jsonl`` manifest with the same keys, one object per line
+
+With a journal (``--journal``), every submission, status change and download
+is recorded as it happens. Re-running the same batch skips finished items and
+re-attaches to jobs that were already submitted; ``--resume`` re-attaches to
+the in-flight jobs of a journal without needing the original input. A job
+still running when ``--timeout`` expires is recorded as "timeout" and stays
+in flight, so the next run polls it again.
+
+Usage:
+    python -m lingopal_ws_client.batch recordings/ --results results.jsonl --concurrency 16
+    python -m lingopal_ws_client.batch recordings/ --journal batch.journal
+    python -m lingopal_ws_client.batch --resume --journal batch.journal --download-dir downloads
+"""
+
+import argparse
+import asyncio
+import csv
+import glob
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional
+
+from lingopal_ws_client.jobs import AsyncTranscribeTranslateClient
+from lingopal_ws_client.journal import DONE, DOWNLOADED, STATUS, SUBMITTED, JobJournal, JournalEntry
+
+TIMEOUT = "timeout"
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".m4a", ".flac", ".ogg", ".aac", ".mp4")
+
+
+class BatchItem(NamedTuple):
+    key: str
+    audio_file_path: Optional[str] = None
+    s3_presigned_url: Optional[str] = None
+
+
+def _item_from_record(record: dict, line: int) -> BatchItem:
+    path = record.get("path") or record.get("audio_file_path") or None
+    url = record.get("s3_presigned_url") or record.get("url") or None
+    if bool(path) == bool(url):
+        raise ValueError(f"Manifest entry {line} needs exactly one of path or s3_presigned_url")
+    return BatchItem(record.get("id") or path or url, path, url)
+
+
+def iter_inputs(source: str, extensions: Iterable[str] = AUDIO_EXTENSIONS) -> Iterator[BatchItem]:
+    """Lazily yield BatchItems from a directory, glob pattern, or CSV/JSONL manifest."""
+    extensions = tuple(e.lower() for e in extensions)
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(extensions):
+                    path = os.path.join(root, name)
+                    yield BatchItem(path, audio_file_path=path)
+    elif source.lower().endswith(".csv"):
+        with open(source, newline="") as f:
+            for line, record in enumerate(csv.DictReader(f), start=2):
+                yield _item_from_record(record, line)
+    elif source.lower().endswith((".jsonl", ".ndjson")):
+        with open(source) as f:
+            for line, text in enumerate(f, start=1):
+                if text.strip():
+                    yield _item_from_record(json.loads(text), line)
+    elif glob.has_magic(source):
+        for path in glob.iglob(source, recursive=True):
+            if os.path.isfile(path):
+                yield BatchItem(path, audio_file_path=path)
+    elif os.path.isfile(source):
+        yield BatchItem(source, audio_file_path=source)
+    else:
+        raise FileNotFoundError(f"No such file, directory or pattern: {source}")
+
+
+@dataclass
+class BatchSummary:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    resumed: int = 0
+    skipped: int = 0
+    in_flight: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def as_dict(self) -> dict:
+        return {"submitted": self.submitted, "completed": self.completed, "failed": self.failed,
+                "timed_out": self.timed_out, "resumed": self.resumed, "skipped": self.skipped, "in_flight": self.in_flight,
+                "elapsed_seconds": round(self.elapsed, 1)}
+
+
+async def _process(client: AsyncTranscribeTranslateClient, item: BatchItem, wait: bool,
+                   download_dir: Optional[str], timeout_minutes: int, summary: BatchSummary,
+                   journal: Optional[JobJournal] = None, entry: Optional[JournalEntry] = None) -> dict:
+    record = {"key": item.key, "audio_file_path": item.audio_file_path,
+              "s3_presigned_url": item.s3_presigned_url, "job_id": None, "status": None,
+              "error": None, "files": None}
+    started = time.monotonic()
+    try:
+        if entry is not None and entry.in_flight:
+            # Submitted by an earlier run: re-attach instead of submitting again
+            record["job_id"] = entry.job_id
+            record["resumed"] = True
+            summary.resumed += 1
+        else:
+            record["job_id"] = await client.start_transcription(audio_file_path=item.audio_file_path,
+                                                                s3_presigned_url=item.s3_presigned_url)
+            summary.submitted += 1
+            if journal is not None:
+                journal.record(SUBMITTED, item.key, job_id=record["job_id"], job_type="transcription",
+                               audio_file_path=item.audio_file_path, s3_presigned_url=item.s3_presigned_url)
+            entry = None
+        record["status"] = "submitted"
+        if wait:
+            if entry is not None and entry.status in ("completed", "failed"):
+                ok = entry.status == "completed"
+            else:
+                try:
+                    ok = await client.wait_for_job_completion(record["job_id"], "transcription", timeout_minutes,
+                                                              raise_on_timeout=True)
+                except asyncio.TimeoutError:
+                    ok = None
+                if journal is not None:
+                    journal.record(STATUS, item.key, job_id=record["job_id"],
+                                   status=TIMEOUT if ok is None else "completed" if ok else "failed")
+            if ok is None:
+                # Still running on the server: it stays in flight for the next run
+                record["status"] = TIMEOUT
+                record["error"] = f"Not finished after {timeout_minutes} minutes"
+            else:
+                record["status"] = "completed" if ok else "failed"
+            if ok and download_dir:
+                if entry is not None and entry.files is not None:
+                    record["files"] = entry.files
+                else:
+                    record["files"] = await client.download_job_results(record["job_id"], download_dir)
+                    if journal is not None:
+                        journal.record(DOWNLOADED, item.key, job_id=record["job_id"], files=record["files"])
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["seconds"] = round(time.monotonic() - started, 3)
+    # Unwaited jobs are already counted in summary.submitted
+    if record["status"] == "completed":
+        summary.completed += 1
+    elif record["status"] == TIMEOUT:
+        summary.timed_out += 1
+    elif record["status"] != "submitted":
+        summary.failed += 1
+    # Errors are retried by the next run; unwaited and timed-out jobs stay in flight for --resume
+    if journal is not None and record["status"] in ("completed", "failed"):
+        journal.record(DONE, item.key, record=record)
+    return record
+
+
+async def run_batch(client: AsyncTranscribeTranslateClient, items: Iterable[BatchItem],
+                    results_path: str, concurrency: int = 8, wait: bool = True,
+                    download_dir: Optional[str] = None, timeout_minutes: int = 30,
+                    on_result: Optional[Callable[[dict], None]] = None,
+                    journal: Optional[JobJournal] = None) -> BatchSummary:
+    """
+    Submit every item with at most ``concurrency`` jobs in flight.
+
+    Args:
+        client: Job API client
+        items: BatchItems, typically from ``iter_inputs`` (consumed lazily)
+        results_path: JSONL file that receives one record per item (appended)
+        concurrency: Maximum number of items being submitted/awaited at once
+        wait: Wait for each job to finish (otherwise record it as submitted)
+        download_dir: Download results of completed jobs here
+        timeout_minutes: Per-job completion timeout
+        on_result: Optional callback for every result record
+        journal: Record progress here; items it marks finished are skipped and
+            jobs it shows as submitted are re-attached instead of resubmitted
+
+    Returns:
+        BatchSummary with submitted/completed/failed counts
+    """
+    summary = BatchSummary()
+    iterator = iter(items)
+    state = JobJournal.load(journal.path) if journal is not None else {}
+
+    with open(results_path, "a") as results:
+        async def worker():
+            # Pull from the shared iterator only when there is capacity, so the
+            # input is never materialised in memory.
+            for item in iterator:
+                entry = state.get(item.key)
+                if entry is not None and entry.done:
+                    summary.skipped += 1
+                    continue
+                summary.in_flight += 1
+                try:
+                    record = await _process(client, item, wait, download_dir, timeout_minutes, summary,
+                                            journal, entry)
+                finally:
+                    summary.in_flight -= 1
+                results.write(json.dumps(record) + "\n")
+                results.flush()
+                if on_result is not None:
+                    on_result(record)
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+        finally:
+            if journal is not None:
+                journal.sync()
+    return summary
+
+
+async def resume(client: AsyncTranscribeTranslateClient, journal: JobJournal, results_path: str,
+                 **kwargs) -> BatchSummary:
+    """
+    Re-attach to every job the journal shows as submitted but not finished.
+
+    Jobs are followed through the status endpoint (and downloaded, if
+    ``download_dir`` is given) without resubmitting anything; finished work is
+    skipped. Keyword arguments are passed to ``run_batch``.
+    """
+    state = JobJournal.load(journal.path)
+    items = (BatchItem(entry.key, entry.audio_file_path, entry.s3_presigned_url)
+             for entry in state.values() if entry.in_flight)
+    return await run_batch(client, items, results_path, journal=journal, **kwargs)
+
+
+async def _main(args):
+    journal = JobJournal(args.journal) if args.journal else None
+    try:
+        async with AsyncTranscribeTranslateClient(args.api_base_url, args.api_key) as client:
+            def report(record):
+                print(f"{record['status']:>9}  {record['job_id'] or '-':<36}  {record['key']}")
+
+            options = dict(concurrency=args.concurrency, wait=not args.no_wait, download_dir=args.download_dir,
+                           timeout_minutes=args.timeout, on_result=report)
+            if args.resume:
+                summary = await resume(client, journal, args.results, **options)
+            else:
+                summary = await run_batch(client, iter_inputs(args.source), args.results,
+                                          journal=journal, **options)
+    finally:
+        if journal is not None:
+            journal.close()
+    print(json.dumps(summary.as_dict()))
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    parser = argparse.ArgumentParser(prog=prog, description="Batch transcription of a directory, glob or manifest")
+    parser.add_argument("source", nargs="?", help="Directory, glob pattern, or .csv/.jsonl manifest")
+    parser.add_argument("--results", default="batch_results.jsonl", help="JSONL results manifest (appended)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--download-dir", help="Download results of completed jobs here")
+    parser.add_argument("--journal", help="Append-only job journal; re-running with it skips finished items")
+    parser.add_argument("--resume", action="store_true",
+                        help="Re-attach to the in-flight jobs in --journal instead of reading a source")
+    parser.add_argument("--no-wait", action="store_true", help="Only submit jobs, do not wait for them")
+    parser.add_argument("--timeout", type=int, default=int(os.getenv("JOB_TIMEOUT", "30")),
+                        help="Per-job timeout in minutes")
+    parser.add_argument("--api-base-url", default=os.getenv("API_BASE_URL", "http://34.212.19.243:8000"))
+    parser.add_argument("--api-key", default=os.getenv("API_KEY"))
+    args = parser.parse_args(argv)
+    if args.resume and not args.journal:
+        parser.error("--resume needs --journal")
+    if not args.resume and not args.source:
+        parser.error("a source is required unless --resume is given")
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+``lingopal``: one command for the package's tools.
+
+Each subcommand is the ``main()`` of a module, imported only when that
+subcommand runs. ``lingopal --help`` and a mistyped command never load httpx,
+websockets or the job client, and ``lingopal listen`` never loads httpx. Keep
+the imports here to the standard library; benchmarks/bench_startup.py
+checks the import time.
+
+If a ``.env`` file is present in the working directory and python-dotenv is
+installed, its variables are loaded first (the example scripts do the same).
+
+Usage:
+    lingopal stream start lineup.csv
+    lingopal stream schedule --ingest-url srt://ingest.example.com:7001 \\
+        --scheduled-time "2024-01-15 10:00:00" --timezone America/New_York
+    lingopal listen <stream_id>
+    lingopal transcribe talk.mp3
+    lingopal translate talk.srt --languages es,fr
+    lingopal batch recordings/ --download-dir results
+"""
+
+import importlib
+import os
+import sys
+from typing import List, Optional
+
+# name -> (module, leading arguments for its main(), summary)
+COMMANDS = {
+    "stream": ("lingopal_ws_client.streams", [], "Start or schedule streams, one or a CSV/YAML manifest"),
+    "listen": ("lingopal_ws_client.client", [], "Print a live stream's transcription messages"),
+    "transcribe": ("lingopal_ws_client.jobs", ["transcribe"], "Transcribe an audio file and download the results"),
+    "translate": ("lingopal_ws_client.jobs", ["translate"], "Translate an SRT file and download the results"),
+    "batch": ("lingopal_ws_client.batch", [], "Transcribe a directory, glob or manifest of audio files"),
+    "split": ("lingopal_ws_client.splitting", [], "Transcribe long audio as parallel segments"),
+    "memory": ("lingopal_ws_client.translation_memory", [], "Re-translate only the edited cues of an SRT"),
+    "replay": ("lingopal_ws_client.replay", [], "Serve a session recording as a local WebSocket stream"),
+}
+
+
+def usage() -> str:
+    width = max(map(len, COMMANDS))
+    lines = ["usage: lingopal <command> [options]", "", "commands:"]
+    lines += [f"  {name:<{width}}  {summary}" for name, (_, _, summary) in COMMANDS.items()]
+    lines += ["", "Run 'lingopal <command> --help' for the options of a command."]
+    return "\n".join(lines)
+
+
+def load_dotenv():
+    if not os.path.exists(".env"):
+        return
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+
+def main(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0 if argv else 2
+    name = argv[0]
+    if name not in COMMANDS:
+        print(f"lingopal: unknown command {name!r}\n\n{usage()}", file=sys.stderr)
+        return 2
+    module_name, leading, _ = COMMANDS[name]
+    load_dotenv()
+    module = importlib.import_module(module_name)
+    # Commands backed by a sub-command of the module's own CLI show as "lingopal <command>"
+    return module.main(leading + argv[1:], prog="lingopal" if leading else f"lingopal {name}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
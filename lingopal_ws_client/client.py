@@ -1,27 +1,149 @@
+import argparse
 import asyncio
+import contextlib
+import inspect
+import logging
+import os
+import time
+from typing import List, Optional
+
 import websockets
+from websockets.exceptions import WebSocketException
+
+from lingopal_ws_client.metrics import StreamMetrics
+from lingopal_ws_client.reconnect import GapStats, ReconnectPolicy
+from lingopal_ws_client.recorder import Recorder
+
+logger = logging.getLogger(__name__)
+
+# Failures of the connection itself; anything else raised while receiving is a bug, not a disconnect
+DISCONNECT_ERRORS = (WebSocketException, OSError, asyncio.TimeoutError)
 
 ENV_URLS = {
     "prod": "wss://streaming.lingopal.ai/v1/live/transcription",
 }
 
-async def connect_to_server(stream_id: str, api_key: str, env: str = "prod"):
-    base_url = ENV_URLS.get(env, ENV_URLS["prod"])
-    url = f"{base_url}/{stream_id}"
+
+def stream_url(stream_id: str, env: str = "prod") -> str:
+    # env is either a key into ENV_URLS or a base URL such as a local replay server
+    if env.startswith(("ws://", "wss://")):
+        base_url = env.rstrip("/")
+    else:
+        base_url = ENV_URLS.get(env, ENV_URLS["prod"])
+    return f"{base_url}/{stream_id}"
+
+
+def _print_message(stream_id: str, message):
+    print(f"Received from server: {message}")
+
+
+async def connect_to_server(stream_id: str, api_key: str, env: str = "prod",
+                            on_message=None, ssl_context=None,
+                            reconnect: Optional[ReconnectPolicy] = None,
+                            gap_stats: Optional[GapStats] = None,
+                            metrics: Optional[StreamMetrics] = None,
+                            recorder: Optional[Recorder] = None):
+    """
+    Connect to the transcription socket for one stream and receive until it closes.
+
+    Args:
+        stream_id: Stream UUID from Lingopal
+        api_key: Lingopal API key
+        env: Key into ENV_URLS, or a ws:// / wss:// base URL
+        on_message: Optional callback ``on_message(stream_id, message)``; may be a
+            coroutine function. Defaults to printing each message.
+        ssl_context: Optional SSL context to share between many connections
+        reconnect: Optional policy for re-opening the socket after it drops.
+            Without one the function returns on the first disconnect.
+        gap_stats: Optional GapStats updated with connect/disconnect/outage timings
+        metrics: Optional StreamMetrics updated with handshake time, ping RTT,
+            inter-arrival gaps and message/byte counts
+        recorder: Optional Recorder that appends every received frame to a recording
+    """
+    url = stream_url(stream_id, env)
+    handler = on_message or _print_message
 
     headers = {"X-API-Key": api_key}
+    connect_kwargs = {"additional_headers": headers}
+    if ssl_context is not None and url.startswith("wss://"):
+        connect_kwargs["ssl"] = ssl_context
+
+    attempt = 0
+    while True:
+        error = None
+        pinger = None
+        try:
+           connect_started = time.monotonic()
+           async with websockets.connect(url, **connect_kwargs) as websocket:
+                logger.info("Connected to %s", url)
+                awaiting_first = True
+                if gap_stats is not None:
+                    gap_stats.on_connect()
+                if metrics is not None:
+                    metrics.on_connect(time.monotonic() - connect_started)
+                    pinger = asyncio.create_task(metrics.sample_pings(websocket))
+                # Loop to receive messages
+                while True:
+                    try:
+                        message = await websocket.recv()
+                        if metrics is not None:
+                            metrics.on_message(message)
+                        if recorder is not None:
+                            recorder.record(message)
+                        if awaiting_first:
+                            awaiting_first = False
+                            attempt = 0
+                            if gap_stats is not None:
+                                gap_stats.on_first_message()
+                    except websockets.exceptions.ConnectionClosed as e:
+                        logger.info("WebSocket connection closed by server: %s", e)
+                        error = e
+                        break
+                    # A failing handler (bad frame, callback bug) skips the message, not the connection
+                    try:
+                        result = handler(stream_id, message)
+                        if inspect.isawaitable(result):
+                            await result
+                    except Exception:
+                        logger.exception("Message handler failed for stream %s", stream_id)
+
+        except DISCONNECT_ERRORS as e:
+            logger.warning("Connection to %s failed: %s", url, e)
+            error = e
+        finally:
+            if pinger is not None:
+                pinger.cancel()
+
+        if reconnect is None or not reconnect.should_retry(error, attempt):
+            return
+        if gap_stats is not None:
+            gap_stats.on_disconnect()
+        delay = reconnect.delay(attempt)
+        attempt += 1
+        logger.info("Reconnecting to %s in %.2fs (attempt %d)", url, delay, attempt)
+        await asyncio.sleep(delay)
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    parser = argparse.ArgumentParser(prog=prog, description="Print the transcription messages of a live stream")
+    parser.add_argument("stream_id", help="Stream UUID from Lingopal")
+    parser.add_argument("--api-key", default=os.getenv("LINGOPAL_API_KEY"))
+    parser.add_argument("--env", default="prod", help="Environment name, or a ws:// / wss:// base URL "
+                                                      "such as a local replay server")
+    parser.add_argument("--reconnect", action="store_true", help="Re-open the socket when it drops")
+    parser.add_argument("--record", help="Also append every frame to this recording file")
+    args = parser.parse_args(argv)
+    if not args.api_key:
+        parser.error("--api-key or LINGOPAL_API_KEY is required")
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    with Recorder(args.record) if args.record else contextlib.nullcontext() as recorder:
+        try:
+            asyncio.run(connect_to_server(args.stream_id, args.api_key, args.env,
+                                          reconnect=ReconnectPolicy() if args.reconnect else None,
+                                          recorder=recorder))
+        except KeyboardInterrupt:
+            pass
+
 
-    try:
-       async with websockets.connect(url, additional_headers=headers) as websocket:
-            print(f"Connected to {url}")
-            # Loop to receive messages
-            while True:
-                try:
-                    message = await websocket.recv()
-                    print(f"Received from server: {message}")
-                except websockets.exceptions.ConnectionClosed:
-                    print("WebSocket connection closed by server.")
-                    break
-
-    except Exception as e:
-        print(f"Connection failed: {e}")
+if __name__ == "__main__":
+    main()
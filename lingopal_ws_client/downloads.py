@@ -0,0 +1,186 @@
+"""
+Concurrent, resumable downloads of job result files.
+
+Each file is streamed in chunks to ``<path>.part`` and renamed into place with
+``os.replace`` only once it is complete (and its checksum matches, if one was
+given), so a crash never leaves a truncated file under the final name. After a
+dropped connection the download resumes from the end of the ``.part`` file
+with an HTTP ``Range`` request; a leftover ``.part`` file from an earlier run
+is resumed the same way. A partial response that does not start where the
+``.part`` file ends is discarded and the file is downloaded again. File
+reads and writes run in worker threads, off the event loop.
+
+Checksums are ``"<algorithm>:<hexdigest>"`` strings for any ``hashlib``
+algorithm, e.g. ``"sha256:9f86d0..."``; a bare hex digest is taken as MD5,
+which is what S3 reports as the ETag of single-part uploads.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1 << 16
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+CONTENT_RANGE = re.compile(r"bytes\s+(\d+)-")
+
+
+class DownloadError(Exception):
+    pass
+
+
+class ChecksumMismatch(DownloadError):
+    pass
+
+
+def parse_checksum(checksum: str) -> Tuple[str, str]:
+    """Split ``"sha256:abc..."`` into (algorithm, hexdigest); bare digests are MD5."""
+    algorithm, _, digest = checksum.rpartition(":")
+    algorithm = algorithm.lower() or "md5"
+    if algorithm not in hashlib.algorithms_available:
+        raise ValueError(f"Unknown checksum algorithm: {algorithm}")
+    return algorithm, digest.strip('"').lower()
+
+
+def _range_start(response: httpx.Response) -> Optional[int]:
+    """First byte of a 206 response, from its ``Content-Range`` header."""
+    match = CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+    return int(match.group(1)) if match else None
+
+
+def _hash_existing(path: str, algorithm: str):
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest
+
+
+async def download_file(http: httpx.AsyncClient, url: str, path: str, *,
+                        checksum: Optional[str] = None, retries: int = 3,
+                        backoff: float = 0.5, chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    Download ``url`` to ``path`` atomically, resuming after interruptions.
+
+    Args:
+        http: Client to download with (presigned URLs need no auth headers)
+        url: Source URL
+        path: Final file path
+        checksum: Optional ``"<algorithm>:<hexdigest>"`` to verify
+        retries: Attempts after the first for connection errors and 5xx/429 responses
+        backoff: Seconds before the first retry, doubling each time
+        chunk_size: Bytes per read/write
+
+    Returns:
+        ``path``
+
+    Raises:
+        ChecksumMismatch: The completed file does not match ``checksum``
+        DownloadError: The download still failed after ``retries`` retries
+    """
+    algorithm, expected = parse_checksum(checksum) if checksum else (None, None)
+    part = path + ".part"
+    attempt = 0
+    while True:
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            async with http.stream("GET", url, headers=headers) as response:
+                if response.status_code == 416 and offset:
+                    # The .part file already holds the whole body
+                    pass
+                else:
+                    response.raise_for_status()
+                    if response.status_code != 206:
+                        offset = 0  # Range ignored: start over
+                    elif _range_start(response) != offset:
+                        # Appending this body would corrupt the file: start over without Range
+                        logger.warning("Download of %s resumed at the wrong offset (%s instead of %d); restarting",
+                                       path, response.headers.get("Content-Range"), offset)
+                        await asyncio.to_thread(os.remove, part)
+                        continue
+                    digest = None
+                    if algorithm:
+                        digest = (await asyncio.to_thread(_hash_existing, part, algorithm) if offset
+                                  else hashlib.new(algorithm))
+                    f = await asyncio.to_thread(open, part, "ab" if offset else "wb")
+                    try:
+                        async for chunk in response.aiter_bytes(chunk_size):
+                            await asyncio.to_thread(f.write, chunk)
+                            if digest is not None:
+                                digest.update(chunk)
+                    finally:
+                        await asyncio.to_thread(f.close)
+                    break
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code not in RETRYABLE_STATUS_CODES or attempt >= retries:
+                raise DownloadError(f"Downloading {path} failed: HTTP {e.response.status_code}") from e
+        except httpx.TransportError as e:
+            if attempt >= retries:
+                raise DownloadError(f"Downloading {path} failed: {e!r}") from e
+            logger.warning("Download of %s interrupted at %d bytes, resuming: %r",
+                           path, os.path.getsize(part) if os.path.exists(part) else 0, e)
+        else:
+            digest = await asyncio.to_thread(_hash_existing, part, algorithm) if algorithm else None
+            break
+        attempt += 1
+        await asyncio.sleep(backoff * 2 ** (attempt - 1))
+
+    if digest is not None and digest.hexdigest() != expected:
+        os.remove(part)
+        raise ChecksumMismatch(f"{path}: expected {algorithm} {expected}, got {digest.hexdigest()}")
+    os.replace(part, path)
+    return path
+
+
+async def download_all(http: httpx.AsyncClient, urls: Dict[str, str], dest_dir: str,
+                       filename: Callable[[str, str], str], *,
+                       file_types: Optional[Iterable[str]] = None,
+                       checksums: Optional[Dict[str, str]] = None,
+                       concurrency: int = 4, **kwargs) -> Dict[str, str]:
+    """
+    Download several result files with at most ``concurrency`` in flight.
+
+    Args:
+        http: Client to download with
+        urls: File type -> URL (empty URLs are skipped)
+        dest_dir: Directory for the files (created if missing)
+        filename: ``filename(file_type, url)`` -> file name inside ``dest_dir``
+        file_types: Only download these file types (default: all)
+        checksums: Optional file type -> checksum
+        concurrency: Maximum simultaneous downloads
+        **kwargs: Passed to ``download_file``
+
+    Returns:
+        File type -> local path for every file that downloaded; failures are logged
+        and do not stop the other downloads
+    """
+    wanted = set(file_types) if file_types is not None else None
+    todo = [(file_type, url) for file_type, url in urls.items()
+            if url and (wanted is None or file_type in wanted)]
+    os.makedirs(dest_dir, exist_ok=True)
+    semaphore = asyncio.Semaphore(concurrency)
+    checksums = checksums or {}
+
+    async def fetch(file_type, url):
+        async with semaphore:
+            path = os.path.join(dest_dir, filename(file_type, url))
+            return await download_file(http, url, path, checksum=checksums.get(file_type), **kwargs)
+
+    results = await asyncio.gather(*(fetch(file_type, url) for file_type, url in todo), return_exceptions=True)
+    files = {}
+    for (file_type, _), result in zip(todo, results):
+        if isinstance(result, asyncio.CancelledError):
+            raise result
+        if isinstance(result, BaseException):
+            logger.error("Error downloading %s: %s", file_type,
+                         result if isinstance(result, DownloadError) else repr(result))
+        elif result:
+            files[file_type] = result
+    return files
@@ -0,0 +1,199 @@
+"""
+Typed caption events decoded once from WebSocket frames.
+
+Frames are JSON objects. The event kind is read from ``"type"``; frames without
+one are classified from their keys (a ``translation`` key means a translation,
+``is_final`` separates final from partial transcripts). Field names the service
+may use are listed in FIELD_ALIASES, first match wins.
+
+JSON is parsed with orjson when it is installed and the standard library
+otherwise; ``set_json_backend`` overrides the choice.
+"""
+
+import json
+import re
+from typing import Callable, Iterable, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+PARTIAL_TRANSCRIPT = "partial_transcript"
+FINAL_TRANSCRIPT = "final_transcript"
+TRANSLATION = "translation"
+UNKNOWN = "unknown"
+EVENT_TYPES = (PARTIAL_TRANSCRIPT, FINAL_TRANSCRIPT, TRANSLATION)
+
+FIELD_ALIASES = {
+    "text": ("text", "transcript", "translation"),
+    "language": ("language", "lang", "target_language"),
+    "source_language": ("source_language", "src_language"),
+    "start": ("start", "start_time"),
+    "end": ("end", "end_time"),
+    "timestamp": ("timestamp", "ts", "server_time"),
+    "speaker": ("speaker", "speaker_id"),
+    "segment_id": ("segment_id", "id", "seq"),
+}
+EVENT_FIELDS = tuple(FIELD_ALIASES)
+
+# The value of a "type" key, matched right after the key
+_STR_TYPE_VALUE = re.compile(r'\s*:\s*"([^"\\]*)"')
+_BYTES_TYPE_VALUE = re.compile(_STR_TYPE_VALUE.pattern.encode())
+
+
+_json_loads: Callable = orjson.loads if orjson is not None else json.loads
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+
+def set_json_backend(backend: Union[str, Callable]):
+    """
+    Select the JSON parser used by new decoders.
+
+    Args:
+        backend: "orjson", "json", or any callable taking str/bytes and returning a dict
+    """
+    global _json_loads, JSON_BACKEND
+    if callable(backend):
+        _json_loads, JSON_BACKEND = backend, getattr(backend, "__module__", "custom")
+    elif backend == "orjson":
+        if orjson is None:
+            raise ImportError("orjson is not installed. Install with: pip install orjson")
+        _json_loads, JSON_BACKEND = orjson.loads, "orjson"
+    elif backend == "json":
+        _json_loads, JSON_BACKEND = json.loads, "json"
+    else:
+        raise ValueError(f"Unknown JSON backend: {backend!r}")
+
+
+class CaptionEvent:
+    """Base class for decoded frames. Fields the decoder was not asked for are None."""
+
+    __slots__ = ("stream_id",) + EVENT_FIELDS
+    type = UNKNOWN
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in CaptionEvent.__slots__
+                           if getattr(self, name) is not None)
+        return f"{type(self).__name__}({values})"
+
+
+class PartialTranscript(CaptionEvent):
+    __slots__ = ()
+    type = PARTIAL_TRANSCRIPT
+
+
+class FinalTranscript(CaptionEvent):
+    __slots__ = ()
+    type = FINAL_TRANSCRIPT
+
+
+class Translation(CaptionEvent):
+    __slots__ = ()
+    type = TRANSLATION
+
+
+class UnknownEvent(CaptionEvent):
+    """A frame whose kind could not be recognised; the parsed payload is kept in ``data``."""
+
+    __slots__ = ("data",)
+    type = UNKNOWN
+
+
+EVENT_CLASSES = {cls.type: cls for cls in (PartialTranscript, FinalTranscript, Translation)}
+
+
+def classify(data: dict) -> str:
+    kind = data.get("type")
+    if kind in EVENT_CLASSES:
+        return kind
+    if kind is None:
+        if "translation" in data:
+            return TRANSLATION
+        if "is_final" in data:
+            return FINAL_TRANSCRIPT if data["is_final"] else PARTIAL_TRANSCRIPT
+    return UNKNOWN
+
+
+class EventDecoder:
+    """
+    Decode frames into CaptionEvent objects.
+
+    Args:
+        types: Event types to keep (default: all known types). Frames of other types
+            are skipped; when a frame's top-level ``"type"`` member comes before any
+            nested value and names none of the subscribed types, it is skipped before
+            JSON parsing (unless ``keep_unknown`` is set).
+        fields: Event fields to extract (default: all of EVENT_FIELDS)
+        keep_unknown: Return UnknownEvent for unrecognised frames instead of skipping them
+        json_loads: JSON parser to use (default: the current backend)
+    """
+
+    def __init__(self, types: Optional[Iterable[str]] = None,
+                 fields: Optional[Iterable[str]] = None,
+                 keep_unknown: bool = False,
+                 json_loads: Optional[Callable] = None):
+        self.types = frozenset(types) if types is not None else frozenset(EVENT_TYPES)
+        unknown_types = self.types - set(EVENT_TYPES)
+        if unknown_types:
+            raise ValueError(f"Unknown event types: {sorted(unknown_types)}")
+        self.fields = tuple(fields) if fields is not None else EVENT_FIELDS
+        unknown_fields = set(self.fields) - set(EVENT_FIELDS)
+        if unknown_fields:
+            raise ValueError(f"Unknown event fields: {sorted(unknown_fields)}")
+        self.keep_unknown = keep_unknown
+        self.loads = json_loads or _json_loads
+        self.skipped = 0
+        self._extract = tuple((name, FIELD_ALIASES[name]) for name in self.fields)
+        self._unset = tuple(name for name in EVENT_FIELDS if name not in self.fields)
+        # Frames with an unrecognised "type" must reach keep_unknown, so no prefilter then
+        self._prefilter = self.types != frozenset(EVENT_TYPES) and not keep_unknown
+        self._str_types = self.types
+        self._bytes_types = frozenset(t.encode() for t in self.types)
+
+    def _prefiltered(self, message) -> bool:
+        """
+        True when the top-level ``"type"`` names an unsubscribed type.
+
+        The key counts as top-level only when no object or array opens before it
+        besides the frame itself; otherwise the frame is parsed to be sure.
+        """
+        if isinstance(message, str):
+            key, brace, bracket, value, types = '"type"', "{", "[", _STR_TYPE_VALUE, self._str_types
+        else:
+            key, brace, bracket, value, types = b'"type"', b"{", b"[", _BYTES_TYPE_VALUE, self._bytes_types
+        position = message.find(key)
+        if position < 0 or message.count(brace, 0, position) != 1 or message.find(bracket, 0, position) >= 0:
+            return False
+        match = value.match(message, position + len(key))
+        return match is not None and match.group(1) not in types
+
+    def decode(self, stream_id: str, message) -> Optional[CaptionEvent]:
+        """Return the event for ``message``, or None if it is not subscribed."""
+        if self._prefilter and self._prefiltered(message):
+            self.skipped += 1
+            return None
+        data = self.loads(message)
+        if not isinstance(data, dict):
+            self.skipped += 1
+            return None
+        kind = classify(data)
+        if kind in self.types:
+            event = EVENT_CLASSES[kind]()
+        elif kind == UNKNOWN and self.keep_unknown:
+            event = UnknownEvent()
+            event.data = data
+        else:
+            self.skipped += 1
+            return None
+        event.stream_id = stream_id
+        for name, keys in self._extract:
+            value = None
+            for key in keys:
+                if key in data:
+                    value = data[key]
+                    break
+            setattr(event, name, value)
+        for name in self._unset:
+            setattr(event, name, None)
+        return event
@@ -0,0 +1,224 @@
+"""
+API health verdicts shared per process, and connection warm-up.
+
+``check_health`` answers "is the job API reachable and not failing" from a
+process-wide cache. The verdict for a base URL is reused for ``ttl``
+seconds, so any number of client instances (and concurrent callers) cost one
+probe per TTL. Verdicts are kept per base URL and credentials (a hash of the
+request headers), since a rejected API key makes the verdict unhealthy. A probe is one ``GET`` of ``PROBE_PATH``. Any HTTP response
+below 500 (the usual 404 for the made-up job ID included) means healthy,
+except 401/403: a rejected API key fails every real call too. 5xx responses,
+connection errors and timeouts mean unhealthy. The verdict is taken from
+the status code, never from error message text.
+
+The probe also goes over the client's connection pool, so it warms a
+connection that the next real request reuses. ``warm_up`` opens several
+connections at once ahead of a burst of requests. Each probe records DNS,
+TCP connect, TLS handshake and time-to-first-byte latencies.
+
+Example:
+    async with AsyncTranscribeTranslateClient(api_base_url, api_key) as client:
+        await client.warm_up(connections=8)   # before submitting a batch
+        if not await client.health_check():
+            ...
+"""
+
+import asyncio
+import hashlib
+import logging
+import socket
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+PROBE_PATH = "/api/v1/jobs/health-probe/status"
+DEFAULT_TTL = 30.0
+PROBE_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+# Request extension read by ResilientTransport: send the probe once, without retries
+NO_RETRY = {"lingopal.retry": False}
+
+
+@dataclass
+class HealthVerdict:
+    healthy: bool
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    checked_at: float = field(default_factory=time.time)
+    # Milliseconds; connection phases are None when a pooled connection was reused
+    latency_ms: float = 0.0
+    dns_ms: Optional[float] = None
+    connect_ms: Optional[float] = None
+    tls_ms: Optional[float] = None
+    ttfb_ms: Optional[float] = None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def verdict_from_status(status_code: int) -> bool:
+    """Reachable, not failing and accepting the API key."""
+    return status_code < 500 and status_code not in (401, 403)
+
+
+def cache_key(base_url: str, headers: Optional[Dict[str, str]] = None) -> tuple:
+    """(normalized base URL, hash of the headers): clients with different API keys get separate verdicts."""
+    credentials = repr(sorted((name.lower(), value) for name, value in (headers or {}).items()))
+    return base_url.rstrip("/"), hashlib.sha256(credentials.encode()).hexdigest()
+
+
+class HealthCache:
+    """Thread-safe TTL cache of verdicts by ``cache_key``."""
+
+    def __init__(self):
+        self._verdicts: Dict[tuple, tuple] = {}  # cache key -> (monotonic expiry, verdict)
+        self._lock = threading.Lock()
+        self._probes: Dict[tuple, asyncio.Future] = {}  # (cache key, loop) -> probe in flight
+
+    def get(self, key: tuple) -> Optional[HealthVerdict]:
+        with self._lock:
+            entry = self._verdicts.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def put(self, key: tuple, verdict: HealthVerdict, ttl: float):
+        with self._lock:
+            self._verdicts[key] = (time.monotonic() + ttl, verdict)
+
+    def invalidate(self, key: Optional[tuple] = None):
+        with self._lock:
+            if key is None:
+                self._verdicts.clear()
+            else:
+                self._verdicts.pop(key, None)
+
+    def get_or_probe_sync(self, key: tuple, probe: Callable[[], HealthVerdict], ttl: float) -> HealthVerdict:
+        """Cached verdict, or ``probe()`` stored for ``ttl`` seconds (for blocking clients)."""
+        verdict = self.get(key)
+        if verdict is None:
+            verdict = probe()
+            self.put(key, verdict, ttl)
+        return verdict
+
+
+# Shared by every client in the process
+DEFAULT_CACHE = HealthCache()
+
+
+class _Timings:
+    """httpcore trace callback collecting connection phase timings."""
+
+    def __init__(self):
+        self.marks: Dict[str, float] = {}
+
+    async def __call__(self, event: str, info: dict):
+        self.marks[event] = time.perf_counter()
+
+    def span_ms(self, start: str, end: str) -> Optional[float]:
+        if start in self.marks and end in self.marks:
+            return round((self.marks[end] - self.marks[start]) * 1000, 2)
+        return None
+
+    def ttfb_ms(self) -> Optional[float]:
+        for version in ("http11", "http2"):
+            span = self.span_ms(f"{version}.send_request_headers.started",
+                                f"{version}.receive_response_headers.complete")
+            if span is not None:
+                return span
+        return None
+
+
+async def _resolve_ms(url: httpx.URL) -> Optional[float]:
+    """DNS lookup time for ``url``'s host (a cache-warm OS resolver makes repeats cheap)."""
+    started = time.perf_counter()
+    try:
+        await asyncio.get_running_loop().getaddrinfo(url.host, url.port or (443 if url.scheme == "https" else 80),
+                                                     type=socket.SOCK_STREAM)
+    except OSError:
+        return None
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+async def probe(http: httpx.AsyncClient, base_url: str, headers: Optional[Dict[str, str]] = None,
+                path: str = PROBE_PATH, resolve: bool = True) -> HealthVerdict:
+    """Send one probe request and time it; never raises for network errors."""
+    url = httpx.URL(base_url.rstrip("/") + path)
+    timings = _Timings()
+    dns_ms = await _resolve_ms(url) if resolve else None
+    started = time.perf_counter()
+    try:
+        response = await http.get(url, headers=headers, timeout=PROBE_TIMEOUT,
+                                  extensions={"trace": timings, **NO_RETRY})
+    except httpx.HTTPError as e:
+        return HealthVerdict(False, error=repr(e), latency_ms=round((time.perf_counter() - started) * 1000, 2),
+                             dns_ms=dns_ms)
+    return HealthVerdict(
+        verdict_from_status(response.status_code), status_code=response.status_code,
+        error=None if verdict_from_status(response.status_code) else f"HTTP {response.status_code}",
+        latency_ms=round((time.perf_counter() - started) * 1000, 2), dns_ms=dns_ms,
+        connect_ms=timings.span_ms("connection.connect_tcp.started", "connection.connect_tcp.complete"),
+        tls_ms=timings.span_ms("connection.start_tls.started", "connection.start_tls.complete"),
+        ttfb_ms=timings.ttfb_ms())
+
+
+async def check_health(http: httpx.AsyncClient, base_url: str, headers: Optional[Dict[str, str]] = None, *,
+                       ttl: float = DEFAULT_TTL, cache: HealthCache = DEFAULT_CACHE,
+                       force: bool = False) -> HealthVerdict:
+    """
+    Cached health verdict for ``base_url`` and ``headers``, probing when it is missing or stale.
+
+    Concurrent callers on one event loop share a single probe.
+    """
+    url = base_url.rstrip("/")
+    key = cache_key(url, headers)
+    if not force:
+        verdict = cache.get(key)
+        if verdict is not None:
+            return verdict
+    probe_key = (key, asyncio.get_running_loop())
+    pending = cache._probes.get(probe_key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+    future = asyncio.get_running_loop().create_future()
+    cache._probes[probe_key] = future
+    try:
+        verdict = await probe(http, url, headers)
+        cache.put(key, verdict, ttl)
+        future.set_result(verdict)
+    except BaseException as e:
+        future.set_exception(e)
+        # Marks the exception retrieved when no other caller was waiting
+        future.exception()
+        raise
+    finally:
+        del cache._probes[probe_key]
+    if not verdict.healthy:
+        logger.warning("API health check failed for %s: %s", url, verdict.error)
+    return verdict
+
+
+async def warm_up(http: httpx.AsyncClient, base_url: str, headers: Optional[Dict[str, str]] = None, *,
+                  connections: int = 4, ttl: float = DEFAULT_TTL,
+                  cache: HealthCache = DEFAULT_CACHE) -> List[HealthVerdict]:
+    """
+    Open ``connections`` pooled connections to ``base_url`` concurrently.
+
+    Each probe runs on its own new connection, which then stays in the pool
+    (up to the client's keep-alive limit). The first verdict also refreshes
+    the health cache.
+
+    Returns:
+        One verdict per connection, with its DNS/connect/TLS/TTFB timings
+    """
+    url = base_url.rstrip("/")
+    verdicts = await asyncio.gather(*(probe(http, url, headers, resolve=i == 0) for i in range(connections)))
+    cache.put(cache_key(url, headers), verdicts[0], ttl)
+    connected = [v.connect_ms for v in verdicts if v.connect_ms is not None]
+    logger.info("Warmed %d connections to %s (connect %s ms, TLS %s ms, DNS %s ms)", len(connected), url,
+                max(connected, default=None), verdicts[0].tls_ms, verdicts[0].dns_ms)
+    return list(verdicts)
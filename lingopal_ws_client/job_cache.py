@@ -0,0 +1,205 @@
+"""
+Content-addressed cache of completed jobs.
+
+Jobs are keyed by a SHA-256 of the input bytes (hashed in a streaming pass,
+so large audio never sits in memory) or, for presigned URLs, by the
+normalized S3 location without its signature query, together with the job
+type and parameters. A hit returns the earlier job ID together with copies of
+its downloaded artifacts, so re-submitting identical audio costs nothing.
+
+The index is a SQLite database next to the cached artifacts. Entries older
+than ``max_age`` are dropped, and the least recently used entries are evicted
+once the artifacts exceed ``max_bytes``.
+
+Example:
+    cache = JobCache("~/.cache/lingopal/jobs", max_bytes=10 << 30)
+    async with AsyncTranscribeTranslateClient(api_base_url, api_key, cache=cache) as client:
+        job_id = await client.start_transcription(audio_file_path="talk.mp3")  # instant on a hit
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from typing import Dict, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1 << 20
+DEFAULT_CACHE_DIR = os.path.join("~", ".cache", "lingopal", "jobs")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    key TEXT PRIMARY KEY,
+    job_type TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    size INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_last_used ON jobs (last_used);
+CREATE TABLE IF NOT EXISTS artifacts (
+    key TEXT NOT NULL REFERENCES jobs (key) ON DELETE CASCADE,
+    file_type TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (key, file_type)
+);
+"""
+
+
+def hash_file(path: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def normalize_s3_url(url: str) -> str:
+    """
+    Stable identity of a presigned S3 URL: ``s3://<bucket>/<key>``.
+
+    The query (signature, expiry) changes on every presign and is dropped.
+    Virtual-hosted (``bucket.s3.region.amazonaws.com/key``) and path-style
+    (``s3.region.amazonaws.com/bucket/key``) URLs normalize to the same value;
+    other hosts keep ``<host>/<path>``.
+    """
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    path = parts.path.lstrip("/")
+    if host.endswith(".amazonaws.com"):
+        if host.startswith("s3.") or host.startswith("s3-") or host == "s3.amazonaws.com":
+            return f"s3://{path}"
+        bucket = host.split(".s3", 1)[0]
+        return f"s3://{bucket}/{path}"
+    return f"{host}/{path}"
+
+
+def cache_key(job_type: str, source: str, **params) -> str:
+    """Key for a job on ``source`` (content hash or normalized URL) with ``params``."""
+    payload = json.dumps({"job_type": job_type, "source": source, "params": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def source_identity(file_path: Optional[str] = None, s3_presigned_url: Optional[str] = None) -> str:
+    """Content hash of a local file or the normalized location of a presigned URL."""
+    if file_path:
+        return "sha256:" + hash_file(file_path)
+    return normalize_s3_url(s3_presigned_url)
+
+
+class CacheEntry(NamedTuple):
+    key: str
+    job_type: str
+    job_id: str
+    created: float
+    files: Dict[str, str]
+
+
+class JobCache:
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = 5 << 30,
+                 max_age: float = 30 * 86400):
+        """
+        Args:
+            directory: Cache directory (index.sqlite plus one directory of artifacts per job)
+            max_bytes: Evict least recently used entries once artifacts exceed this size
+            max_age: Entries older than this many seconds are treated as misses and evicted
+        """
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(self.directory, "index.sqlite"))
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.executescript(SCHEMA)
+
+    def _artifact_dir(self, key: str) -> str:
+        return os.path.join(self.directory, "artifacts", key[:2], key)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Cached job for ``key``, or None if absent, expired or missing artifacts."""
+        row = self._db.execute("SELECT job_type, job_id, created FROM jobs WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        job_type, job_id, created = row
+        files = dict(self._db.execute("SELECT file_type, path FROM artifacts WHERE key = ?", (key,)))
+        if time.time() - created > self.max_age or not all(os.path.exists(p) for p in files.values()):
+            self.remove(key)
+            self.misses += 1
+            return None
+        with self._db:
+            self._db.execute("UPDATE jobs SET last_used = ? WHERE key = ?", (time.time(), key))
+        self.hits += 1
+        return CacheEntry(key, job_type, job_id, created, files)
+
+    def put(self, key: str, job_type: str, job_id: str, files: Optional[Dict[str, str]] = None):
+        """
+        Record a completed job, copying ``files`` (file type -> path) into the cache.
+
+        Calling it again for the same key adds artifacts to the existing entry.
+        """
+        now = time.time()
+        stored = {}
+        if files:
+            artifact_dir = self._artifact_dir(key)
+            os.makedirs(artifact_dir, exist_ok=True)
+            for file_type, path in files.items():
+                target = os.path.join(artifact_dir, file_type + os.path.splitext(path)[1])
+                shutil.copyfile(path, target)
+                stored[file_type] = target
+        with self._db:
+            self._db.execute(
+                "INSERT INTO jobs (key, job_type, job_id, created, last_used) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET job_id = excluded.job_id, last_used = excluded.last_used",
+                (key, job_type, job_id, now, now))
+            self._db.executemany(
+                "INSERT OR REPLACE INTO artifacts (key, file_type, path, size) VALUES (?, ?, ?, ?)",
+                [(key, file_type, path, os.path.getsize(path)) for file_type, path in stored.items()])
+            self._db.execute("UPDATE jobs SET size = (SELECT COALESCE(SUM(size), 0) FROM artifacts "
+                             "WHERE artifacts.key = jobs.key) WHERE key = ?", (key,))
+        self.evict()
+
+    def remove(self, key: str):
+        with self._db:
+            self._db.execute("DELETE FROM jobs WHERE key = ?", (key,))
+        shutil.rmtree(self._artifact_dir(key), ignore_errors=True)
+
+    @property
+    def size(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM jobs").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently used ones until under ``max_bytes``."""
+        evicted = 0
+        expired = self._db.execute("SELECT key FROM jobs WHERE created < ?",
+                                   (time.time() - self.max_age,)).fetchall()
+        for (key,) in expired:
+            self.remove(key)
+            evicted += 1
+        total = self.size
+        if total > self.max_bytes:
+            for key, size in self._db.execute("SELECT key, size FROM jobs WHERE size > 0 ORDER BY last_used").fetchall():
+                if total <= self.max_bytes:
+                    break
+                self.remove(key)
+                total -= size
+                evicted += 1
+        if evicted:
+            logger.info("Evicted %d cached jobs (%d bytes cached)", evicted, total)
+        return evicted
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,407 @@
+"""
+Async client for the transcription & translation job API.
+
+Same surface as ``TranscribeTranslateClient`` in
+examples/translation_transcription_examples/transcribe_and_translate.py, built on a
+pooled ``httpx.AsyncClient`` so status polls, result fetches and downloads reuse
+keep-alive connections and many jobs can run concurrently in one process.
+
+Example:
+    async with AsyncTranscribeTranslateClient(api_base_url, api_key) as client:
+        job_ids = await asyncio.gather(*(client.start_transcription(audio_file_path=p) for p in paths))
+
+Usage:
+    python -m lingopal_ws_client.jobs transcribe talk.mp3 --output-dir downloads
+    python -m lingopal_ws_client.jobs translate talk.srt --languages es,fr
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+from typing import Dict, Iterable, List, Optional
+
+import httpx
+
+from lingopal_ws_client.downloads import download_all
+from lingopal_ws_client.health import DEFAULT_TTL, HealthVerdict, check_health, warm_up
+from lingopal_ws_client.job_cache import JobCache, cache_key, source_identity
+from lingopal_ws_client.poller import JobPoller, PollSchedule
+from lingopal_ws_client.transport import ResilientTransport, TransportPolicy
+from lingopal_ws_client.uploads import ChunkedUploader
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0)
+DEFAULT_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+# CLI command -> job type
+JOB_TYPES = {"transcribe": "transcription", "translate": "translation"}
+
+
+def result_file_extension(file_type: str, url: str) -> str:
+    """File extension for a result artifact, matching the sync client's naming."""
+    path = url.split("?", 1)[0]
+    if file_type in ("transcript", "diarization") or path.endswith(".srt"):
+        return ".srt"
+    if file_type == "vtt" or path.endswith(".vtt"):
+        return ".vtt"
+    if file_type == "json" or path.endswith(".json"):
+        return ".json"
+    if file_type == "original_audio" or path.endswith((".mp3", ".wav", ".m4a")):
+        for extension in (".mp3", ".wav", ".m4a"):
+            if extension in url:
+                return extension
+        return ".mp3"
+    return ".txt"
+
+
+class AsyncTranscribeTranslateClient:
+    def __init__(self, api_base_url: str, api_key: Optional[str] = None, *,
+                 limits: httpx.Limits = DEFAULT_LIMITS,
+                 timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+                 http2: bool = False,
+                 http_client: Optional[httpx.AsyncClient] = None,
+                 poll_schedule: PollSchedule = PollSchedule(),
+                 cache: Optional[JobCache] = None,
+                 upload_chunk_size: Optional[int] = None,
+                 transport_policy: Optional[TransportPolicy] = None):
+        """
+        Initialize the client
+
+        Args:
+            api_base_url: Base URL of the API (e.g., "http://localhost:8000")
+            api_key: Optional API key for authentication
+            limits: Connection pool limits (max connections, keep-alive connections, expiry)
+            timeout: Request timeouts
+            http2: Negotiate HTTP/2 where the server supports it (needs ``httpx[http2]``)
+            http_client: Existing AsyncClient to share a pool with other clients;
+                it is not closed by ``close()``
+            poll_schedule: Adaptive status-poll intervals for ``wait_for_job_completion``
+            cache: Reuse completed jobs (and their downloaded files) for identical inputs
+            upload_chunk_size: Upload audio files through resumable upload sessions in
+                chunks of this many bytes (see ``lingopal_ws_client.uploads``) instead of
+                one multipart request
+            transport_policy: Rate limit, retries and circuit breaker for API requests
+                (see ``lingopal_ws_client.transport``); share one policy between
+                clients calling the same API. Not applied to ``http_client``.
+        """
+        self.api_base_url = api_base_url.rstrip('/')
+        self.api_key = api_key
+        self.headers = {'X-API-Key': api_key} if api_key else {}
+        # One scheduler polls every job this client is waiting for
+        self.poller = JobPoller(self.get_job_status, poll_schedule)
+        self.cache = cache
+        self._cache_keys: Dict[str, tuple] = {}  # job_id -> (cache key, job type)
+        self._cache_hits = set()
+        self.transport_policy = transport_policy if transport_policy is not None else TransportPolicy()
+        if http_client is not None:
+            self.http = http_client
+            self._owns_http = False
+        else:
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    raise ImportError("HTTP/2 needs the h2 package. Install with: pip install 'httpx[http2]'")
+            # The API key is sent per request so it never leaks to presigned download URLs,
+            # and presigned downloads bypass the API's rate limit and breaker
+            transport = ResilientTransport(self.transport_policy, hosts={httpx.URL(self.api_base_url).host},
+                                           limits=limits, http2=http2)
+            self.http = httpx.AsyncClient(transport=transport, timeout=timeout)
+            self._owns_http = True
+        self.uploader = None
+        if upload_chunk_size:
+            self.uploader = ChunkedUploader(self.http, self.api_base_url, self.headers, chunk_size=upload_chunk_size)
+
+    async def close(self):
+        await self.poller.close()
+        if self._owns_http:
+            await self.http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict:
+        """Make HTTP request to the API"""
+        url = f"{self.api_base_url}{endpoint}"
+        kwargs['headers'] = {**kwargs.get('headers', {}), **self.headers}
+        try:
+            response = await self.http.request(method, url, **kwargs)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            logger.error("API request failed: %s %s -> %s: %s", method, endpoint,
+                         e.response.status_code, e.response.text)
+            raise
+        except httpx.HTTPError as e:
+            logger.error("API request failed: %s %s: %r", method, endpoint, e)
+            raise
+
+    async def _cached_job(self, job_type: str, file_path: Optional[str], s3_presigned_url: Optional[str],
+                          **params) -> tuple:
+        """(cache key, cached job ID or None) for a job about to be submitted."""
+        # Hashing large audio is disk-bound: keep it off the event loop
+        source = await asyncio.to_thread(source_identity, file_path, s3_presigned_url)
+        key = cache_key(job_type, source, **params)
+        entry = self.cache.get(key)
+        if entry is None:
+            return key, None
+        logger.info("Reusing cached %s job %s", job_type, entry.job_id)
+        self._cache_keys[entry.job_id] = (key, job_type)
+        self._cache_hits.add(entry.job_id)
+        return key, entry.job_id
+
+    async def health_check(self, ttl: float = DEFAULT_TTL, force: bool = False) -> bool:
+        """
+        Check that the API is reachable and accepts the API key.
+
+        The verdict is cached per API base URL and key for ``ttl`` seconds and shared by
+        every client in the process (see ``lingopal_ws_client.health``).
+        """
+        verdict = await check_health(self.http, self.api_base_url, self.headers, ttl=ttl, force=force)
+        return verdict.healthy
+
+    async def warm_up(self, connections: int = 4) -> List[HealthVerdict]:
+        """
+        Open ``connections`` pooled connections to the API ahead of a batch.
+
+        DNS, TCP and TLS setup is paid here instead of by the first requests.
+        Connections beyond the pool's keep-alive limit are closed again.
+
+        Returns:
+            One verdict per connection, with its connection phase timings
+        """
+        return await warm_up(self.http, self.api_base_url, self.headers, connections=connections)
+
+    async def start_transcription(self, audio_file_path: str = None, s3_presigned_url: str = None) -> str:
+        """
+        Start transcription job
+
+        Args:
+            audio_file_path: Path to the audio file (optional if s3_presigned_url is provided)
+            s3_presigned_url: S3 presigned URL for audio file (optional if audio_file_path is provided)
+
+        Returns:
+            Job ID
+        """
+        if not audio_file_path and not s3_presigned_url:
+            raise ValueError("Either audio_file_path or s3_presigned_url must be provided")
+        if audio_file_path and s3_presigned_url:
+            raise ValueError("Provide either audio_file_path OR s3_presigned_url, not both")
+
+        if self.cache is not None:
+            key, job_id = await self._cached_job("transcription", audio_file_path, s3_presigned_url)
+            if job_id is not None:
+                return job_id
+
+        if s3_presigned_url:
+            response = await self._make_request('POST', '/api/v1/transcribe',
+                                                data={'s3_presigned_url': s3_presigned_url})
+        else:
+            if not os.path.exists(audio_file_path):
+                raise FileNotFoundError(f"Audio file not found: {audio_file_path}")
+            if self.uploader is not None:
+                upload_id, _ = await self.uploader.upload(audio_file_path)
+                response = await self._make_request('POST', '/api/v1/transcribe', data={'upload_id': upload_id})
+            else:
+                with open(audio_file_path, 'rb') as f:
+                    files = {'file': (os.path.basename(audio_file_path), f, 'audio/mpeg')}
+                    response = await self._make_request('POST', '/api/v1/transcribe', files=files)
+
+        job_id = response['job_id']
+        if self.cache is not None:
+            self._cache_keys[job_id] = (key, "transcription")
+        logger.info("Transcription job started: %s", job_id)
+        return job_id
+
+    async def start_translation(self, srt_file_path: str = None, s3_presigned_url: str = None,
+                                target_languages: List[str] = None) -> str:
+        """
+        Start translation job
+
+        Args:
+            srt_file_path: Path to the SRT file (optional if s3_presigned_url is provided)
+            s3_presigned_url: S3 presigned URL for SRT file (optional if srt_file_path is provided)
+            target_languages: List of target language codes (default: ["es", "fr", "de"])
+
+        Returns:
+            Job ID
+        """
+        if not srt_file_path and not s3_presigned_url:
+            raise ValueError("Either srt_file_path or s3_presigned_url must be provided")
+        if srt_file_path and s3_presigned_url:
+            raise ValueError("Provide either srt_file_path OR s3_presigned_url, not both")
+        if target_languages is None:
+            target_languages = ["es", "fr", "de"]
+        data = {'languages': ','.join(target_languages)}
+        if self.cache is not None:
+            key, job_id = await self._cached_job("translation", srt_file_path, s3_presigned_url,
+                                                 languages=sorted(target_languages))
+            if job_id is not None:
+                return job_id
+
+        if s3_presigned_url:
+            data['s3_presigned_url'] = s3_presigned_url
+            response = await self._make_request('POST', '/api/v1/translate', data=data)
+        else:
+            if not os.path.exists(srt_file_path):
+                raise FileNotFoundError(f"SRT file not found: {srt_file_path}")
+            with open(srt_file_path, 'rb') as f:
+                files = {'file': (os.path.basename(srt_file_path), f, 'text/plain')}
+                response = await self._make_request('POST', '/api/v1/translate', files=files, data=data)
+
+        job_id = response['job_id']
+        if self.cache is not None:
+            self._cache_keys[job_id] = (key, "translation")
+        logger.info("Translation job started: %s", job_id)
+        return job_id
+
+    async def get_job_status(self, job_id: str) -> Dict:
+        return await self._make_request('GET', f'/api/v1/jobs/{job_id}/status')
+
+    async def wait_for_job_completion(self, job_id: str, job_type: str = "job", timeout_minutes: int = 30, *,
+                                      raise_on_timeout: bool = False) -> bool:
+        """
+        Wait for job completion
+
+        Args:
+            job_id: Job ID to monitor
+            job_type: Type of job for logging ("transcription" or "translation")
+            timeout_minutes: Maximum time to wait in minutes
+            raise_on_timeout: Raise asyncio.TimeoutError instead of returning False
+                when the job is still running after ``timeout_minutes``
+
+        Returns:
+            True if job completed successfully, False if failed or timed out
+        """
+        if job_id in self._cache_hits:
+            return True
+        try:
+            status_response = await self.poller.wait(job_id, timeout_minutes * 60)
+        except asyncio.TimeoutError:
+            logger.error("%s job %s timed out after %s minutes", job_type.capitalize(), job_id, timeout_minutes)
+            if raise_on_timeout:
+                raise
+            return False
+        if status_response['status'] == 'completed':
+            logger.info("%s job %s completed", job_type.capitalize(), job_id)
+            if job_id in self._cache_keys:
+                self.cache.put(*self._cache_keys[job_id], job_id)
+            return True
+        logger.error("%s job %s failed: %s", job_type.capitalize(), job_id, status_response.get('message', ''))
+        return False
+
+    async def get_job_result_urls(self, job_id: str) -> Dict[str, str]:
+        """
+        Get S3 download URLs for job results without downloading
+
+        Returns:
+            Dictionary mapping file types to S3 URLs
+        """
+        try:
+            result_response = await self._make_request('GET', f'/api/v1/jobs/{job_id}/result')
+        except httpx.HTTPError:
+            return {}
+        return {file_type: url for file_type, url in result_response.get('download_urls', {}).items() if url}
+
+    async def download_job_results(self, job_id: str, output_dir: str = "downloads", *,
+                                   download_urls: Optional[Dict[str, str]] = None,
+                                   file_types: Optional[Iterable[str]] = None,
+                                   checksums: Optional[Dict[str, str]] = None,
+                                   concurrency: int = 4) -> Dict[str, str]:
+        """
+        Download job results into ``<output_dir>/<job_id>/``
+
+        Files are fetched concurrently, streamed to ``.part`` files, resumed
+        with Range requests after interruptions and renamed into place when
+        complete (see ``lingopal_ws_client.downloads``).
+        For a cached job, artifacts already in the cache are copied and only
+        the missing file types are downloaded.
+
+        Args:
+            job_id: Job ID
+            output_dir: Directory to save downloaded files
+            download_urls: URLs from an earlier ``get_job_result_urls`` call (skips the /result request)
+            file_types: Only download these file types, e.g. ``["transcript", "vtt"]``
+            checksums: Optional file type -> ``"<algorithm>:<hexdigest>"`` to verify
+            concurrency: Maximum simultaneous downloads
+
+        Returns:
+            Dictionary mapping file types to local file paths
+        """
+        job_dir = os.path.join(output_dir, job_id)
+        wanted = set(file_types) if file_types is not None else None
+        files = {}
+        if job_id in self._cache_hits:
+            cached = self.cache.get(self._cache_keys[job_id][0])
+            if cached is not None and cached.files:
+                await asyncio.to_thread(os.makedirs, job_dir, exist_ok=True)
+                copies = {file_type: path for file_type, path in cached.files.items()
+                          if wanted is None or file_type in wanted}
+                targets = await asyncio.gather(*(asyncio.to_thread(shutil.copy, path, job_dir)
+                                                 for path in copies.values()))
+                files = dict(zip(copies, targets))
+                # Without file_types only the /result URLs tell which artifacts are missing
+                if wanted is not None and wanted <= files.keys():
+                    return files
+        if download_urls is None:
+            download_urls = await self.get_job_result_urls(job_id)
+        missing = [file_type for file_type in download_urls
+                   if file_type not in files and (wanted is None or file_type in wanted)]
+        if not missing:
+            return files
+        downloaded = await download_all(self.http, download_urls, job_dir,
+                                        lambda file_type, url: f"{file_type}{result_file_extension(file_type, url)}",
+                                        file_types=missing, checksums=checksums, concurrency=concurrency)
+        if job_id in self._cache_keys and downloaded:
+            self.cache.put(*self._cache_keys[job_id], job_id, downloaded)
+        return {**files, **downloaded}
+
+
+async def _main(args):
+    if args.source.startswith(("http://", "https://")):
+        source = {"s3_presigned_url": args.source}
+    elif args.command == "transcribe":
+        source = {"audio_file_path": args.source}
+    else:
+        source = {"srt_file_path": args.source}
+    async with AsyncTranscribeTranslateClient(args.api_base_url, args.api_key) as client:
+        if args.command == "transcribe":
+            job_id = await client.start_transcription(**source)
+        else:
+            job_id = await client.start_translation(**source, target_languages=args.languages.split(","))
+        print(job_id)
+        if args.no_wait:
+            return 0
+        if not await client.wait_for_job_completion(job_id, JOB_TYPES[args.command], args.timeout):
+            return 1
+        files = await client.download_job_results(job_id, args.output_dir)
+    for file_type, path in files.items():
+        print(f"  {file_type}: {path}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    parser = argparse.ArgumentParser(prog=prog, description="Run one transcription or translation job")
+    commands = parser.add_subparsers(dest="command", required=True)
+    transcribe = commands.add_parser("transcribe", help="Transcribe an audio file or presigned URL")
+    transcribe.add_argument("source", help="Audio file, or presigned URL of one")
+    translate = commands.add_parser("translate", help="Translate an SRT file or presigned URL")
+    translate.add_argument("source", help="SRT file, or presigned URL of one")
+    translate.add_argument("--languages", default="es,fr,de", help="Comma-separated target languages")
+    for command in (transcribe, translate):
+        command.add_argument("--output-dir", default="downloads", help="Results go to <output-dir>/<job_id>/")
+        command.add_argument("--no-wait", action="store_true", help="Print the job ID and exit")
+        command.add_argument("--timeout", type=int, default=int(os.getenv("JOB_TIMEOUT", "30")),
+                             help="Job timeout in minutes")
+        command.add_argument("--api-base-url", default=os.getenv("API_BASE_URL", "http://34.212.19.243:8000"))
+        command.add_argument("--api-key", default=os.getenv("API_KEY"))
+    raise SystemExit(asyncio.run(_main(parser.parse_args(argv))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Append-only job journal, so a crashed batch can resume.
+
+Every submission, status transition and download is appended as one JSON line
+and flushed right away, which makes it safe against the process dying. Lines
+are fsynced in batches (every ``fsync_every`` records or ``fsync_interval``
+seconds, and on close), which bounds what a power loss can lose without an
+fsync per job.
+
+``JobJournal.load`` replays the file into the latest state per item; a
+truncated final line (the crash happened mid-write) is ignored.
+
+Events::
+
+    {"event": "submitted", "key": ..., "job_id": ..., "job_type": ..., "audio_file_path": ..., "s3_presigned_url": ...}
+    {"event": "status", "key": ..., "job_id": ..., "status": "completed" | "failed" | "timeout"}
+    {"event": "downloaded", "key": ..., "job_id": ..., "files": {...}}
+    {"event": "done", "key": ..., "record": {...}}
+"""
+
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SUBMITTED = "submitted"
+STATUS = "status"
+DOWNLOADED = "downloaded"
+DONE = "done"
+
+
+@dataclass
+class JournalEntry:
+    key: str
+    job_id: Optional[str] = None
+    job_type: Optional[str] = None
+    audio_file_path: Optional[str] = None
+    s3_presigned_url: Optional[str] = None
+    status: Optional[str] = None
+    files: Optional[Dict[str, str]] = None
+    done: bool = False
+    record: dict = field(default_factory=dict)
+
+    @property
+    def in_flight(self) -> bool:
+        """Submitted, but not yet finished."""
+        return self.job_id is not None and not self.done
+
+
+class JobJournal:
+    def __init__(self, path: str, fsync_every: int = 64, fsync_interval: float = 1.0):
+        """
+        Args:
+            path: JSONL journal file (appended to; created if missing)
+            fsync_every: fsync after this many unsynced records
+            fsync_interval: fsync when the oldest unsynced record is this many seconds old
+        """
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._file = open(path, "a", encoding="utf-8")
+        self._unsynced = 0
+        # Terminate a line torn by a crash so the next record is not glued onto it
+        if self._file.tell() and not self._ends_with_newline():
+            self._file.write("\n")
+            self._file.flush()
+        self._last_sync = time.monotonic()
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def record(self, event: str, key: str, **fields):
+        """Append one event for ``key``."""
+        line = json.dumps({"ts": round(time.time(), 3), "event": event, "key": key, **fields})
+        self._file.write(line + "\n")
+        self._file.flush()
+        self._unsynced += 1
+        if (self._unsynced >= self.fsync_every
+                or time.monotonic() - self._last_sync >= self.fsync_interval):
+            self.sync()
+
+    def sync(self):
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @staticmethod
+    def load(path: str) -> Dict[str, JournalEntry]:
+        """Replay a journal into the latest state per key ({} if the file does not exist)."""
+        entries: Dict[str, JournalEntry] = {}
+        if not os.path.exists(path):
+            return entries
+        with open(path, encoding="utf-8") as f:
+            for number, line in enumerate(f, start=1):
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Ignoring unreadable journal line %d in %s", number, path)
+                    continue
+                key = event["key"]
+                entry = entries.get(key)
+                if entry is None:
+                    entry = entries[key] = JournalEntry(key)
+                kind = event["event"]
+                if kind == SUBMITTED:
+                    entry.job_id = event["job_id"]
+                    entry.job_type = event.get("job_type")
+                    entry.audio_file_path = event.get("audio_file_path")
+                    entry.s3_presigned_url = event.get("s3_presigned_url")
+                    entry.status = SUBMITTED
+                    entry.files = None
+                    entry.done = False
+                elif kind == STATUS:
+                    entry.status = event["status"]
+                elif kind == DOWNLOADED:
+                    entry.files = event["files"]
+                elif kind == DONE:
+                    entry.done = True
+                    entry.record = event.get("record", {})
+        return entries
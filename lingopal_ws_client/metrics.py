@@ -0,0 +1,286 @@
+"""
+Latency and throughput metrics for transcription streams.
+
+StreamMetrics is updated from the receive loop of ``connect_to_server``; the
+per-message cost is one clock read, a few integer updates and a bisect into a
+fixed bucket list. MetricsRegistry groups the metrics of many streams and
+renders them in the Prometheus text format, optionally over HTTP.
+"""
+
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, Optional
+
+# Bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+GAP_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+
+logger = logging.getLogger(__name__)
+
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus style) with approximate quantiles."""
+
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds: Iterable[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-quantile by interpolating inside its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(estimate, self.max)
+            seen += bucket_count
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "max": self.max if self.count else None,
+        }
+
+
+class StreamMetrics:
+    """
+    Timing and throughput for one stream.
+
+    Args:
+        ping_interval: Seconds between RTT samples while connected; None disables pinging
+
+    ``bytes`` counts the payload size of each frame; text frames are counted by
+    their UTF-8 encoded length.
+    """
+
+    def __init__(self, ping_interval: Optional[float] = 15.0):
+        self.ping_interval = ping_interval
+        self.created = time.monotonic()
+        self.connects = 0
+        self.connect_time: Optional[float] = None
+        self.messages = 0
+        self.bytes = 0
+        self.last_message_at: Optional[float] = None
+        self.ping_rtt: Optional[float] = None
+        self.pings = Histogram(LATENCY_BUCKETS)
+        self.handshakes = Histogram(LATENCY_BUCKETS)
+        self.gaps = Histogram(GAP_BUCKETS)
+        self.server_latency = Histogram(LATENCY_BUCKETS)
+        self._rate_mark = (self.created, 0, 0)
+
+    def on_connect(self, handshake_seconds: float):
+        self.connects += 1
+        self.connect_time = handshake_seconds
+        self.handshakes.observe(handshake_seconds)
+        # A reconnect gap is an outage, not an inter-arrival gap
+        self.last_message_at = None
+
+    def on_message(self, message):
+        now = time.monotonic()
+        last = self.last_message_at
+        if last is not None:
+            self.gaps.observe(now - last)
+        self.last_message_at = now
+        self.messages += 1
+        # Text frames arrive decoded: count their UTF-8 size, not characters
+        if isinstance(message, str) and not message.isascii():
+            self.bytes += len(message.encode())
+        else:
+            self.bytes += len(message)
+
+    def observe_server_timestamp(self, timestamp):
+        """Record receive latency for a payload timestamp (epoch seconds or milliseconds)."""
+        if timestamp is None:
+            return
+        try:
+            timestamp = float(timestamp)
+        except (TypeError, ValueError):
+            return
+        if timestamp > 1e11:
+            timestamp /= 1000.0
+        latency = time.time() - timestamp
+        if latency >= 0:
+            self.server_latency.observe(latency)
+
+    async def sample_pings(self, websocket):
+        """Ping ``websocket`` every ``ping_interval`` seconds until cancelled or closed."""
+        if not self.ping_interval:
+            return
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            start = time.monotonic()
+            try:
+                pong_waiter = await websocket.ping()
+                await pong_waiter
+            except Exception:
+                return
+            self.ping_rtt = time.monotonic() - start
+            self.pings.observe(self.ping_rtt)
+
+    def _rates_since(self, mark: tuple, now: float) -> dict:
+        mark_time, mark_messages, mark_bytes = mark
+        elapsed = max(now - mark_time, 1e-9)
+        return {
+            "messages_per_sec": (self.messages - mark_messages) / elapsed,
+            "bytes_per_sec": (self.bytes - mark_bytes) / elapsed,
+        }
+
+    def rates(self) -> dict:
+        """
+        Messages/sec and bytes/sec since the previous call (or since creation).
+
+        Each call starts a new window, so only one consumer should call this;
+        ``snapshot()`` reports averages since creation and leaves the window alone.
+        """
+        now = time.monotonic()
+        rates = self._rates_since(self._rate_mark, now)
+        self._rate_mark = (now, self.messages, self.bytes)
+        return rates
+
+    def snapshot(self) -> dict:
+        """Counters, average rates since creation and histogram summaries; has no side effects."""
+        return {
+            "connects": self.connects,
+            "connect_time": self.connect_time,
+            "ping_rtt": self.ping_rtt,
+            "messages": self.messages,
+            "bytes": self.bytes,
+            **self._rates_since((self.created, 0, 0), time.monotonic()),
+            "inter_arrival": self.gaps.summary(),
+            "server_latency": self.server_latency.summary(),
+            "ping": self.pings.summary(),
+        }
+
+
+def _label(value) -> str:
+    """Escape a Prometheus label value (backslash, double quote and newline)."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """
+    StreamMetrics for many streams, with Prometheus text rendering.
+
+    Example:
+        registry = MetricsRegistry()
+        pool = StreamPool(api_key, metrics=registry)
+        await registry.serve_prometheus(port=9108)
+    """
+
+    def __init__(self, ping_interval: Optional[float] = 15.0):
+        self.ping_interval = ping_interval
+        self.streams: Dict[str, StreamMetrics] = {}
+        self.gap_stats: Dict[str, object] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def stream(self, stream_id: str, gap_stats=None) -> StreamMetrics:
+        metrics = self.streams.get(stream_id)
+        if metrics is None:
+            metrics = self.streams[stream_id] = StreamMetrics(self.ping_interval)
+        if gap_stats is not None:
+            self.gap_stats[stream_id] = gap_stats
+        return metrics
+
+    def remove(self, stream_id: str):
+        self.streams.pop(stream_id, None)
+        self.gap_stats.pop(stream_id, None)
+
+    def snapshot(self) -> dict:
+        return {stream_id: metrics.snapshot() for stream_id, metrics in self.streams.items()}
+
+    def render_prometheus(self) -> str:
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def scalar(name, kind, help_text, attr):
+            family(name, kind, help_text)
+            for stream_id, metrics in self.streams.items():
+                value = getattr(metrics, attr)
+                if value is not None:
+                    lines.append(f'{name}{{stream_id="{_label(stream_id)}"}} {value}')
+
+        def histogram(name, help_text, attr):
+            family(name, "histogram", help_text)
+            for stream_id, metrics in self.streams.items():
+                hist = getattr(metrics, attr)
+                label = _label(stream_id)
+                cumulative = 0
+                for bound, bucket_count in zip(hist.bounds, hist.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{{stream_id="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{stream_id="{label}",le="+Inf"}} {hist.count}')
+                lines.append(f'{name}_sum{{stream_id="{label}"}} {hist.sum}')
+                lines.append(f'{name}_count{{stream_id="{label}"}} {hist.count}')
+
+        scalar("lingopal_messages_total", "counter", "Messages received", "messages")
+        scalar("lingopal_bytes_total", "counter", "Frame bytes received", "bytes")
+        scalar("lingopal_connects_total", "counter", "Successful connections", "connects")
+        scalar("lingopal_connect_seconds", "gauge", "Last connect/handshake time", "connect_time")
+        scalar("lingopal_ping_rtt_seconds", "gauge", "Last ping round-trip time", "ping_rtt")
+        histogram("lingopal_inter_arrival_seconds", "Time between consecutive messages", "gaps")
+        histogram("lingopal_server_latency_seconds", "Payload timestamp to receive latency", "server_latency")
+        histogram("lingopal_ping_seconds", "Ping round-trip time", "pings")
+
+        if self.gap_stats:
+            family("lingopal_reconnects_total", "counter", "Reconnects after an outage")
+            for stream_id, stats in self.gap_stats.items():
+                lines.append(f'lingopal_reconnects_total{{stream_id="{_label(stream_id)}"}} {stats.reconnects}')
+            family("lingopal_dropped_seconds_total", "counter", "Time without captions due to outages")
+            for stream_id, stats in self.gap_stats.items():
+                lines.append(f'lingopal_dropped_seconds_total{{stream_id="{_label(stream_id)}"}} {stats.dropped_time}')
+        return "\n".join(lines) + "\n"
+
+    async def _handle_http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.split()
+            if len(parts) >= 2 and parts[1].split(b"?")[0] == b"/metrics":
+                body = self.render_prometheus().encode()
+                status = b"200 OK"
+            else:
+                body, status = b"Not Found\n", b"404 Not Found"
+            writer.write(b"HTTP/1.1 " + status + b"\r\n"
+                         b"Content-Type: text/plain; version=0.0.4\r\n"
+                         b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+                         b"Connection: close\r\n\r\n" + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve_prometheus(self, host: str = "127.0.0.1", port: int = 9108):
+        """Serve ``GET /metrics`` in the Prometheus text format until ``close()``."""
+        self._server = await asyncio.start_server(self._handle_http, host, port)
+        logger.info("Metrics available at http://%s:%s/metrics", host, port)
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
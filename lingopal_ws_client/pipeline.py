@@ -0,0 +1,111 @@
+"""
+Transcription -> translation pipeline chained on the server side.
+
+Instead of downloading the transcript SRT and uploading it again, the
+transcript's presigned URL from ``/api/v1/jobs/{id}/result`` is passed straight
+to ``start_translation(s3_presigned_url=...)``. Downloading the transcription
+results locally is optional and runs while the translation job is processing,
+so it is off the critical path.
+
+Example:
+    async with AsyncTranscribeTranslateClient(api_base_url, api_key) as client:
+        result = await transcribe_and_translate(client, audio_file_path="talk.mp3",
+                                                target_languages=["es", "fr"], output_dir="downloads")
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from lingopal_ws_client.jobs import AsyncTranscribeTranslateClient
+
+logger = logging.getLogger(__name__)
+
+# Result file types usable as translation input, in order of preference
+TRANSCRIPT_TYPES = ("transcript", "diarization")
+
+
+class PipelineError(RuntimeError):
+    pass
+
+
+@dataclass
+class PipelineResult:
+    transcription_job_id: str
+    translation_job_id: Optional[str] = None
+    transcript_type: Optional[str] = None
+    transcription_urls: Dict[str, str] = field(default_factory=dict)
+    transcription_files: Dict[str, str] = field(default_factory=dict)
+    translation_files: Dict[str, str] = field(default_factory=dict)
+
+
+def pick_transcript_url(download_urls: Dict[str, str]) -> Optional[Tuple[str, str]]:
+    """(file_type, url) of the SRT to translate: transcript, then diarization, then any .srt."""
+    for file_type in TRANSCRIPT_TYPES:
+        if download_urls.get(file_type):
+            return file_type, download_urls[file_type]
+    for file_type, url in download_urls.items():
+        if url and url.split("?", 1)[0].endswith(".srt"):
+            return file_type, url
+    return None
+
+
+async def transcribe_and_translate(client: AsyncTranscribeTranslateClient,
+                                   audio_file_path: str = None, s3_presigned_url: str = None,
+                                   target_languages: List[str] = None, *,
+                                   output_dir: Optional[str] = None,
+                                   download_transcription: bool = True,
+                                   download_translation: bool = True,
+                                   file_types: Optional[Iterable[str]] = None,
+                                   timeout_minutes: int = 30) -> PipelineResult:
+    """
+    Transcribe audio and translate the transcript without a local round trip.
+
+    Args:
+        client: Job API client
+        audio_file_path: Path to the audio file (optional if s3_presigned_url is provided)
+        s3_presigned_url: S3 presigned URL for the audio (optional if audio_file_path is provided)
+        target_languages: Target language codes (client default if None)
+        output_dir: Download results into ``<output_dir>/<job_id>/``; None downloads nothing
+        download_transcription: Download transcription results (in parallel with translation)
+        download_translation: Download translation results once translation completes
+        file_types: Only download these file types
+        timeout_minutes: Per-job completion timeout
+
+    Returns:
+        PipelineResult with both job IDs and any downloaded files
+
+    Raises:
+        PipelineError: A job failed or timed out, or there was no transcript to translate
+    """
+    transcription_job_id = await client.start_transcription(audio_file_path=audio_file_path,
+                                                            s3_presigned_url=s3_presigned_url)
+    result = PipelineResult(transcription_job_id)
+    if not await client.wait_for_job_completion(transcription_job_id, "transcription", timeout_minutes):
+        raise PipelineError(f"Transcription job {transcription_job_id} did not complete")
+
+    result.transcription_urls = await client.get_job_result_urls(transcription_job_id)
+    picked = pick_transcript_url(result.transcription_urls)
+    if picked is None:
+        raise PipelineError(f"Transcription job {transcription_job_id} returned no SRT: "
+                            f"{sorted(result.transcription_urls)}")
+    result.transcript_type, transcript_url = picked
+
+    download = None
+    if output_dir and download_transcription:
+        download = asyncio.ensure_future(client.download_job_results(
+            transcription_job_id, output_dir, download_urls=result.transcription_urls, file_types=file_types))
+    try:
+        result.translation_job_id = await client.start_translation(s3_presigned_url=transcript_url,
+                                                                   target_languages=target_languages)
+        if not await client.wait_for_job_completion(result.translation_job_id, "translation", timeout_minutes):
+            raise PipelineError(f"Translation job {result.translation_job_id} did not complete")
+        if output_dir and download_translation:
+            result.translation_files = await client.download_job_results(
+                result.translation_job_id, output_dir, file_types=file_types)
+    finally:
+        if download is not None:
+            # Keep the transcript files even if translation failed
+            result.transcription_files = await download
+    return result
@@ -0,0 +1,222 @@
+"""
+Shared adaptive poller for job status.
+
+One scheduler task tracks every in-flight job in a heap ordered by its next
+due time, instead of a sleep loop per job. Each job's interval adapts to the
+``progress`` the API reports: the expected remaining time (from progress rate
+so far) is halved and clamped, so short jobs are checked often and long jobs
+rarely. Intervals are jittered so jobs submitted together spread their polls,
+and back off exponentially on errors.
+
+Waiters for the same job share one future, so a job is polled once no matter
+how many coroutines are waiting for it.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = frozenset({"completed", "failed"})
+
+
+@dataclass(frozen=True)
+class PollSchedule:
+    """How often to poll a job, in seconds."""
+    initial_interval: float = 1.0
+    min_interval: float = 0.5
+    max_interval: float = 30.0
+    # Without progress information the interval grows with elapsed time
+    elapsed_fraction: float = 0.25
+    jitter: float = 0.2
+    error_multiplier: float = 2.0
+
+    def interval(self, elapsed: float, progress: Optional[float] = None, errors: int = 0) -> float:
+        """
+        Seconds until the next poll.
+
+        Args:
+            elapsed: Seconds since the job was first watched
+            progress: Last reported progress percentage (0-100), if any
+            errors: Consecutive failed polls
+        """
+        if errors:
+            try:
+                interval = self.initial_interval * self.error_multiplier ** errors
+            except OverflowError:
+                # A long run of failed polls: wait max_interval, as for any large interval
+                interval = self.max_interval
+        elif progress and 0 < progress < 100 and elapsed > 0:
+            remaining = elapsed * (100 - progress) / progress
+            interval = remaining / 2
+        elif elapsed > 0:
+            interval = max(self.initial_interval, elapsed * self.elapsed_fraction)
+        else:
+            interval = self.initial_interval
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        if self.jitter:
+            interval *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return interval
+
+
+class _Job:
+    __slots__ = ("job_id", "future", "started", "due", "progress", "errors", "polls", "waiters")
+
+    def __init__(self, job_id: str, future: asyncio.Future, now: float):
+        self.job_id = job_id
+        self.future = future
+        self.started = now
+        self.due = now
+        self.progress = None
+        self.errors = 0
+        self.polls = 0
+        self.waiters = 0
+
+
+class JobPoller:
+    def __init__(self, fetch_status: Callable[[str], Awaitable[Dict]],
+                 schedule: PollSchedule = PollSchedule(), max_concurrent_polls: int = 16):
+        """
+        Args:
+            fetch_status: Coroutine function returning the status response for a job ID
+            schedule: Interval policy
+            max_concurrent_polls: Upper bound on status requests in flight at once
+        """
+        self.fetch_status = fetch_status
+        self.schedule = schedule
+        self.max_concurrent_polls = max_concurrent_polls
+        self.polls = 0
+        self.errors = 0
+        self._jobs: Dict[str, _Job] = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._jobs
+
+    def _schedule(self, job: _Job, due: float):
+        job.due = due
+        heapq.heappush(self._heap, (due, next(self._seq), job.job_id))
+        self._wakeup.set()
+
+    def watch(self, job_id: str) -> asyncio.Future:
+        """
+        Start tracking a job (no-op if already tracked).
+
+        Returns:
+            Future resolving to the final status response ("completed" or "failed")
+        """
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.future
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_polls)
+            self._task = loop.create_task(self._run())
+        job = _Job(job_id, loop.create_future(), time.monotonic())
+        self._jobs[job_id] = job
+        self._schedule(job, job.started)
+        return job.future
+
+    def unwatch(self, job_id: str):
+        """Stop tracking a job; its future is cancelled."""
+        job = self._jobs.pop(job_id, None)
+        if job is not None and not job.future.done():
+            job.future.cancel()
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Dict:
+        """
+        Wait for a job to reach a terminal status.
+
+        Raises:
+            asyncio.TimeoutError: The job did not finish within ``timeout`` seconds
+        """
+        future = self.watch(job_id)
+        job = self._jobs[job_id]
+        job.waiters += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        finally:
+            job.waiters -= 1
+            # Nobody is interested any more: stop polling it
+            if not job.waiters and not future.done() and self._jobs.get(job_id) is job:
+                self.unwatch(job_id)
+
+    async def _run(self):
+        pending = set()
+        try:
+            while True:
+                now = time.monotonic()
+                while self._heap and self._heap[0][0] <= now:
+                    due, _, job_id = heapq.heappop(self._heap)
+                    job = self._jobs.get(job_id)
+                    if job is None or job.due != due:
+                        continue  # finished, unwatched or rescheduled
+                    task = asyncio.ensure_future(self._poll(job))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                self._wakeup.clear()
+                timeout = self._heap[0][0] - now if self._heap else None
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _poll(self, job: _Job):
+        async with self._semaphore:
+            if self._jobs.get(job.job_id) is not job:
+                return
+            self.polls += 1
+            job.polls += 1
+            try:
+                response = await self.fetch_status(job.job_id)
+                status = response["status"]
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                job.errors += 1
+                logger.warning("Error checking job %s status (%d in a row): %r", job.job_id, job.errors, e)
+            else:
+                job.errors = 0
+                progress = response.get("progress")
+                if isinstance(progress, (int, float)):
+                    job.progress = progress
+                if status in TERMINAL_STATUSES:
+                    del self._jobs[job.job_id]
+                    if not job.future.done():
+                        job.future.set_result(response)
+                    return
+                if status not in ("pending", "processing"):
+                    logger.warning("Job %s has unknown status: %s", job.job_id, status)
+        if self._jobs.get(job.job_id) is job:
+            now = time.monotonic()
+            self._schedule(job, now + self.schedule.interval(now - job.started, job.progress, job.errors))
+
+    async def close(self):
+        """Stop the scheduler and cancel every outstanding future."""
+        for job_id in list(self._jobs):
+            self.unwatch(job_id)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,168 @@
+import asyncio
+import os
+import ssl
+from typing import Callable, Dict, Iterable, Optional
+
+from lingopal_ws_client.client import connect_to_server
+from lingopal_ws_client.events import EventDecoder
+from lingopal_ws_client.metrics import MetricsRegistry
+from lingopal_ws_client.reconnect import GapStats, ReconnectPolicy
+from lingopal_ws_client.recorder import Recorder
+
+
+class StreamPool:
+    """
+    Run many transcription streams on a single event loop.
+
+    Every stream is one task running ``connect_to_server``. All connections share
+    one SSL context, so the CA bundle is loaded once per process instead of once
+    per socket. Dropped streams are re-opened according to ``reconnect`` and their
+    outage timings are kept in ``gap_stats[stream_id]`` while the stream runs.
+
+    Example:
+        async with StreamPool(api_key, on_message=handle) as pool:
+            pool.add_streams(stream_ids)
+            ...
+            await pool.remove_stream(stream_id)
+            await pool.wait()
+    """
+
+    def __init__(self, api_key: str, env: str = "prod",
+                 on_message: Optional[Callable] = None,
+                 ssl_context: Optional[ssl.SSLContext] = None,
+                 reconnect: Optional[ReconnectPolicy] = ReconnectPolicy(),
+                 decoder: Optional[EventDecoder] = None,
+                 metrics: Optional[MetricsRegistry] = None,
+                 record_dir: Optional[str] = None):
+        """
+        Args:
+            api_key: Lingopal API key used for every stream
+            env: Key into ENV_URLS
+            on_message: Callback ``on_message(stream_id, message)`` shared by all streams;
+                may be a coroutine function
+            ssl_context: SSL context shared by all connections (created if omitted)
+            reconnect: Reconnect policy applied to every stream; None disables reconnects
+            decoder: Optional EventDecoder; when given ``on_message`` receives CaptionEvent
+                objects instead of raw frames
+            metrics: Optional MetricsRegistry that receives a StreamMetrics per stream
+            record_dir: Optional directory; every stream is recorded to
+                ``<record_dir>/<stream_id>.lprec``, or ``<stream_id>.<n>.lprec``
+                when that file exists (a stream added again keeps earlier recordings)
+        """
+        self.api_key = api_key
+        self.env = env
+        self.on_message = on_message
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self.reconnect = reconnect
+        self.decoder = decoder
+        self.metrics = metrics
+        self.record_dir = record_dir
+        self.recorders: Dict[str, Recorder] = {}
+        self.gap_stats: Dict[str, GapStats] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __contains__(self, stream_id: str) -> bool:
+        return stream_id in self._tasks
+
+    @property
+    def stream_ids(self) -> list:
+        return list(self._tasks)
+
+    def _dispatch(self, stream_id: str, message):
+        event = self.decoder.decode(stream_id, message)
+        if event is None:
+            return None
+        if self.metrics is not None and event.timestamp is not None:
+            self.metrics.stream(stream_id).observe_server_timestamp(event.timestamp)
+        if self.on_message is not None:
+            return self.on_message(stream_id, event)
+
+    def _stream_metrics(self, stream_id: str):
+        if self.metrics is None:
+            return None
+        return self.metrics.stream(stream_id, gap_stats=self.gap_stats[stream_id])
+
+    def _recorder(self, stream_id: str):
+        if self.record_dir is None:
+            return None
+        os.makedirs(self.record_dir, exist_ok=True)
+        base = os.path.join(self.record_dir, os.path.basename(stream_id))
+        path, number = f"{base}.lprec", 0
+        while os.path.exists(path):
+            number += 1
+            path = f"{base}.{number}.lprec"
+        recorder = self.recorders[stream_id] = Recorder(path)
+        return recorder
+
+    def _connect(self, stream_id: str):
+        return connect_to_server(stream_id, self.api_key, self.env,
+                                 on_message=self._dispatch if self.decoder else self.on_message,
+                                 ssl_context=self.ssl_context,
+                                 reconnect=self.reconnect,
+                                 gap_stats=self.gap_stats[stream_id],
+                                 metrics=self._stream_metrics(stream_id),
+                                 recorder=self._recorder(stream_id))
+
+    def add_stream(self, stream_id: str) -> asyncio.Task:
+        """Start receiving ``stream_id``; adding a stream that is already running is a no-op."""
+        task = self._tasks.get(stream_id)
+        if task is not None:
+            return task
+        self.gap_stats[stream_id] = GapStats()
+        task = asyncio.create_task(self._connect(stream_id), name=f"lingopal-stream-{stream_id}")
+        task.add_done_callback(lambda t, sid=stream_id: self._discard(sid, t))
+        self._tasks[stream_id] = task
+        return task
+
+    def add_streams(self, stream_ids: Iterable[str]):
+        for stream_id in stream_ids:
+            self.add_stream(stream_id)
+
+    def _discard(self, stream_id: str, task: asyncio.Task):
+        # A stream that ended on its own is forgotten as in remove_stream
+        if self._tasks.get(stream_id) is task:
+            del self._tasks[stream_id]
+            self.gap_stats.pop(stream_id, None)
+            if self.metrics is not None:
+                self.metrics.remove(stream_id)
+            recorder = self.recorders.pop(stream_id, None)
+            if recorder is not None:
+                recorder.close()
+
+    async def remove_stream(self, stream_id: str):
+        """Stop receiving ``stream_id`` and close its connection."""
+        task = self._tasks.pop(stream_id, None)
+        self.gap_stats.pop(stream_id, None)
+        recorder = self.recorders.pop(stream_id, None)
+        if self.metrics is not None:
+            self.metrics.remove(stream_id)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        if recorder is not None:
+            recorder.close()
+
+    async def wait(self):
+        """Wait until every stream has finished (including streams added while waiting)."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def close(self):
+        """Stop all streams."""
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for recorder in self.recorders.values():
+            recorder.close()
+        self.recorders.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
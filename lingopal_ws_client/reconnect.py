@@ -0,0 +1,126 @@
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import NamedTuple, Optional
+
+# Handshake rejections that will not fix themselves by retrying
+FATAL_STATUS_CODES = {400, 401, 403, 404}
+
+
+@dataclass(frozen=True)
+class ReconnectPolicy:
+    """
+    Exponential backoff with jitter for re-opening a dropped stream.
+
+    The n-th retry waits ``min(max_delay, initial_delay * multiplier ** n)`` seconds,
+    reduced by a random fraction of up to ``jitter`` so that many streams dropped by
+    the same server deploy do not reconnect in lockstep. The retry counter resets
+    once a re-opened connection delivers its first message.
+    """
+
+    initial_delay: float = 0.5
+    max_delay: float = 30.0
+    multiplier: float = 2.0
+    jitter: float = 0.5
+    max_retries: Optional[int] = 10
+    reconnect_on_normal_close: bool = False
+
+    def delay(self, attempt: int) -> float:
+        try:
+            base = min(self.max_delay, self.initial_delay * self.multiplier ** attempt)
+        except OverflowError:
+            # Unlimited retries during a long outage: the delay stays at max_delay
+            base = self.max_delay
+        return base - random.uniform(0, base * self.jitter)
+
+    def should_retry(self, error: Optional[BaseException], attempt: int) -> bool:
+        if self.max_retries is not None and attempt >= self.max_retries:
+            return False
+        status = _handshake_status(error)
+        if status in FATAL_STATUS_CODES:
+            return False
+        close_code = _close_code(error)
+        if close_code == 1000 and not self.reconnect_on_normal_close:
+            return False
+        return True
+
+
+def _handshake_status(error) -> Optional[int]:
+    # websockets >= 14 raises InvalidStatus(response); older versions InvalidStatusCode(status_code)
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        status = getattr(error, "status_code", None)
+    return status
+
+
+def _close_code(error) -> Optional[int]:
+    rcvd = getattr(error, "rcvd", None)
+    return getattr(rcvd, "code", None)
+
+
+class Outage(NamedTuple):
+    reconnect_latency: float
+    time_to_first_message: float
+    dropped: float
+
+
+@dataclass
+class GapStats:
+    """
+    Caption-continuity accounting for one stream.
+
+    An outage starts when the connection is lost and ends with the first message
+    received after reconnecting. For each outage we record the time until the
+    socket was re-opened (reconnect latency), the time from re-open to the first
+    message, and the total dropped time. All times are in seconds.
+    """
+
+    connects: int = 0
+    reconnects: int = 0
+    disconnects: int = 0
+    total_dropped: float = 0.0
+    max_dropped: float = 0.0
+    last_reconnect_latency: Optional[float] = None
+    last_time_to_first_message: Optional[float] = None
+    outages: deque = field(default_factory=lambda: deque(maxlen=100))
+    _down_since: Optional[float] = field(default=None, repr=False)
+    _reconnected_at: Optional[float] = field(default=None, repr=False)
+
+    @property
+    def is_down(self) -> bool:
+        return self._down_since is not None
+
+    @property
+    def dropped_time(self) -> float:
+        """Total dropped time, including the outage in progress."""
+        if self._down_since is None:
+            return self.total_dropped
+        return self.total_dropped + time.monotonic() - self._down_since
+
+    def on_connect(self):
+        now = time.monotonic()
+        self.connects += 1
+        if self._down_since is not None:
+            self.reconnects += 1
+            self.last_reconnect_latency = now - self._down_since
+            self._reconnected_at = now
+
+    def on_first_message(self):
+        if self._down_since is None or self._reconnected_at is None:
+            return
+        now = time.monotonic()
+        dropped = now - self._down_since
+        self.last_time_to_first_message = now - self._reconnected_at
+        self.total_dropped += dropped
+        self.max_dropped = max(self.max_dropped, dropped)
+        self.outages.append(Outage(self.last_reconnect_latency, self.last_time_to_first_message, dropped))
+        self._down_since = None
+        self._reconnected_at = None
+
+    def on_disconnect(self):
+        if self._down_since is None:
+            self.disconnects += 1
+            self._down_since = time.monotonic()
+        self._reconnected_at = None
@@ -0,0 +1,76 @@
+"""
+Compact session recordings of received WebSocket frames.
+
+File layout: the 8-byte magic ``LPREC01\\n`` followed by one record per frame::
+
+    <float64 seconds since recording start> <uint8 kind> <uint32 length> <payload>
+
+(little-endian). ``kind`` is 0 for text frames (payload is UTF-8) and 1 for
+binary frames. Timestamps come from the monotonic clock.
+"""
+
+import struct
+import time
+from typing import Iterator, Tuple, Union
+
+MAGIC = b"LPREC01\n"
+RECORD_HEADER = struct.Struct("<dBI")
+TEXT = 0
+BINARY = 1
+
+
+class Recorder:
+    """
+    Append received frames to a recording file.
+
+    Example:
+        with Recorder("session.lprec") as recorder:
+            await connect_to_server(stream_id, api_key, recorder=recorder)
+    """
+
+    def __init__(self, path: str, buffer_size: int = 1 << 16):
+        self.path = path
+        self.frames = 0
+        self._file = open(path, "wb", buffering=buffer_size)
+        self._file.write(MAGIC)
+        self._started = time.monotonic()
+
+    def record(self, message: Union[str, bytes]):
+        if isinstance(message, str):
+            payload, kind = message.encode(), TEXT
+        else:
+            payload, kind = message, BINARY
+        self._file.write(RECORD_HEADER.pack(time.monotonic() - self._started, kind, len(payload)))
+        self._file.write(payload)
+        self.frames += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_recording(path: str) -> Iterator[Tuple[float, Union[str, bytes]]]:
+    """Yield ``(seconds_since_start, message)`` for every frame in a recording."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a Lingopal recording: {path}")
+        header_size = RECORD_HEADER.size
+        while True:
+            header = f.read(header_size)
+            if len(header) < header_size:
+                return
+            offset, kind, length = RECORD_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                # Truncated final record (recorder killed mid-write)
+                return
+            yield offset, payload.decode() if kind == TEXT else payload
@@ -0,0 +1,303 @@
+import asyncio
+import itertools
+import logging
+import ssl
+from collections import deque
+from typing import Dict, Optional, Set
+
+import websockets
+
+from lingopal_ws_client.pool import StreamPool
+from lingopal_ws_client.reconnect import ReconnectPolicy
+from lingopal_ws_client.stream import DROP_OLDEST, MessageQueue, QueueClosed
+
+logger = logging.getLogger(__name__)
+
+PATH_PREFIX = "/v1/live/transcription/"
+# WebSocket close code sent to subscribers when their upstream stream ends
+UPSTREAM_ENDED = 1011
+# A close frame's reason may hold at most 123 bytes of UTF-8
+MAX_CLOSE_REASON = 123
+
+
+def _close_reason(reason: str) -> str:
+    """Truncate ``reason`` to fit a close frame without splitting a UTF-8 character."""
+    return reason.encode()[:MAX_CLOSE_REASON].decode("utf-8", "ignore")
+
+
+async def _until_eof(reader: asyncio.StreamReader):
+    """Discard whatever the peer sends until it closes the connection."""
+    while await reader.read(4096):
+        pass
+
+
+class Subscriber:
+    """One local consumer with its own bounded send buffer."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, stream_id: str, kind: str, buffer_size: int):
+        self.id = next(self._ids)
+        self.stream_id = stream_id
+        self.kind = kind
+        self.queue = MessageQueue(buffer_size, DROP_OLDEST)
+        self.sent = 0
+        # Set when the upstream ended (fatal close code, retries exhausted)
+        self.close_reason: Optional[str] = None
+
+    def stats(self) -> dict:
+        return {"id": self.id, "kind": self.kind, "sent": self.sent, **self.queue.stats()}
+
+
+class Channel:
+    """Subscribers and recent-message snapshot for one upstream stream."""
+
+    def __init__(self, stream_id: str, snapshot_size: int):
+        self.stream_id = stream_id
+        self.subscribers: Set[Subscriber] = set()
+        self.snapshot: deque = deque(maxlen=snapshot_size)
+        self.received = 0
+        self.linger_handle: Optional[asyncio.TimerHandle] = None
+        self.upstream: Optional[asyncio.Task] = None
+
+
+class Relay:
+    """
+    Fan one upstream Lingopal connection per stream out to many local subscribers.
+
+    Local consumers connect to the relay instead of to Lingopal:
+
+    - WebSocket: ``ws://<host>:<port>/v1/live/transcription/<stream_id>`` (the same
+      path shape as the service, so ``connect_to_server`` works against it)
+    - Unix socket (optional): connect to ``unix_path``, send ``<stream_id>\\n``,
+      then read newline-delimited frames
+
+    The upstream connection is opened when the first subscriber for a stream
+    arrives and closed ``linger`` seconds after the last one leaves (streams added
+    with ``add_stream`` stay open). Each subscriber has its own bounded buffer that
+    drops its oldest messages when full, so a slow subscriber never stalls the
+    others. A new subscriber first receives up to ``snapshot_size`` recent messages
+    (WebSocket clients can opt out with ``?snapshot=0``).
+
+    Example:
+        async with Relay(api_key, port=8770, unix_path="/tmp/lingopal.sock") as relay:
+            await relay.serve_forever()
+    """
+
+    def __init__(self, api_key: str, env: str = "prod", *,
+                 host: str = "127.0.0.1", port: Optional[int] = 8770,
+                 unix_path: Optional[str] = None,
+                 buffer_size: int = 1000, snapshot_size: int = 50,
+                 linger: float = 30.0,
+                 reconnect: Optional[ReconnectPolicy] = ReconnectPolicy(),
+                 ssl_context: Optional[ssl.SSLContext] = None):
+        """
+        Args:
+            api_key: Lingopal API key for the upstream connections
+            env: Key into ENV_URLS for the upstream connections
+            host: Interface for the local WebSocket server
+            port: Port for the local WebSocket server; None disables it
+            unix_path: Path for the local Unix-socket server; None disables it
+            buffer_size: Per-subscriber send buffer, in messages
+            snapshot_size: Number of recent messages replayed to late joiners
+            linger: Seconds to keep an upstream open after its last subscriber leaves
+            reconnect: Reconnect policy for the upstream connections
+            ssl_context: Optional SSL context for the upstream connections
+        """
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.buffer_size = buffer_size
+        self.snapshot_size = snapshot_size
+        self.linger = linger
+        self.pool = StreamPool(api_key, env, on_message=self._broadcast,
+                               ssl_context=ssl_context, reconnect=reconnect)
+        self.channels: Dict[str, Channel] = {}
+        self._pinned: Set[str] = set()
+        self._servers = []
+        self._background: Set[asyncio.Task] = set()  # referenced until done
+
+    # Upstream side
+
+    def _channel(self, stream_id: str) -> Channel:
+        channel = self.channels.get(stream_id)
+        if channel is None:
+            channel = self.channels[stream_id] = Channel(stream_id, self.snapshot_size)
+        if channel.linger_handle is not None:
+            channel.linger_handle.cancel()
+            channel.linger_handle = None
+        if stream_id not in self.pool:
+            channel.upstream = self.pool.add_stream(stream_id)
+            channel.upstream.add_done_callback(lambda task, sid=stream_id: self._upstream_done(sid, task))
+        return channel
+
+    def _upstream_done(self, stream_id: str, task: asyncio.Task):
+        """Disconnect the subscribers of a stream whose upstream ended on its own."""
+        if task.cancelled():
+            return  # removed by remove_stream, _expire or close
+        channel = self.channels.get(stream_id)
+        if channel is None or channel.upstream is not task:
+            return
+        error = task.exception()
+        reason = f"Upstream failed: {error!r}" if error is not None else "Upstream stream ended"
+        logger.warning("Stream %s: %s; disconnecting %d subscribers", stream_id, reason, len(channel.subscribers))
+        del self.channels[stream_id]
+        self._pinned.discard(stream_id)
+        if channel.linger_handle is not None:
+            channel.linger_handle.cancel()
+        for subscriber in channel.subscribers:
+            subscriber.close_reason = reason
+            subscriber.queue.close()
+
+    def add_stream(self, stream_id: str):
+        """Open the upstream for ``stream_id`` now and keep it open until removed."""
+        self._pinned.add(stream_id)
+        self._channel(stream_id)
+
+    async def remove_stream(self, stream_id: str):
+        """Close the upstream for ``stream_id`` and disconnect its subscribers."""
+        self._pinned.discard(stream_id)
+        channel = self.channels.pop(stream_id, None)
+        if channel is not None:
+            if channel.linger_handle is not None:
+                channel.linger_handle.cancel()
+            for subscriber in channel.subscribers:
+                subscriber.queue.close()
+        await self.pool.remove_stream(stream_id)
+
+    def _broadcast(self, stream_id: str, message):
+        channel = self.channels.get(stream_id)
+        if channel is None:
+            return
+        channel.received += 1
+        channel.snapshot.append(message)
+        for subscriber in channel.subscribers:
+            subscriber.queue.put_nowait(message)
+
+    # Subscriber side
+
+    def _subscribe(self, stream_id: str, kind: str, snapshot: bool) -> Subscriber:
+        channel = self._channel(stream_id)
+        subscriber = Subscriber(stream_id, kind, self.buffer_size)
+        if snapshot:
+            for message in channel.snapshot:
+                subscriber.queue.put_nowait(message)
+        channel.subscribers.add(subscriber)
+        return subscriber
+
+    def _unsubscribe(self, subscriber: Subscriber):
+        subscriber.queue.close()
+        channel = self.channels.get(subscriber.stream_id)
+        if channel is None:
+            return
+        channel.subscribers.discard(subscriber)
+        if not channel.subscribers and subscriber.stream_id not in self._pinned:
+            loop = asyncio.get_running_loop()
+            channel.linger_handle = loop.call_later(
+                self.linger, lambda: self._spawn(self._expire(subscriber.stream_id)))
+
+    def _spawn(self, coroutine):
+        task = asyncio.ensure_future(coroutine)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _expire(self, stream_id: str):
+        channel = self.channels.get(stream_id)
+        if channel is not None and not channel.subscribers and stream_id not in self._pinned:
+            await self.remove_stream(stream_id)
+
+    async def _pump(self, subscriber: Subscriber, send):
+        try:
+            while True:
+                message = await subscriber.queue.get()
+                await send(message)
+                subscriber.sent += 1
+        except QueueClosed:
+            pass
+
+    async def _serve_subscriber(self, subscriber: Subscriber, send, closed):
+        pump = asyncio.create_task(self._pump(subscriber, send))
+        watch = asyncio.create_task(closed)
+        try:
+            await asyncio.wait([pump, watch], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self._unsubscribe(subscriber)
+            for task in (pump, watch):
+                task.cancel()
+            await asyncio.gather(pump, watch, return_exceptions=True)
+
+    async def _handle_websocket(self, websocket):
+        path = websocket.request.path
+        stream_path, _, query = path.partition("?")
+        if not stream_path.startswith(PATH_PREFIX) or len(stream_path) == len(PATH_PREFIX):
+            await websocket.close(1008, "Unknown path")
+            return
+        stream_id = stream_path[len(PATH_PREFIX):]
+        subscriber = self._subscribe(stream_id, "websocket", "snapshot=0" not in query.split("&"))
+        await self._serve_subscriber(subscriber, websocket.send, websocket.wait_closed())
+        if subscriber.close_reason is not None:
+            await websocket.close(UPSTREAM_ENDED, _close_reason(subscriber.close_reason))
+
+    async def _handle_unix(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            line = await reader.readline()
+            stream_id = line.decode().strip()
+            if not stream_id:
+                return
+
+            async def send(message):
+                writer.write((message if isinstance(message, bytes) else message.encode()) + b"\n")
+                await writer.drain()
+
+            subscriber = self._subscribe(stream_id, "unix", True)
+            await self._serve_subscriber(subscriber, send, _until_eof(reader))
+        finally:
+            writer.close()
+
+    # Lifecycle
+
+    async def start(self):
+        if self.port is not None:
+            self._servers.append(await websockets.serve(self._handle_websocket, self.host, self.port))
+            logger.info("Relay listening on ws://%s:%s%s<stream_id>", self.host, self.port, PATH_PREFIX)
+        if self.unix_path is not None:
+            self._servers.append(await asyncio.start_unix_server(self._handle_unix, self.unix_path))
+            logger.info("Relay listening on unix:%s", self.unix_path)
+
+    async def serve_forever(self):
+        await asyncio.Event().wait()
+
+    async def close(self):
+        for server in self._servers:
+            server.close()
+        for channel in self.channels.values():
+            if channel.linger_handle is not None:
+                channel.linger_handle.cancel()
+            for subscriber in channel.subscribers:
+                subscriber.queue.close()
+        self.channels.clear()
+        self._pinned.clear()
+        for task in self._background:
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+        await self.pool.close()
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers.clear()
+
+    def stats(self) -> dict:
+        return {
+            stream_id: {
+                "received": channel.received,
+                "upstream": self.pool.gap_stats.get(stream_id),
+                "subscribers": [subscriber.stats() for subscriber in channel.subscribers],
+            }
+            for stream_id, channel in self.channels.items()
+        }
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
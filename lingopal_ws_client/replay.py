@@ -0,0 +1,136 @@
+"""
+Local WebSocket server that replays recordings made with ``Recorder``.
+
+Clients connect with the same URL shape as the live service,
+``ws://<host>:<port>/v1/live/transcription/<stream_id>``, so
+``connect_to_server(stream_id, api_key, env="ws://127.0.0.1:8765/v1/live/transcription")``
+works unchanged. ``recording`` is either one file, served for every stream_id,
+or a directory holding ``<stream_id>.lprec`` files.
+
+Usage:
+    python -m lingopal_ws_client.replay session.lprec --speed 10
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from typing import List, Optional
+
+import websockets
+
+from lingopal_ws_client.recorder import read_recording
+
+logger = logging.getLogger(__name__)
+
+PATH_PREFIX = "/v1/live/transcription/"
+
+
+class ReplayServer:
+    """
+    Serve recordings at real time (``speed=1``), N times faster (``speed=N``) or
+    as fast as the client reads (``speed=None``).
+    """
+
+    def __init__(self, recording: str, host: str = "127.0.0.1", port: int = 8765,
+                 speed: Optional[float] = 1.0, repeat: bool = False):
+        """
+        Args:
+            recording: Recording file, or directory of ``<stream_id>.lprec`` files
+            host: Interface to listen on
+            port: Port to listen on
+            speed: Playback speed multiplier; None or 0 for maximum speed
+            repeat: Start over at the end of a recording instead of closing
+        """
+        self.recording = recording
+        self.host = host
+        self.port = port
+        self.speed = speed or None
+        self.repeat = repeat
+        self.frames_sent = 0
+        self._server = None
+
+    @property
+    def base_url(self) -> str:
+        return f"ws://{self.host}:{self.port}{PATH_PREFIX.rstrip('/')}"
+
+    def _path_for(self, stream_id: str) -> Optional[str]:
+        if os.path.isdir(self.recording):
+            path = os.path.join(self.recording, f"{os.path.basename(stream_id)}.lprec")
+            return path if os.path.exists(path) else None
+        return self.recording
+
+    async def _play(self, websocket, path: str):
+        speed = self.speed
+        while True:
+            started = time.monotonic()
+            sent = False
+            for offset, message in read_recording(path):
+                if speed is not None:
+                    delay = started + offset / speed - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                await websocket.send(message)
+                self.frames_sent += 1
+                sent = True
+            # Repeating a recording without frames would spin without ever yielding
+            if not self.repeat or not sent:
+                return
+
+    async def _handler(self, websocket):
+        stream_path = websocket.request.path.partition("?")[0]
+        if not stream_path.startswith(PATH_PREFIX):
+            await websocket.close(1008, "Unknown path")
+            return
+        path = self._path_for(stream_path[len(PATH_PREFIX):])
+        if path is None:
+            await websocket.close(1008, "No recording for stream")
+            return
+        try:
+            await self._play(websocket, path)
+        except websockets.exceptions.ConnectionClosed:
+            return
+        await websocket.close(1000, "End of recording")
+
+    async def start(self):
+        self._server = await websockets.serve(self._handler, self.host, self.port)
+        logger.info("Replaying %s on %s/<stream_id>", self.recording, self.base_url)
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self):
+        await asyncio.Event().wait()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+async def _serve(args):
+    async with ReplayServer(args.recording, args.host, args.port, args.speed, args.repeat) as server:
+        await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    parser = argparse.ArgumentParser(prog=prog, description="Replay a Lingopal session recording over WebSocket")
+    parser.add_argument("recording", help="Recording file or directory of <stream_id>.lprec files")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Playback speed multiplier (0 for maximum speed)")
+    parser.add_argument("--repeat", action="store_true", help="Loop the recording")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(_serve(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,442 @@
+"""
+Process-sharded consumer for very large numbers of streams.
+
+A ShardSupervisor spreads stream_ids over worker processes. Every worker runs
+its own event loop with a StreamPool, so decoding and sink writes in
+``worker_on_message`` use all cores. Workers send frames back to the parent in
+batches: one ``send_bytes`` per batch, with frames packed as
+``<uint16 stream_id length><uint8 kind><uint32 payload length><stream_id><payload>``,
+so nothing is pickled per message. Per-worker metrics, and the streams that
+ended on their own, travel over the same pipe.
+
+When a worker dies it is restarted with its current streams; after
+``max_restarts`` its streams are rebalanced onto the remaining workers.
+
+Example:
+    def handle(stream_id, message):
+        ...
+
+    if __name__ == "__main__":
+        supervisor = ShardSupervisor(api_key, stream_ids, workers=8)
+        supervisor.run(on_message=handle)
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import struct
+import time
+from multiprocessing.connection import wait
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from lingopal_ws_client.recorder import BINARY, TEXT
+
+logger = logging.getLogger(__name__)
+
+FRAME_HEADER = struct.Struct("<HBI")
+DATA = b"D"
+METRICS = b"M"
+ENDED = b"E"
+
+
+def pack_frames(frames: List[tuple]) -> bytes:
+    parts = [DATA]
+    for stream_id, message in frames:
+        sid = stream_id.encode()
+        if isinstance(message, str):
+            payload, kind = message.encode(), TEXT
+        else:
+            payload, kind = message, BINARY
+        parts.append(FRAME_HEADER.pack(len(sid), kind, len(payload)))
+        parts.append(sid)
+        parts.append(payload)
+    return b"".join(parts)
+
+
+def iter_frames(blob: bytes):
+    """Yield ``(stream_id, message)`` from a batch made by pack_frames."""
+    view = memoryview(blob)
+    offset = len(DATA)
+    end = len(view)
+    header_size = FRAME_HEADER.size
+    while offset < end:
+        sid_len, kind, length = FRAME_HEADER.unpack_from(view, offset)
+        offset += header_size
+        stream_id = str(view[offset:offset + sid_len], "utf-8")
+        offset += sid_len
+        payload = view[offset:offset + length]
+        offset += length
+        yield stream_id, str(payload, "utf-8") if kind == TEXT else bytes(payload)
+
+
+# Worker process
+
+class _Worker:
+    def __init__(self, worker_id, api_key, env, stream_ids, control, data, options):
+        self.worker_id = worker_id
+        self.api_key = api_key
+        self.env = env
+        self.initial_streams = stream_ids
+        self.control = control
+        self.data = data
+        self.forward = options["forward"]
+        self.worker_on_message = options["worker_on_message"]
+        self.batch_size = options["batch_size"]
+        self.flush_interval = options["flush_interval"]
+        self.metrics_interval = options["metrics_interval"]
+        self.batch: List[tuple] = []
+        self.stopped: Optional[asyncio.Event] = None
+        self.pool = None
+        self.registry = None
+        self.watched: Dict[str, asyncio.Task] = {}
+
+    def on_message(self, stream_id, message):
+        if self.worker_on_message is not None:
+            self.worker_on_message(stream_id, message)
+        if self.forward:
+            self.batch.append((stream_id, message))
+            if len(self.batch) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        if self.batch:
+            batch, self.batch = self.batch, []
+            # Blocking write: if the parent falls behind, the worker stops reading its sockets
+            self.data.send_bytes(pack_frames(batch))
+
+    def add_streams(self, stream_ids):
+        for stream_id in stream_ids:
+            task = self.pool.add_stream(stream_id)
+            if self.watched.get(stream_id) is not task:
+                self.watched[stream_id] = task
+                task.add_done_callback(lambda t, sid=stream_id: self.on_stream_done(sid, t))
+
+    def on_stream_done(self, stream_id, task):
+        if self.watched.get(stream_id) is task:
+            del self.watched[stream_id]
+        # Removed or stopped streams are cancelled; the parent already knows about those
+        if task.cancelled() or self.stopped.is_set():
+            return
+        self.flush()
+        self.data.send_bytes(ENDED + json.dumps([stream_id]).encode())
+
+    def send_metrics(self):
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        streams = self.registry.snapshot()
+        for stream_id, stats in self.pool.gap_stats.items():
+            if stream_id in streams:
+                streams[stream_id]["reconnects"] = stats.reconnects
+                streams[stream_id]["dropped_time"] = stats.dropped_time
+        report = {
+            "worker": self.worker_id,
+            "pid": os.getpid(),
+            "streams": len(self.pool),
+            "cpu_seconds": usage.ru_utime + usage.ru_stime,
+            "peak_rss_kb": usage.ru_maxrss,
+            "messages": sum(s["messages"] for s in streams.values()),
+            "bytes": sum(s["bytes"] for s in streams.values()),
+            "stream_metrics": streams,
+        }
+        self.data.send_bytes(METRICS + json.dumps(report).encode())
+
+    def on_control(self):
+        try:
+            command, *args = self.control.recv()
+        except (EOFError, OSError):
+            command, args = "stop", []
+        if command == "add":
+            self.add_streams(args[0])
+        elif command == "remove":
+            for stream_id in args[0]:
+                asyncio.ensure_future(self.pool.remove_stream(stream_id))
+        elif command == "stop":
+            self.stopped.set()
+
+    async def periodic(self, interval, callback):
+        while True:
+            await asyncio.sleep(interval)
+            callback()
+
+    async def run(self):
+        from lingopal_ws_client.metrics import MetricsRegistry
+        from lingopal_ws_client.pool import StreamPool
+
+        self.stopped = asyncio.Event()
+        self.registry = MetricsRegistry(ping_interval=None)
+        self.pool = StreamPool(self.api_key, self.env, on_message=self.on_message, metrics=self.registry)
+        self.add_streams(self.initial_streams)
+        loop = asyncio.get_running_loop()
+        loop.add_reader(self.control.fileno(), self.on_control)
+        tasks = [asyncio.create_task(self.periodic(self.flush_interval, self.flush)),
+                 asyncio.create_task(self.periodic(self.metrics_interval, self.send_metrics))]
+        try:
+            await self.stopped.wait()
+        finally:
+            loop.remove_reader(self.control.fileno())
+            for task in tasks:
+                task.cancel()
+            self.send_metrics()
+            await self.pool.close()
+            self.flush()
+
+
+def _worker_main(worker_id, api_key, env, stream_ids, control, data, options):
+    try:
+        asyncio.run(_Worker(worker_id, api_key, env, stream_ids, control, data, options).run())
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+
+
+# Parent process
+
+class _WorkerHandle:
+    def __init__(self, worker_id: int):
+        self.worker_id = worker_id
+        self.process = None
+        self.control = None
+        self.data = None
+        self.streams: Set[str] = set()
+        self.restarts = 0
+        self.alive = False
+
+
+class ShardSupervisor:
+    """Shard stream_ids across worker processes, each running its own event loop."""
+
+    def __init__(self, api_key: str, stream_ids: Iterable[str] = (), env: str = "prod", *,
+                 workers: Optional[int] = None,
+                 worker_on_message: Optional[Callable] = None,
+                 forward: bool = True,
+                 batch_size: int = 256, flush_interval: float = 0.05,
+                 metrics_interval: float = 5.0, max_restarts: int = 3,
+                 start_method: str = "spawn"):
+        """
+        Args:
+            api_key: Lingopal API key
+            stream_ids: Initial streams
+            env: Key into ENV_URLS, or a ws:// / wss:// base URL
+            workers: Number of worker processes (default: CPU count)
+            worker_on_message: Picklable callable ``(stream_id, message)`` run inside the
+                workers, e.g. decoding and sink writes
+            forward: Send every frame back to the parent's ``on_message``
+            batch_size: Frames per batch sent to the parent
+            flush_interval: Maximum seconds a frame waits in a worker batch
+            metrics_interval: Seconds between worker metrics reports
+            max_restarts: Restarts per worker before its streams are moved elsewhere
+            start_method: multiprocessing start method
+        """
+        self.api_key = api_key
+        self.env = env
+        self.max_restarts = max_restarts
+        self.options = {
+            "worker_on_message": worker_on_message,
+            "forward": forward,
+            "batch_size": batch_size,
+            "flush_interval": flush_interval,
+            "metrics_interval": metrics_interval,
+        }
+        self.context = multiprocessing.get_context(start_method)
+        self.workers = [_WorkerHandle(i) for i in range(workers or os.cpu_count() or 1)]
+        self.assignment: Dict[str, _WorkerHandle] = {}
+        self.worker_metrics: Dict[int, dict] = {}
+        self._pending = list(dict.fromkeys(stream_ids))
+        self._started = False
+        self._stopping = False
+
+    def _spawn(self, handle: _WorkerHandle):
+        control_parent, control_child = self.context.Pipe()
+        data_parent, data_child = self.context.Pipe(duplex=False)
+        handle.process = self.context.Process(
+            target=_worker_main, name=f"lingopal-shard-{handle.worker_id}", daemon=True,
+            args=(handle.worker_id, self.api_key, self.env, sorted(handle.streams),
+                  control_child, data_child, self.options))
+        handle.process.start()
+        control_child.close()
+        data_child.close()
+        handle.control = control_parent
+        handle.data = data_parent
+        handle.alive = True
+
+    def _least_loaded(self) -> _WorkerHandle:
+        live = [w for w in self.workers if w.alive or not self._started]
+        if not live:
+            raise RuntimeError("No live shard workers left")
+        return min(live, key=lambda w: len(w.streams))
+
+    def add_stream(self, stream_id: str):
+        if stream_id in self.assignment:
+            return
+        if not self._started:
+            if stream_id not in self._pending:
+                self._pending.append(stream_id)
+            return
+        handle = self._least_loaded()
+        handle.streams.add(stream_id)
+        self.assignment[stream_id] = handle
+        handle.control.send(("add", [stream_id]))
+
+    def remove_stream(self, stream_id: str):
+        if stream_id in self._pending:
+            self._pending.remove(stream_id)
+        handle = self.assignment.pop(stream_id, None)
+        if handle is None:
+            return
+        handle.streams.discard(stream_id)
+        if handle.alive:
+            handle.control.send(("remove", [stream_id]))
+
+    def start(self):
+        if self._started:
+            return
+        for stream_id in self._pending:
+            handle = self._least_loaded()
+            handle.streams.add(stream_id)
+            self.assignment[stream_id] = handle
+        self._pending = []
+        for handle in self.workers:
+            self._spawn(handle)
+        self._started = True
+
+    def _on_worker_exit(self, handle: _WorkerHandle):
+        handle.alive = False
+        handle.process.join()
+        handle.control.close()
+        handle.data.close()
+        if self._stopping:
+            return
+        if handle.restarts < self.max_restarts:
+            handle.restarts += 1
+            logger.warning("Shard worker %d exited (%s); restarting (%d/%d)", handle.worker_id,
+                           handle.process.exitcode, handle.restarts, self.max_restarts)
+            self._spawn(handle)
+            return
+        orphaned, handle.streams = handle.streams, set()
+        logger.warning("Shard worker %d exceeded %d restarts; moving %d streams to other workers",
+                       handle.worker_id, self.max_restarts, len(orphaned))
+        moved: Dict[int, List[str]] = {}
+        for stream_id in orphaned:
+            target = self._least_loaded()
+            target.streams.add(stream_id)
+            self.assignment[stream_id] = target
+            moved.setdefault(target.worker_id, []).append(stream_id)
+        for worker_id, stream_ids in moved.items():
+            self.workers[worker_id].control.send(("add", stream_ids))
+
+    def _receive(self, handle: _WorkerHandle, on_message, on_metrics) -> bool:
+        try:
+            blob = handle.data.recv_bytes()
+        except (EOFError, OSError):
+            return False
+        if blob[:1] == DATA:
+            if on_message is not None:
+                for stream_id, message in iter_frames(blob):
+                    on_message(stream_id, message)
+        elif blob[:1] == ENDED:
+            # Finished streams are not restarted with the worker or moved elsewhere
+            for stream_id in json.loads(blob[1:]):
+                if self.assignment.get(stream_id) is handle:
+                    del self.assignment[stream_id]
+                    handle.streams.discard(stream_id)
+        else:
+            report = json.loads(blob[1:])
+            self.worker_metrics[handle.worker_id] = report
+            if on_metrics is not None:
+                on_metrics(report)
+        return True
+
+    def run(self, on_message: Optional[Callable] = None,
+            on_metrics: Optional[Callable] = None,
+            duration: Optional[float] = None):
+        """
+        Start the workers and dispatch their frames and metrics until ``stop()``
+        is called, ``duration`` seconds pass, or every worker is gone.
+
+        Args:
+            on_message: Callback ``(stream_id, message)`` for forwarded frames
+            on_metrics: Callback receiving each worker metrics report (a dict)
+            duration: Optional run time in seconds
+        """
+        self.start()
+        deadline = time.monotonic() + duration if duration is not None else None
+        try:
+            while not self._stopping:
+                handles = {}
+                for handle in self.workers:
+                    if handle.alive:
+                        handles[handle.data] = handle
+                        handles[handle.process.sentinel] = handle
+                if not handles:
+                    break
+                timeout = 0.5 if deadline is None else max(0.0, min(0.5, deadline - time.monotonic()))
+                for ready in wait(list(handles), timeout):
+                    handle = handles[ready]
+                    if not handle.alive:
+                        continue
+                    if ready is handle.data:
+                        self._receive(handle, on_message, on_metrics)
+                    else:
+                        # Drain what the worker sent before it died
+                        while handle.data.poll() and self._receive(handle, on_message, on_metrics):
+                            pass
+                        self._on_worker_exit(handle)
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+        finally:
+            self._shutdown(on_message, on_metrics)
+
+    def stop(self):
+        """Ask ``run()`` to return (safe to call from a callback)."""
+        self._stopping = True
+
+    def _shutdown(self, on_message, on_metrics, timeout: float = 10.0):
+        self._stopping = True
+        for handle in self.workers:
+            if handle.alive:
+                try:
+                    handle.control.send(("stop",))
+                except OSError:
+                    pass
+        for handle in self.workers:
+            if not handle.alive:
+                continue
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                if handle.data.poll(0.1):
+                    if not self._receive(handle, on_message, on_metrics):
+                        break
+                elif not handle.process.is_alive():
+                    break
+            handle.process.join(1.0)
+            if handle.process.is_alive():
+                handle.process.terminate()
+                handle.process.join()
+            handle.alive = False
+            handle.control.close()
+            handle.data.close()
+
+    def stats(self) -> dict:
+        """
+        Latest metrics report of every worker plus totals. Counters restart with a
+        restarted worker process, so totals cover the current worker processes.
+        """
+        reports = list(self.worker_metrics.values())
+        workers = {}
+        for report in reports:
+            handle = self.workers[report["worker"]]
+            workers[report["worker"]] = {
+                **{k: v for k, v in report.items() if k != "stream_metrics"},
+                "assigned": len(handle.streams),
+                "alive": handle.alive,
+                "restarts": handle.restarts,
+            }
+        return {
+            "workers": workers,
+            "streams": len(self.assignment),
+            "messages": sum(report["messages"] for report in reports),
+            "bytes": sum(report["bytes"] for report in reports),
+            "cpu_seconds": sum(report["cpu_seconds"] for report in reports),
+            "restarts": sum(handle.restarts for handle in self.workers),
+        }
@@ -0,0 +1,228 @@
+"""
+Split-and-stitch transcription of long audio.
+
+A long PCM WAV file is cut into segments of roughly ``segment_seconds``, each
+cut placed at the quietest point within ``search_seconds`` of its target so
+words are not split. Neighbouring segments overlap by ``overlap_seconds`` on
+each side of the cut. All segments are transcribed as parallel jobs, then
+their SRTs are shifted by the segment start times and merged. In the overlap
+regions a cue is kept only by the segment whose own (non-overlap) span
+contains the cue's midpoint, so nothing appears twice.
+
+Only uncompressed PCM WAV is read (stdlib ``wave``); convert other formats
+first, e.g. ``ffmpeg -i talk.mp3 talk.wav``.
+
+Usage:
+    python -m lingopal_ws_client.splitting all-hands.wav --segment-minutes 10 --output all-hands.srt
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import wave
+from array import array
+from typing import List, NamedTuple, Optional, Tuple
+
+from lingopal_ws_client import subtitles
+from lingopal_ws_client.jobs import AsyncTranscribeTranslateClient
+from lingopal_ws_client.subtitles import Cues
+
+WINDOW_MS = 50
+ENERGY_SAMPLES = 400
+COPY_FRAMES = 1 << 16
+
+
+class Segment(NamedTuple):
+    index: int
+    path: str
+    start_ms: int  # segment audio, including overlap
+    end_ms: int
+    keep_start_ms: int  # span whose cues this segment owns in the merge
+    keep_end_ms: int
+
+
+def _window_energy(data: bytes, sample_width: int) -> float:
+    """Mean absolute amplitude of a block of PCM frames, scaled to 0..1."""
+    if sample_width == 1:
+        samples = array("b", bytes(b ^ 0x80 for b in data))  # unsigned -> signed
+        scale = 128
+    elif sample_width == 2:
+        samples = array("h", data)
+        scale = 32768
+    elif sample_width == 3:
+        samples = array("b", data[2::3])  # most significant byte is enough for energy
+        scale = 128
+    elif sample_width == 4:
+        samples = array("i", data)
+        scale = 2 ** 31
+    else:
+        raise ValueError(f"Unsupported sample width: {sample_width}")
+    if not samples:
+        return 0.0
+    # A few hundred evenly spaced samples per window estimate the level well enough
+    samples = samples[::max(1, len(samples) // ENERGY_SAMPLES)]
+    return sum(map(abs, samples)) / len(samples) / scale
+
+
+def window_energies(path: str, window_ms: int = WINDOW_MS) -> Tuple[array, float]:
+    """
+    Energy of every ``window_ms`` window of a PCM WAV file, read as a stream.
+
+    Returns:
+        (energies, duration_seconds)
+    """
+    with wave.open(path, "rb") as wav:
+        frames_per_window = max(1, wav.getframerate() * window_ms // 1000)
+        sample_width = wav.getsampwidth()
+        energies = array("f")
+        while True:
+            data = wav.readframes(frames_per_window)
+            if not data:
+                break
+            energies.append(_window_energy(data, sample_width))
+        return energies, wav.getnframes() / wav.getframerate()
+
+
+def find_split_points(energies: array, duration: float, segment_seconds: float,
+                      search_seconds: float = 30.0, window_ms: int = WINDOW_MS) -> List[float]:
+    """Cut times (seconds) near every multiple of ``segment_seconds``, each at the quietest window."""
+    points = []
+    count = math.ceil(duration / segment_seconds)
+    for k in range(1, count):
+        target = k * segment_seconds
+        low = max(0, int((target - search_seconds) * 1000 / window_ms))
+        high = min(len(energies), int((target + search_seconds) * 1000 / window_ms) + 1)
+        if points:
+            # Keep cuts ordered and at least one search radius apart
+            low = max(low, int((points[-1] + search_seconds) * 1000 / window_ms))
+        if low >= high:
+            continue
+        quietest = min(range(low, high), key=energies.__getitem__)
+        points.append((quietest + 0.5) * window_ms / 1000)
+    return points
+
+
+def split_wav(path: str, output_dir: str, segment_seconds: float = 600.0, overlap_seconds: float = 5.0,
+              search_seconds: float = 30.0) -> List[Segment]:
+    """
+    Cut ``path`` into overlapping WAV segments at silence.
+
+    Args:
+        path: PCM WAV file
+        output_dir: Where ``<name>.partNNN.wav`` files are written
+        segment_seconds: Target segment length
+        overlap_seconds: Audio added on both sides of every cut
+        search_seconds: How far from the target a cut may move to find silence
+
+    Returns:
+        Segments in order
+    """
+    energies, duration = window_energies(path)
+    cuts = [0.0] + find_split_points(energies, duration, segment_seconds, search_seconds) + [duration]
+    os.makedirs(output_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    segments = []
+    with wave.open(path, "rb") as source:
+        rate = source.getframerate()
+        for index, (keep_start, keep_end) in enumerate(zip(cuts, cuts[1:])):
+            start_frame = int(max(0.0, keep_start - overlap_seconds) * rate)
+            end_frame = int(min(duration, keep_end + overlap_seconds) * rate)
+            segment_path = os.path.join(output_dir, f"{stem}.part{index:03d}.wav")
+            with wave.open(segment_path, "wb") as target:
+                target.setparams(source.getparams())
+                source.setpos(start_frame)
+                remaining = end_frame - start_frame
+                while remaining > 0:
+                    data = source.readframes(min(COPY_FRAMES, remaining))
+                    if not data:
+                        break
+                    target.writeframes(data)
+                    remaining -= COPY_FRAMES
+            segments.append(Segment(index, segment_path, start_frame * 1000 // rate, end_frame * 1000 // rate,
+                                    round(keep_start * 1000), round(keep_end * 1000)))
+    return segments
+
+
+def merge_segment_cues(segments: List[Segment], segment_cues: List[Cues]) -> Cues:
+    """
+    Shift each segment's cues to the original timeline and drop overlap duplicates.
+
+    A cue survives only in the segment whose keep span contains its midpoint.
+    """
+    merged = []
+    for segment, cues in zip(segments, segment_cues):
+        for cue in cues:
+            cue = cue.shifted(segment.start_ms)
+            if segment.keep_start_ms <= (cue.start_ms + cue.end_ms) / 2 < segment.keep_end_ms:
+                merged.append(cue)
+    merged.sort()
+    return Cues(merged)
+
+
+async def transcribe_long_audio(client: AsyncTranscribeTranslateClient, path: str, output_path: str, *,
+                                work_dir: Optional[str] = None, segment_seconds: float = 600.0,
+                                overlap_seconds: float = 5.0, search_seconds: float = 30.0,
+                                concurrency: int = 16, timeout_minutes: int = 30) -> str:
+    """
+    Transcribe a long WAV file as parallel segment jobs and write one merged SRT.
+
+    Args:
+        client: Job API client
+        path: PCM WAV file
+        output_path: Merged SRT to write
+        work_dir: Where segments and their transcripts go (default: ``<output_path>.parts``)
+        segment_seconds: Target segment length
+        overlap_seconds: Audio shared by neighbouring segments on each side of a cut
+        search_seconds: How far a cut may move to find silence
+        concurrency: Maximum segments uploading/transcribing at once
+        timeout_minutes: Per-segment job timeout
+
+    Returns:
+        ``output_path``
+    """
+    work_dir = work_dir or output_path + ".parts"
+    segments = await asyncio.to_thread(split_wav, path, work_dir, segment_seconds, overlap_seconds, search_seconds)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def transcribe(segment: Segment) -> Cues:
+        async with semaphore:
+            job_id = await client.start_transcription(audio_file_path=segment.path)
+            if not await client.wait_for_job_completion(job_id, "transcription", timeout_minutes):
+                raise RuntimeError(f"Transcription of segment {segment.index} ({job_id}) did not complete")
+            files = await client.download_job_results(job_id, work_dir, file_types=["transcript", "diarization"])
+        srt = files.get("transcript") or files.get("diarization")
+        if srt is None:
+            raise RuntimeError(f"Segment {segment.index} ({job_id}) produced no SRT")
+        return subtitles.load(srt)
+
+    segment_cues = await asyncio.gather(*(transcribe(segment) for segment in segments))
+    subtitles.save(merge_segment_cues(segments, segment_cues), output_path, "srt")
+    return output_path
+
+
+async def _main(args):
+    async with AsyncTranscribeTranslateClient(args.api_base_url, args.api_key) as client:
+        output = await transcribe_long_audio(
+            client, args.audio, args.output or os.path.splitext(args.audio)[0] + ".srt",
+            segment_seconds=args.segment_minutes * 60, overlap_seconds=args.overlap,
+            concurrency=args.concurrency, timeout_minutes=args.timeout)
+    print(f"Merged transcript: {output}")
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    parser = argparse.ArgumentParser(prog=prog, description="Transcribe long WAV audio as parallel overlapping segments")
+    parser.add_argument("audio", help="PCM WAV file")
+    parser.add_argument("--output", help="Merged SRT (default: <audio>.srt)")
+    parser.add_argument("--segment-minutes", type=float, default=10.0)
+    parser.add_argument("--overlap", type=float, default=5.0, help="Seconds of overlap on each side of a cut")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=int, default=int(os.getenv("JOB_TIMEOUT", "30")),
+                        help="Per-segment timeout in minutes")
+    parser.add_argument("--api-base-url", default=os.getenv("API_BASE_URL", "http://34.212.19.243:8000"))
+    parser.add_argument("--api-key", default=os.getenv("API_KEY"))
+    asyncio.run(_main(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+import asyncio
+import inspect
+import ssl
+from collections import deque
+from typing import Any, Callable, Hashable, Optional
+
+from lingopal_ws_client.client import connect_to_server
+from lingopal_ws_client.events import EventDecoder
+from lingopal_ws_client.metrics import StreamMetrics
+from lingopal_ws_client.reconnect import GapStats, ReconnectPolicy
+from lingopal_ws_client.recorder import Recorder
+
+# Overflow policies for a full MessageQueue
+BLOCK = "block"              # producer waits; the socket stops being read (TCP backpressure)
+DROP_OLDEST = "drop_oldest"  # discard the oldest queued message
+COALESCE = "coalesce"        # replace a queued message with the newer one
+OVERFLOW_POLICIES = (BLOCK, DROP_OLDEST, COALESCE)
+
+
+class QueueClosed(Exception):
+    """Raised by MessageQueue.get() once the queue is closed and drained."""
+
+
+class MessageQueue:
+    """
+    Bounded FIFO between the socket reader and a consumer.
+
+    Memory is capped at ``maxsize`` messages whatever the consumer's speed; what
+    happens to new messages when the queue is full is set by ``overflow``:
+
+    - ``block``: ``put`` waits for space (lossless, pushes back on the server)
+    - ``drop_oldest``: the oldest queued message is discarded
+    - ``coalesce``: the new message replaces the newest queued message with the
+      same ``coalesce_key`` (or simply the newest queued message when no key
+      function is given); if no queued message matches, the oldest is dropped
+
+    ``depth``, ``high_watermark``, ``dropped`` and ``coalesced`` can be read at any time.
+    """
+
+    def __init__(self, maxsize: int = 1000, overflow: str = BLOCK,
+                 coalesce_key: Optional[Callable[[Any], Hashable]] = None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.coalesce_key = coalesce_key
+        self.put_count = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.high_watermark = 0
+        self._items: deque = deque()
+        self._getters: deque = deque()
+        self._putters: deque = deque()
+        self._closed = False
+
+    @property
+    def depth(self) -> int:
+        return len(self._items)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def full(self) -> bool:
+        return len(self._items) >= self.maxsize
+
+    def stats(self) -> dict:
+        return {
+            "depth": len(self._items),
+            "maxsize": self.maxsize,
+            "high_watermark": self.high_watermark,
+            "put": self.put_count,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+
+    def put_nowait(self, item) -> bool:
+        """
+        Add ``item`` without waiting.
+
+        Returns False if the item was not queued: the queue is closed, or it is full
+        under the ``block`` policy (the item is counted as dropped).
+        """
+        if self._closed:
+            return False
+        self.put_count += 1
+        if len(self._items) >= self.maxsize:
+            if self.overflow == COALESCE and self._coalesce(item):
+                return True
+            if self.overflow == BLOCK:
+                self.dropped += 1
+                return False
+            self._items.popleft()
+            self.dropped += 1
+        self._append(item)
+        return True
+
+    async def put(self, item) -> bool:
+        """Add ``item``, waiting for space under the ``block`` policy."""
+        if self.overflow != BLOCK:
+            return self.put_nowait(item)
+        while len(self._items) >= self.maxsize and not self._closed:
+            await self._wait(self._putters)
+        if self._closed:
+            return False
+        self.put_count += 1
+        self._append(item)
+        return True
+
+    async def get(self):
+        """Remove and return the oldest message; raises QueueClosed once closed and empty."""
+        while not self._items:
+            if self._closed:
+                raise QueueClosed()
+            await self._wait(self._getters)
+        item = self._items.popleft()
+        self._wake(self._putters)
+        return item
+
+    def close(self):
+        """Stop accepting messages; consumers drain what is left, then get QueueClosed."""
+        self._closed = True
+        for waiters in (self._getters, self._putters):
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    def _append(self, item):
+        self._items.append(item)
+        if len(self._items) > self.high_watermark:
+            self.high_watermark = len(self._items)
+        self._wake(self._getters)
+
+    def _coalesce(self, item) -> bool:
+        if self.coalesce_key is None:
+            self._items[-1] = item
+            self.coalesced += 1
+            return True
+        key = self.coalesce_key(item)
+        for i in range(len(self._items) - 1, -1, -1):
+            if self.coalesce_key(self._items[i]) == key:
+                self._items[i] = item
+                self.coalesced += 1
+                return True
+        return False
+
+    async def _wait(self, waiters: deque):
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        try:
+            await waiter
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # Woken, then cancelled before running: pass the wakeup on
+                self._wake(waiters)
+            else:
+                waiter.cancel()
+                try:
+                    waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    @staticmethod
+    def _wake(waiters: deque):
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+
+class Stream:
+    """
+    One transcription stream consumed as an async iterator or through a callback.
+
+    Messages are buffered in a bounded MessageQueue (see there for the overflow
+    policies), so a slow consumer cannot grow memory without limit. If the
+    connection fails for good, iteration raises that error once the buffered
+    messages have been consumed.
+
+    Example:
+        async with Stream(stream_id, api_key, overflow="drop_oldest") as stream:
+            async for message in stream:
+                ...
+
+        # or
+        await Stream(stream_id, api_key).run(handle_message)
+    """
+
+    def __init__(self, stream_id: str, api_key: str, env: str = "prod", *,
+                 maxsize: int = 1000, overflow: str = BLOCK,
+                 coalesce_key: Optional[Callable[[Any], Hashable]] = None,
+                 reconnect: Optional[ReconnectPolicy] = ReconnectPolicy(),
+                 ssl_context: Optional[ssl.SSLContext] = None,
+                 decoder: Optional[EventDecoder] = None,
+                 metrics: Optional[StreamMetrics] = None,
+                 recorder: Optional[Recorder] = None):
+        """
+        Args:
+            stream_id: Stream UUID from Lingopal
+            api_key: Lingopal API key
+            env: Key into ENV_URLS
+            maxsize: Maximum number of buffered messages
+            overflow: "block", "drop_oldest" or "coalesce"
+            coalesce_key: Key function used by the "coalesce" policy
+            reconnect: Reconnect policy; None stops the stream on the first disconnect
+            ssl_context: Optional SSL context shared with other connections
+            decoder: Optional EventDecoder; when given the stream yields CaptionEvent
+                objects instead of raw frames and unsubscribed frames are never queued
+            metrics: Optional StreamMetrics for this stream
+            recorder: Optional Recorder for the raw frames
+        """
+        self.stream_id = stream_id
+        self.api_key = api_key
+        self.env = env
+        self.queue = MessageQueue(maxsize, overflow, coalesce_key)
+        self.reconnect = reconnect
+        self.ssl_context = ssl_context
+        self.decoder = decoder
+        self.metrics = metrics
+        self.recorder = recorder
+        self.gap_stats = GapStats()
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+    def _on_message(self, stream_id: str, message):
+        if self.decoder is not None:
+            message = self.decoder.decode(stream_id, message)
+            if message is None:
+                return None
+            if self.metrics is not None and message.timestamp is not None:
+                self.metrics.observe_server_timestamp(message.timestamp)
+        if self.queue.overflow == BLOCK:
+            return self.queue.put(message)
+        self.queue.put_nowait(message)
+
+    async def _receive(self):
+        try:
+            await connect_to_server(self.stream_id, self.api_key, self.env,
+                                    on_message=self._on_message,
+                                    ssl_context=self.ssl_context,
+                                    reconnect=self.reconnect,
+                                    gap_stats=self.gap_stats,
+                                    metrics=self.metrics,
+                                    recorder=self.recorder)
+        except Exception as e:
+            self._error = e
+        finally:
+            self.queue.close()
+
+    def start(self):
+        """Start receiving in the background (done automatically on first iteration)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._receive(), name=f"lingopal-stream-{self.stream_id}")
+
+    async def close(self):
+        """Close the connection; already-buffered messages can still be iterated."""
+        self.queue.close()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def __aiter__(self):
+        self.start()
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self.queue.get()
+        except QueueClosed:
+            if self._error is not None:
+                raise self._error
+            raise StopAsyncIteration
+
+    async def run(self, callback: Callable):
+        """Feed every message to ``callback(message)`` (sync or async) until the stream ends."""
+        async for message in self:
+            result = callback(message)
+            if inspect.isawaitable(result):
+                await result
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -0,0 +1,374 @@
+"""
+Start and schedule live streams in bulk over one pooled HTTP client.
+
+``StreamsClient`` wraps the stream-control endpoints that
+examples/start_stream.py and examples/schedule_stream.py call one request
+at a time. ``run_many`` sends a whole channel lineup with bounded concurrency
+over keep-alive connections and returns a ``StreamResult`` per stream with its
+status, response and timing.
+
+Every request carries an ``Idempotency-Key`` header, new for each run, so
+starting the same configuration again really starts a new stream. The key is
+kept for the transport's retries of that request and written to the
+``--results`` file; ``--resume`` reads it back and resends each row under its
+earlier key, so re-running after a partial failure does not start a stream
+twice. A row may also set its own ``idempotency_key``. Both rely on the
+server deduplicating requests by key: the transport retries a start after a
+5xx or read timeout because the key is present, and without server-side
+dedupe such a retry can start a second stream.
+
+Manifests are CSV or YAML (YAML needs ``pip install pyyaml``). CSV columns
+are payload fields; list fields such as ``dst_language`` separate values with
+``|``. Three columns are not sent: ``name`` labels the stream in results,
+``action`` (``start`` / ``schedule``) overrides the command, and
+``idempotency_key`` is described above. A YAML manifest is a list of rows, or a
+mapping with ``defaults`` applied to every row and ``streams``::
+
+    defaults: {src_language: en, dst_language: [es, pt]}
+    streams:
+      - {name: court-1, ingest_url: "srt://ingest.example.com:7001"}
+      - {name: court-2, ingest_url: "srt://ingest.example.com:7002"}
+
+Usage:
+    python -m lingopal_ws_client.streams start lineup.csv --concurrency 32 --results started.jsonl
+    python -m lingopal_ws_client.streams start lineup.csv --results started.jsonl --resume
+    python -m lingopal_ws_client.streams schedule weekend.yaml
+    lingopal stream start --ingest-url srt://ingest.example.com:7001
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+
+from lingopal_ws_client.transport import ResilientTransport, TransportPolicy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_BASE_URL = "https://streaming.lingopal.ai/v1"
+DEFAULT_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=64, keepalive_expiry=30.0)
+DEFAULT_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+
+START = "start"
+SCHEDULE = "schedule"
+ENDPOINTS = {START: "/streams/start", SCHEDULE: "/scheduled_streams"}
+REQUIRED_FIELDS = {START: ("ingest_url",), SCHEDULE: ("ingest_url", "scheduled_time", "timezone")}
+
+# Payload defaults of examples/start_stream.py and examples/schedule_stream.py
+START_DEFAULTS = {
+    "vocals_track": "0",
+    "background_track": 1,
+    "mix": "-9,-6",
+    "enable_captions_708": True,
+    "enable_captions_608": False,
+    "src_language": "en",
+    "dst_language": ["es"],
+    "use_paraphrasing_transcription": True,
+    "start_wowza": True,
+    "is_hls_stream": False,
+    "use_contextual_translation": False,
+    "lipsync": False,
+}
+SCHEDULE_DEFAULTS = {
+    "vocals_track": "0",
+    "background_track": -1,
+    "mix": "-9,-6",
+    "enable_captions_708": False,
+    "enable_captions_608": False,
+    "dst_language": ["es"],
+    "src_language": "en",
+    "start_wowza": False,
+    "use_contextual_translation": False,
+    "lipsync": True,
+    "is_hls_stream": False,
+    "use_reserved_resources": False,
+    "stitching": False,
+    "voice_cloning": True,
+}
+PAYLOAD_DEFAULTS = {START: START_DEFAULTS, SCHEDULE: SCHEDULE_DEFAULTS}
+# Manifest columns that are not payload fields
+CONTROL_FIELDS = ("name", "action", "idempotency_key")
+
+
+def _coerce(value: str, default: Any) -> Any:
+    """A CSV cell converted to the type of the field's default value."""
+    if isinstance(default, bool):
+        return value.strip().lower() in ("1", "true", "yes", "y", "on")
+    if isinstance(default, int):
+        return int(value)
+    if isinstance(default, list):
+        return [item.strip() for item in value.split("|") if item.strip()]
+    return value
+
+
+def load_manifest(path: str) -> List[Dict[str, Any]]:
+    """Rows of a .csv or .yaml/.yml manifest (YAML ``defaults`` merged in)."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        defaults = {**SCHEDULE_DEFAULTS, **START_DEFAULTS}
+        with open(path, newline="", encoding="utf-8") as f:
+            return [{field: _coerce(value, defaults.get(field, "")) for field, value in row.items()
+                     if field and value not in (None, "")} for row in csv.DictReader(f)]
+    if extension in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("YAML manifests need PyYAML. Install with: pip install pyyaml")
+        with open(path, encoding="utf-8") as f:
+            document = yaml.safe_load(f) or []
+        if isinstance(document, dict):
+            defaults = document.get("defaults") or {}
+            return [{**defaults, **row} for row in document.get("streams") or []]
+        return list(document)
+    raise ValueError(f"Unsupported manifest format: {path} (expected .csv, .yaml or .yml)")
+
+
+def build_payload(action: str, row: Dict[str, Any]) -> Dict[str, Any]:
+    """Request body for ``action``: the action's defaults overridden by ``row``."""
+    if action not in ENDPOINTS:
+        raise ValueError(f"Unknown stream action: {action!r}")
+    payload = {**PAYLOAD_DEFAULTS[action], **{k: v for k, v in row.items() if k not in CONTROL_FIELDS}}
+    missing = [name for name in REQUIRED_FIELDS[action] if not payload.get(name)]
+    if missing:
+        raise ValueError(f"Missing {', '.join(missing)} for {action}")
+    return payload
+
+
+def idempotency_key() -> str:
+    """A new key for one request; its retries, and a ``--resume``, reuse it."""
+    return uuid.uuid4().hex
+
+
+def row_name(row: Dict[str, Any]) -> str:
+    """Label of a manifest row in results."""
+    return str(row.get("name") or row.get("ingest_url", ""))
+
+
+def load_idempotency_keys(results_path: str) -> Dict[tuple, str]:
+    """(action, name) -> key of each stream in an earlier ``--results`` file (the last one wins)."""
+    keys = {}
+    with open(results_path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                result = json.loads(line)
+                if result.get("idempotency_key"):
+                    keys[(result["action"], result["name"])] = result["idempotency_key"]
+    return keys
+
+
+@dataclass
+class StreamResult:
+    name: str
+    action: str
+    idempotency_key: str = ""
+    status_code: Optional[int] = None
+    response: Any = None
+    error: Optional[str] = None
+    attempts: int = 0  # requests sent, including retries by the transport
+    seconds: float = 0.0  # including retries
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "seconds": round(self.seconds, 4)}
+
+
+class StreamsClient:
+    def __init__(self, api_key: Optional[str] = None, api_base_url: str = DEFAULT_API_BASE_URL, *,
+                 limits: httpx.Limits = DEFAULT_LIMITS,
+                 timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+                 http2: bool = False,
+                 http_client: Optional[httpx.AsyncClient] = None,
+                 transport_policy: Optional[TransportPolicy] = None,
+                 endpoints: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            api_key: Lingopal API key (default: ``LINGOPAL_API_KEY``)
+            api_base_url: Streaming API base URL
+            limits: Connection pool limits
+            timeout: Request timeouts
+            http2: Negotiate HTTP/2 where the server supports it (needs ``httpx[http2]``)
+            http_client: Existing AsyncClient to share a pool with; it is not closed by ``close()``
+            transport_policy: Rate limit, retries and circuit breaker (see
+                ``lingopal_ws_client.transport``). Every request is retried as
+                idempotent, because its idempotency key is resent unchanged.
+                Not applied to ``http_client``.
+            endpoints: Paths appended to ``api_base_url`` per action, overriding
+                ``ENDPOINTS`` (e.g. ``{START: ""}`` when ``api_base_url`` is the full URL)
+        """
+        self.api_key = api_key or os.getenv("LINGOPAL_API_KEY")
+        if not self.api_key:
+            raise ValueError("An API key is required (argument or LINGOPAL_API_KEY)")
+        self.api_base_url = api_base_url.rstrip("/")
+        self.endpoints = {**ENDPOINTS, **(endpoints or {})}
+        self.headers = {"Content-Type": "application/json", "Accept": "application/json", "X-API-Key": self.api_key}
+        self.transport_policy = transport_policy if transport_policy is not None else TransportPolicy()
+        if http_client is not None:
+            self.http = http_client
+            self._owns_http = False
+        else:
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    raise ImportError("HTTP/2 needs the h2 package. Install with: pip install 'httpx[http2]'")
+            transport = ResilientTransport(self.transport_policy, limits=limits, http2=http2)
+            self.http = httpx.AsyncClient(transport=transport, timeout=timeout)
+            self._owns_http = True
+
+    async def close(self):
+        if self._owns_http:
+            await self.http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def send(self, action: str, row: Dict[str, Any], name: Optional[str] = None) -> StreamResult:
+        """
+        Start or schedule one stream described by ``row`` (payload fields plus optional control fields).
+
+        Never raises for request failures; they are reported in ``StreamResult.error``.
+        """
+        result = StreamResult(name=name or row_name(row), action=action)
+        started = time.perf_counter()
+        try:
+            payload = build_payload(action, row)
+        except ValueError as e:
+            result.error = str(e)
+            return result
+        result.idempotency_key = str(row.get("idempotency_key") or idempotency_key())
+        headers = {**self.headers, "Idempotency-Key": result.idempotency_key}
+        url = f"{self.api_base_url}{self.endpoints[action]}"
+        try:
+            response = await self.http.post(url, headers=headers, json=payload)
+        except httpx.TransportError as e:
+            result.error = repr(e)
+        else:
+            result.status_code = response.status_code
+            result.attempts = response.extensions.get("attempts", 1)
+            try:
+                result.response = response.json()
+            except ValueError:
+                result.response = response.text
+            if not response.is_success:
+                result.error = f"HTTP {response.status_code}"
+        result.seconds = time.perf_counter() - started
+        return result
+
+    async def start(self, row: Dict[str, Any], name: Optional[str] = None) -> StreamResult:
+        return await self.send(START, row, name)
+
+    async def schedule(self, row: Dict[str, Any], name: Optional[str] = None) -> StreamResult:
+        return await self.send(SCHEDULE, row, name)
+
+    async def run_many(self, rows: Iterable[Dict[str, Any]], action: str = START, concurrency: int = 32,
+                       on_result=None) -> List[StreamResult]:
+        """
+        Send every row with at most ``concurrency`` requests in flight.
+
+        Args:
+            rows: Manifest rows; a row's ``action`` field overrides ``action``
+            action: ``"start"`` or ``"schedule"``
+            concurrency: Maximum simultaneous requests
+            on_result: Called with each ``StreamResult`` as it finishes
+
+        Returns:
+            Results in manifest order
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(row: Dict[str, Any]) -> StreamResult:
+            async with semaphore:
+                result = await self.send(row.get("action") or action, row)
+            if on_result is not None:
+                on_result(result)
+            return result
+
+        return list(await asyncio.gather(*(run(row) for row in rows)))
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+
+async def _main(args):
+    if args.manifest:
+        rows = load_manifest(args.manifest)
+    else:
+        row = {"name": args.name, "ingest_url": args.ingest_url,
+               "scheduled_time": args.scheduled_time, "timezone": args.timezone}
+        rows = [{key: value for key, value in row.items() if value is not None}]
+    if args.resume and os.path.exists(args.results):
+        keys = load_idempotency_keys(args.results)
+        for row in rows:
+            key = keys.get((row.get("action") or args.command, row_name(row)))
+            if key and not row.get("idempotency_key"):
+                row["idempotency_key"] = key
+    results_file = open(args.results, "a", encoding="utf-8") if args.results else None
+
+    def on_result(result: StreamResult):
+        status = result.status_code if result.ok else result.error
+        print(f"  {result.name:<30} {status!s:<12} {result.seconds * 1000:8.0f} ms  ({result.attempts} attempts)")
+        if results_file is not None:
+            results_file.write(json.dumps(result.as_dict()) + "\n")
+
+    started = time.perf_counter()
+    try:
+        async with StreamsClient(args.api_key, args.api_base_url, http2=args.http2) as client:
+            results = await client.run_many(rows, args.command, args.concurrency, on_result)
+    finally:
+        if results_file is not None:
+            results_file.close()
+    elapsed = time.perf_counter() - started
+    if not args.manifest and results[0].response is not None:
+        response = results[0].response
+        print(json.dumps(response, indent=2) if isinstance(response, (dict, list)) else response)
+    seconds = [r.seconds for r in results if r.ok]
+    failed = sum(not r.ok for r in results)
+    verb = "started" if args.command == START else "scheduled"
+    print(f"{len(results) - failed}/{len(results)} streams {verb} in {elapsed:.2f}s "
+          f"(p50 {_percentile(seconds, 0.5) * 1000:.0f} ms, p99 {_percentile(seconds, 0.99) * 1000:.0f} ms)")
+    return 1 if failed else 0
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    parser = argparse.ArgumentParser(prog=prog,
+                                     description="Start or schedule Lingopal streams in bulk from a manifest")
+    parser.add_argument("command", choices=[START, SCHEDULE])
+    parser.add_argument("manifest", nargs="?", help=".csv or .yaml manifest, one stream per row")
+    single = parser.add_argument_group("one stream without a manifest")
+    single.add_argument("--ingest-url", help="SRT ingest URL, e.g. srt://your.server:7070")
+    single.add_argument("--scheduled-time", help="Start time for schedule, e.g. '2024-01-15 10:00:00'")
+    single.add_argument("--timezone", help="Timezone of --scheduled-time, e.g. America/New_York")
+    single.add_argument("--name", help="Label in the output")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--results", help="Append one JSON result per stream to this file")
+    parser.add_argument("--resume", action="store_true",
+                        help="Resend streams listed in --results under their earlier Idempotency-Key")
+    parser.add_argument("--http2", action="store_true")
+    parser.add_argument("--api-base-url", default=os.getenv("LINGOPAL_API_BASE_URL", DEFAULT_API_BASE_URL))
+    parser.add_argument("--api-key", default=os.getenv("LINGOPAL_API_KEY"))
+    args = parser.parse_args(argv)
+    if not args.manifest and not args.ingest_url:
+        parser.error("a manifest or --ingest-url is required")
+    if args.resume and not args.results:
+        parser.error("--resume needs --results")
+    raise SystemExit(asyncio.run(_main(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+SRT / WebVTT / JSON subtitles: streaming parsers, serializers and conversion.
+
+Parsers are generators reading fixed-size chunks, so a file is never read whole and
+``convert`` goes from one format to another in a single pass. To hold a
+transcript in memory, ``Cues`` stores timings in ``array('q')`` columns and
+all text in one UTF-8 buffer indexed by offsets, which is a few dozen bytes
+per cue instead of a Python object each, so million-cue files stay small.
+
+Download one format from the job API and derive the others locally:
+
+    files = await client.download_job_results(job_id, "downloads", file_types=["transcript"])
+    derive(files["transcript"], ("vtt", "json"))
+
+The JSON written here is ``[{"start_ms": .., "end_ms": .., "text": ..}, ...]``.
+"""
+
+import json
+import os
+import re
+from array import array
+from typing import IO, Iterable, Iterator, NamedTuple
+
+TIMESTAMP = re.compile(r"(?:(\d+):)?(\d{1,2}):(\d{1,2})[,.](\d{1,3})")
+FORMATS = {".srt": "srt", ".vtt": "vtt", ".json": "json"}
+
+
+class Cue(NamedTuple):
+    start_ms: int
+    end_ms: int
+    text: str
+
+    def shifted(self, ms: int) -> "Cue":
+        return Cue(self.start_ms + ms, self.end_ms + ms, self.text)
+
+
+class Cues:
+    """Column-oriented cue list: start/end times and text offsets in arrays."""
+    __slots__ = ("start_ms", "end_ms", "_offsets", "_text")
+
+    def __init__(self, cues: Iterable[Cue] = ()):
+        self.start_ms = array("q")
+        self.end_ms = array("q")
+        self._offsets = array("q", [0])
+        self._text = bytearray()
+        self.extend(cues)
+
+    def append(self, start_ms: int, end_ms: int, text: str):
+        self.start_ms.append(start_ms)
+        self.end_ms.append(end_ms)
+        self._text += text.encode("utf-8")
+        self._offsets.append(len(self._text))
+
+    def extend(self, cues: Iterable[Cue]):
+        for start_ms, end_ms, text in cues:
+            self.append(start_ms, end_ms, text)
+
+    def text(self, index: int) -> str:
+        if index < 0:
+            index += len(self)
+        return self._text[self._offsets[index]:self._offsets[index + 1]].decode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self.start_ms)
+
+    def __getitem__(self, index: int) -> Cue:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("cue index out of range")
+        return Cue(self.start_ms[index], self.end_ms[index], self.text(index))
+
+    def __iter__(self) -> Iterator[Cue]:
+        text, offsets = self._text, self._offsets
+        for i, (start_ms, end_ms) in enumerate(zip(self.start_ms, self.end_ms)):
+            yield Cue(start_ms, end_ms, text[offsets[i]:offsets[i + 1]].decode("utf-8"))
+
+    def shift(self, ms: int):
+        """Move every cue by ``ms`` milliseconds, in place."""
+        self.start_ms = array("q", (t + ms for t in self.start_ms))
+        self.end_ms = array("q", (t + ms for t in self.end_ms))
+
+    def __repr__(self) -> str:
+        return f"<Cues {len(self)} cues, {len(self._text)} text bytes>"
+
+
+def parse_timestamp(text: str) -> int:
+    """``HH:MM:SS,mmm`` / ``HH:MM:SS.mmm`` / ``MM:SS.mmm`` -> milliseconds."""
+    if len(text) == 12 and text[2] == ":" and text[5] == ":":
+        # Fast path for the fixed-width form every SRT/VTT writer emits
+        return (int(text[0:2]) * 3600000 + int(text[3:5]) * 60000
+                + int(text[6:8]) * 1000 + int(text[9:12]))
+    match = TIMESTAMP.fullmatch(text.strip())
+    if match is None:
+        raise ValueError(f"Invalid timestamp: {text!r}")
+    hours, minutes, seconds, millis = match.groups()
+    return ((int(hours or 0) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int(millis.ljust(3, "0"))
+
+
+def format_timestamp(ms: int, separator: str = ",") -> str:
+    return "%02d:%02d:%02d%s%03d" % (ms // 3600000, ms // 60000 % 60, ms // 1000 % 60, separator, ms % 1000)
+
+
+READ_SIZE = 1 << 20
+
+
+_TIMING_PUNCTUATION = str.maketrans("", "", ":,. ->")
+
+
+def _parse_timing(line: str):
+    if len(line) == 29 and line[12:17] == " --> ":
+        # Fixed-width "HH:MM:SS,mmm --> HH:MM:SS,mmm": one int() for both times
+        start, end = divmod(int(line.translate(_TIMING_PUNCTUATION)), 1000000000)
+        return (start // 10000000 * 3600000 + start // 100000 % 100 * 60000 + start % 100000,
+                end // 10000000 * 3600000 + end // 100000 % 100 * 60000 + end % 100000)
+    start, _, rest = line.partition("-->")
+    rest = rest.strip()
+    end = rest.split(None, 1)[0] if rest else ""  # VTT cue settings follow the end time
+    return parse_timestamp(start.strip()), parse_timestamp(end)
+
+
+def _iter_blocks(f: IO[str], read_size: int = READ_SIZE) -> Iterator[str]:
+    """Blank-line separated blocks, read ``read_size`` characters at a time."""
+    pending = ""
+    while True:
+        data = f.read(read_size)
+        if not data:
+            break
+        blocks = (pending + data).replace("\r\n", "\n").split("\n\n")
+        pending = blocks.pop()
+        yield from blocks
+    yield pending
+
+
+def iter_cues(f: IO[str]) -> Iterator[Cue]:
+    """
+    Parse SRT or WebVTT cues from a text file object, in bounded memory.
+
+    Blocks are separated by blank lines; a block is a cue if one of its first
+    two lines holds the ``-->`` timing (SRT counters and VTT identifiers come
+    before it). VTT header, NOTE, STYLE and REGION blocks have no timing line
+    and are skipped.
+    """
+    new_cue = tuple.__new__  # skips the NamedTuple constructor's Python-level __new__
+    for block in _iter_blocks(f):
+        lines = block.strip("\n").split("\n")
+        if "-->" in lines[0]:
+            yield new_cue(Cue, (*_parse_timing(lines[0]), "\n".join(lines[1:])))
+        elif len(lines) > 1 and "-->" in lines[1]:
+            yield new_cue(Cue, (*_parse_timing(lines[1]), "\n".join(lines[2:])))
+
+
+_WHITESPACE = re.compile(r"\s*")
+_decode_json = json.JSONDecoder().raw_decode
+
+
+def _iter_json_array(f: IO[str], read_size: int = READ_SIZE) -> Iterator:
+    """Elements of a top-level JSON array, decoded one at a time as chunks are read."""
+    buffer, position, expect = "", 0, "["
+    while True:
+        position = _WHITESPACE.match(buffer, position).end()
+        if position < len(buffer):
+            char = buffer[position]
+            if expect == "[":
+                if char != "[":
+                    raise ValueError("JSON subtitles must be an array of cues")
+                position, expect = position + 1, "first"
+                continue
+            if char == "]" and expect in ("first", ","):
+                return
+            if expect == ",":
+                if char != ",":
+                    raise ValueError(f"Expected ',' or ']' in JSON subtitles, got {char!r}")
+                position, expect = position + 1, "item"
+                continue
+            try:
+                item, position = _decode_json(buffer, position)
+            except json.JSONDecodeError:
+                pass  # the element continues in the next chunk
+            else:
+                expect = ","
+                yield item
+                continue
+        data = f.read(read_size)
+        if not data:
+            if position < len(buffer):
+                _decode_json(buffer, position)  # raises the decode error
+            raise ValueError("Truncated JSON subtitles")
+        buffer, position = buffer[position:] + data, 0
+
+
+def iter_json(f: IO[str]) -> Iterator[Cue]:
+    """Parse the JSON cue array written by ``write_json``, one cue at a time."""
+    new_cue = tuple.__new__
+    for item in _iter_json_array(f):
+        yield new_cue(Cue, (int(item["start_ms"]), int(item["end_ms"]), item["text"]))
+
+
+def write_srt(cues: Iterable[Cue], f: IO[str]):
+    write = f.write
+    for number, (start_ms, end_ms, text) in enumerate(cues, start=1):
+        write(f"{number}\n{format_timestamp(start_ms)} --> {format_timestamp(end_ms)}\n{text}\n\n")
+
+
+def write_vtt(cues: Iterable[Cue], f: IO[str]):
+    write = f.write
+    write("WEBVTT\n\n")
+    for start_ms, end_ms, text in cues:
+        write(f"{format_timestamp(start_ms, '.')} --> {format_timestamp(end_ms, '.')}\n{text}\n\n")
+
+
+def write_json(cues: Iterable[Cue], f: IO[str]):
+    write = f.write
+    write("[")
+    for i, (start_ms, end_ms, text) in enumerate(cues):
+        write(("," if i else "") + json.dumps({"start_ms": start_ms, "end_ms": end_ms, "text": text},
+                                               ensure_ascii=False))
+    write("]\n")
+
+
+WRITERS = {"srt": write_srt, "vtt": write_vtt, "json": write_json}
+
+
+def subtitle_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Unknown subtitle format: {path}")
+    return FORMATS[extension]
+
+
+def iter_file(path: str) -> Iterator[Cue]:
+    """Stream the cues of a .srt, .vtt or .json file."""
+    with open(path, encoding="utf-8-sig") as f:
+        if subtitle_format(path) == "json":
+            yield from iter_json(f)
+        else:
+            yield from iter_cues(f)
+
+
+def load(path: str) -> Cues:
+    return Cues(iter_file(path))
+
+
+def save(cues: Iterable[Cue], path: str, fmt: str = None):
+    """Write ``cues`` to ``path`` in ``fmt`` (default: from the extension)."""
+    with open(path, "w", encoding="utf-8") as f:
+        WRITERS[fmt or subtitle_format(path)](cues, f)
+
+
+def convert(source: str, target: str):
+    """Convert between .srt, .vtt and .json in one streaming pass."""
+    save(iter_file(source), target)
+
+
+def derive(path: str, formats: Iterable[str] = ("vtt", "json")) -> dict:
+    """
+    Write other formats next to ``path``.
+
+    Returns:
+        Format -> path, e.g. {"vtt": "transcript.vtt"}
+    """
+    stem = os.path.splitext(path)[0]
+    source_format = subtitle_format(path)
+    derived = {}
+    for fmt in formats:
+        if fmt == source_format:
+            continue
+        derived[fmt] = f"{stem}.{fmt}"
+        convert(path, derived[fmt])
+    return derived
+
@@ -0,0 +1,312 @@
+"""
+Local translation memory and delta re-translation of edited transcripts.
+
+Every translated cue is stored under (normalized cue text, context, language),
+where the context is the normalized text of the ``context`` cues on either
+side. The memory is filled from translation results already downloaded
+(``learn``). After a transcript is edited, ``translate_delta`` submits only
+the cues that have no entry in the memory for a target language. It then rebuilds the
+full translated SRTs from the memory, so a one-word fix re-translates a few
+cues instead of the whole file into every language.
+
+Including the neighbours in the key means a cue is re-translated when the
+text around it changes, since its translation may depend on it. Use
+``context=0`` to key on the cue text alone.
+
+Example:
+    memory = TranslationMemory()
+    memory.learn("talk.srt", {"es": "downloads/<job>/es.srt", "fr": "downloads/<job>/fr.srt"})
+    # ... edit talk.srt ...
+    result = await translate_delta(client, "talk.srt", ["es", "fr"], "translations", memory=memory)
+
+Usage:
+    python -m lingopal_ws_client.translation_memory learn talk.srt downloads/<translation_job_id>
+    python -m lingopal_ws_client.translation_memory translate talk.srt --languages es,fr --output-dir translations
+"""
+
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from lingopal_ws_client import subtitles
+from lingopal_ws_client.jobs import AsyncTranscribeTranslateClient
+from lingopal_ws_client.subtitles import Cue, Cues
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_PATH = os.path.join("~", ".cache", "lingopal", "translation_memory.sqlite")
+DEFAULT_CONTEXT = 1
+# Result files of a translation job that are not translations
+NON_TRANSLATION_TYPES = frozenset({"original", "transcript", "diarization"})
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    source_hash TEXT NOT NULL,
+    context_hash TEXT NOT NULL,
+    language TEXT NOT NULL,
+    source TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (source_hash, context_hash, language)
+);
+"""
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """NFC, whitespace collapsed to single spaces; case and punctuation are kept."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def segment_keys(texts: List[str], context: int = DEFAULT_CONTEXT) -> List[Tuple[str, str]]:
+    """(source hash, context hash) of every cue in ``texts`` (normalized cue texts, in order)."""
+    keys = []
+    for i, text in enumerate(texts):
+        window = texts[max(0, i - context):i] + ["\x1e"] + texts[i + 1:i + 1 + context]
+        keys.append((_digest(text), _digest("\x1f".join(window)) if context else ""))
+    return keys
+
+
+def align(source: Cues, translated: Cues) -> Iterator[Tuple[int, str]]:
+    """
+    (source index, translated text) pairs of two cue lists of the same transcript.
+
+    Translations keep the source timings, so cues are matched by position when
+    the counts agree and by start time otherwise; unmatched cues are skipped.
+    """
+    if len(source) == len(translated):
+        yield from ((i, cue.text) for i, cue in enumerate(translated))
+        return
+    by_start = {}
+    for i, start_ms in enumerate(source.start_ms):
+        by_start.setdefault(start_ms, i)
+    for cue in translated:
+        if cue.start_ms in by_start:
+            yield by_start[cue.start_ms], cue.text
+
+
+class TranslationMemory:
+    def __init__(self, path: str = DEFAULT_MEMORY_PATH, context: int = DEFAULT_CONTEXT):
+        """
+        Args:
+            path: SQLite database file
+            context: Neighbouring cues on each side that are part of a cue's key
+        """
+        self.path = os.path.expanduser(path)
+        self.context = context
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.executescript(SCHEMA)
+
+    def keys(self, cues: Cues) -> List[Tuple[str, str]]:
+        return segment_keys([normalize_text(cue.text) for cue in cues], self.context)
+
+    def lookup(self, cues: Cues, language: str) -> List[Optional[str]]:
+        """Remembered translation of every cue into ``language``, None where there is none."""
+        found = {}
+        keys = self.keys(cues)
+        # One query per batch of source hashes rather than one per cue
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            for source_hash, context_hash, translation in self._db.execute(
+                    f"SELECT source_hash, context_hash, translation FROM segments "
+                    f"WHERE language = ? AND source_hash IN ({placeholders})",
+                    (language, *{source_hash for source_hash, _ in batch})):
+                found[source_hash, context_hash] = translation
+        translations = [found.get(key) for key in keys]
+        hits = sum(t is not None for t in translations)
+        self.hits += hits
+        self.misses += len(translations) - hits
+        if hits:
+            with self._db:
+                self._db.executemany(
+                    "UPDATE segments SET last_used = ? WHERE source_hash = ? AND context_hash = ? AND language = ?",
+                    [(time.time(), *key, language) for key, t in zip(keys, translations) if t is not None])
+        return translations
+
+    def store(self, cues: Cues, language: str, translations: Iterable[Tuple[int, str]]) -> int:
+        """
+        Remember ``(cue index, translated text)`` pairs for cues of ``cues``.
+
+        Returns:
+            Number of entries written
+        """
+        keys = self.keys(cues)
+        now = time.time()
+        rows = [(*keys[i], language, normalize_text(cues.text(i)), text, now, now) for i, text in translations]
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO segments (source_hash, context_hash, language, source, translation, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (source_hash, context_hash, language) "
+                "DO UPDATE SET translation = excluded.translation, last_used = excluded.last_used", rows)
+        return len(rows)
+
+    def learn(self, source_path: str, translation_files: Dict[str, str]) -> int:
+        """
+        Fill the memory from a source SRT and its downloaded translations.
+
+        Args:
+            source_path: The SRT that was translated
+            translation_files: Language -> translated SRT, e.g. the result of
+                ``download_job_results`` for the translation job (entries that
+                are not translations, like ``original``, are ignored)
+
+        Returns:
+            Number of entries written
+        """
+        source = subtitles.load(source_path)
+        written = 0
+        for language, path in translation_files.items():
+            if language in NON_TRANSLATION_TYPES or subtitles.subtitle_format(path) == "json":
+                continue
+            written += self.store(source, language, align(source, subtitles.load(path)))
+        logger.info("Learned %d translated cues from %s", written, source_path)
+        return written
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+
+    def prune(self, max_age: float) -> int:
+        """Forget entries not used in the last ``max_age`` seconds."""
+        with self._db:
+            cursor = self._db.execute("DELETE FROM segments WHERE last_used < ?", (time.time() - max_age,))
+        return cursor.rowcount
+
+    def close(self):
+        self._db.close()
+
+
+@dataclass
+class DeltaResult:
+    files: Dict[str, str] = field(default_factory=dict)  # language -> full translated SRT
+    job_ids: List[str] = field(default_factory=list)  # empty when every cue came from the memory
+    reused: int = 0  # cue translations taken from the memory, over all languages
+    submitted: int = 0  # cue translations requested, over all languages
+
+
+async def _translate_cues(client: AsyncTranscribeTranslateClient, memory: TranslationMemory, cues: Cues,
+                          missing: List[int], languages: List[str], timeout_minutes: int) -> str:
+    """Translate the cues at ``missing`` into ``languages`` as one job and remember the results."""
+    delta = Cues(cues[i] for i in missing)
+    with tempfile.TemporaryDirectory(prefix="lingopal-delta-") as work_dir:
+        delta_path = os.path.join(work_dir, "delta.srt")
+        subtitles.save(delta, delta_path, "srt")
+        logger.info("Translating %d of %d cues into %s", len(missing), len(cues), ",".join(languages))
+        job_id = await client.start_translation(srt_file_path=delta_path, target_languages=languages)
+        if not await client.wait_for_job_completion(job_id, "translation", timeout_minutes):
+            raise RuntimeError(f"Delta translation job {job_id} did not complete")
+        files = await client.download_job_results(job_id, work_dir, file_types=languages)
+        for language in languages:
+            if language not in files:
+                raise RuntimeError(f"Delta translation job {job_id} returned no {language} file")
+            translated = align(delta, subtitles.load(files[language]))
+            # Stored under the cues' keys in the full transcript, not in the delta file
+            memory.store(cues, language, ((missing[i], text) for i, text in translated))
+    return job_id
+
+
+async def translate_delta(client: AsyncTranscribeTranslateClient, srt_path: str, target_languages: List[str],
+                          output_dir: str, *, memory: TranslationMemory,
+                          timeout_minutes: int = 30) -> DeltaResult:
+    """
+    Translate ``srt_path`` into ``target_languages``, submitting only cues the memory lacks.
+
+    Missing cues go out as small SRTs with their original timings, one job per
+    set of languages missing the same cues (usually a single job), and their
+    translations are added to the memory. Every language is then written in
+    full to ``<output_dir>/<language>.srt``.
+
+    Raises:
+        RuntimeError: A translation job failed or returned no file for a language
+    """
+    cues = subtitles.load(srt_path)
+    known = {language: memory.lookup(cues, language) for language in target_languages}
+    groups: Dict[Tuple[int, ...], List[str]] = {}
+    for language, translations in known.items():
+        missing = tuple(i for i, t in enumerate(translations) if t is None)
+        if missing:
+            groups.setdefault(missing, []).append(language)
+    result = DeltaResult(reused=sum(t is not None for translations in known.values() for t in translations),
+                         submitted=sum(len(missing) * len(languages) for missing, languages in groups.items()))
+    os.makedirs(output_dir, exist_ok=True)
+
+    if groups:
+        result.job_ids = list(await asyncio.gather(*(
+            _translate_cues(client, memory, cues, list(missing), languages, timeout_minutes)
+            for missing, languages in groups.items())))
+        for languages in groups.values():
+            for language in languages:
+                known[language] = memory.lookup(cues, language)
+
+    for language, translations in known.items():
+        untranslated = translations.count(None)
+        if untranslated:
+            logger.warning("%d cues have no %s translation and keep their source text", untranslated, language)
+        path = os.path.join(output_dir, f"{language}.srt")
+        subtitles.save((Cue(cue.start_ms, cue.end_ms, text if text is not None else cue.text)
+                        for cue, text in zip(cues, translations)), path, "srt")
+        result.files[language] = path
+    return result
+
+
+async def _main(args):
+    memory = TranslationMemory(args.memory, context=args.context)
+    try:
+        if args.command == "learn":
+            files = {os.path.splitext(name)[0]: os.path.join(args.translations, name)
+                     for name in sorted(os.listdir(args.translations)) if name.endswith(".srt")}
+            written = memory.learn(args.source, files)
+            print(f"Learned {written} translated cues ({len(memory)} in memory)")
+            return
+        async with AsyncTranscribeTranslateClient(args.api_base_url, args.api_key) as client:
+            result = await translate_delta(client, args.source, args.languages.split(","), args.output_dir,
+                                           memory=memory, timeout_minutes=args.timeout)
+        print(f"Submitted {result.submitted} cue translations in {len(result.job_ids)} jobs, "
+              f"reused {result.reused} from memory")
+        for language, path in result.files.items():
+            print(f"  {language}: {path}")
+    finally:
+        memory.close()
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    parser = argparse.ArgumentParser(prog=prog, description="Translation memory and delta re-translation of SRT files")
+    parser.add_argument("--memory", default=DEFAULT_MEMORY_PATH, help="Translation memory database")
+    parser.add_argument("--context", type=int, default=DEFAULT_CONTEXT,
+                        help="Neighbouring cues on each side included in a cue's key")
+    commands = parser.add_subparsers(dest="command", required=True)
+    learn = commands.add_parser("learn", help="Fill the memory from downloaded translation results")
+    learn.add_argument("source", help="The SRT that was translated")
+    learn.add_argument("translations", help="Directory of <language>.srt files (a translation job's downloads)")
+    translate = commands.add_parser("translate", help="Translate an SRT, submitting only cues not in the memory")
+    translate.add_argument("source", help="SRT to translate")
+    translate.add_argument("--languages", default="es,fr,de", help="Comma-separated target languages")
+    translate.add_argument("--output-dir", default="translations")
+    translate.add_argument("--timeout", type=int, default=int(os.getenv("JOB_TIMEOUT", "30")),
+                           help="Job timeout in minutes")
+    translate.add_argument("--api-base-url", default=os.getenv("API_BASE_URL", "http://34.212.19.243:8000"))
+    translate.add_argument("--api-key", default=os.getenv("API_KEY"))
+    asyncio.run(_main(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+"""
+Rate limiting, retries and circuit breaking shared by the REST clients.
+
+``TransportPolicy`` holds the state one API endpoint needs to be called
+politely from many tasks or threads:
+
+- a token bucket (``rate`` requests/second, ``burst`` at once) that spaces
+  requests out client-side, so a burst from a batch job queues locally
+  instead of being rejected with 429s;
+- ``Retry-After`` handling and rate adaptation (AIMD): a 429 pauses the
+  bucket for every caller, not only the rejected request, and lowers its
+  rate; successes raise it again. Callers then share the server's limit
+  instead of retrying into it, and queued requests leave the pause one slot
+  apart rather than as a new burst. The first 429 creates a bucket if none
+  was configured;
+- exponential backoff with jitter for failed calls. Requests that may have
+  reached the server are retried only if idempotent: GET, HEAD, PUT, DELETE,
+  OPTIONS, or any request with an ``Idempotency-Key`` header (which is only
+  safe when the server deduplicates by that key). Connection failures and
+  429s are retried for every method, since the server did not act on them;
+- a circuit breaker. After ``failure_threshold`` consecutive connection errors
+  or 5xx responses, calls fail fast with ``CircuitOpenError`` for
+  ``reset_timeout`` seconds, then a single probe decides whether to close it.
+
+``ResilientTransport`` applies a policy to an ``httpx.AsyncClient``;
+``AsyncTranscribeTranslateClient`` and ``StreamsClient`` use one by default.
+The ``requests``-based example client goes through ``TransportPolicy.send``.
+
+Example:
+    policy = TransportPolicy(rate=20, burst=40)
+    http = httpx.AsyncClient(transport=ResilientTransport(policy, hosts={"api.example.com"}))
+"""
+
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Collection, Optional, Tuple, Type
+
+import httpx
+
+try:
+    from httpx._multipart import MultipartStream
+except ImportError:
+    MultipartStream = None
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"})
+# Retried for idempotent requests only: the server may have acted on them
+RETRYABLE_STATUS_CODES = frozenset({408, 500, 502, 503, 504})
+# Counted as failures by the circuit breaker (429 means busy, not unhealthy)
+UNHEALTHY_STATUS_CODES = frozenset({500, 502, 503, 504})
+# Adaptive rate: multiplied on a 429, increased per successful response
+DECREASE_FACTOR = 0.7
+INCREASE_STEP = 0.1
+# Request bodies httpx can send again; streamed bodies (async generators) cannot
+REPLAYABLE_STREAMS = (httpx.ByteStream,) + ((MultipartStream,) if MultipartStream is not None else ())
+
+
+class CircuitOpenError(httpx.TransportError):
+    """The API failed repeatedly; calls are refused until the breaker's reset timeout."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        Args:
+            rate: Sustained requests per second
+            burst: Requests allowed back to back (default: ``rate``, at least 1)
+        """
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take a token; returns the seconds to wait before using it.
+
+        Tokens may go negative: each caller reserves the next free slot, so
+        waiters are served in order without polling.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def pause(self, seconds: float):
+        """
+        Hold new requests for ``seconds``, then resume at ``rate``.
+
+        The pause is taken as token debt, so requests that arrive during it
+        come out one slot apart instead of all at once.
+        """
+        with self._lock:
+            # Several 429s from one burst pause once, not once each
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.rate = rate
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a probe is allowed
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        """Raise ``CircuitOpenError`` unless a request may be sent now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError(f"Circuit open after {self.failures} consecutive failures; "
+                               f"next attempt allowed in {retry_in:.1f}s")
+
+    def release_probe(self):
+        """Let another request probe when the current one ended without a result (e.g. was cancelled)."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("Circuit closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning("Circuit opened after %d consecutive failures", self.failures)
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class TransportPolicy:
+    def __init__(self, rate: Optional[float] = None, burst: Optional[int] = None, *,
+                 retries: int = 4, backoff: float = 0.5, max_backoff: float = 30.0,
+                 max_retry_after: float = 120.0, adaptive: bool = True,
+                 breaker: Optional[CircuitBreaker] = None):
+        """
+        Args:
+            rate: Client-side limit in requests/second (None: unlimited)
+            burst: Token bucket size (default: ``rate``)
+            retries: Retries per request after the first attempt
+            backoff: Seconds before the first retry, doubling each time (jittered)
+            max_backoff: Cap on the backoff delay
+            max_retry_after: Longest ``Retry-After`` honoured; longer ones fail the request
+            adaptive: Find the server's limit from 429s: cut the rate by 30% on a 429
+                and raise it by about 10% per second while requests succeed, never
+                above ``rate``. Without ``rate`` the first 429 starts the limiter
+                at the success rate of the last second.
+            breaker: Circuit breaker (default: 5 failures, 30 s reset)
+        """
+        self.limiter = TokenBucket(rate, burst) if rate else None
+        self.max_rate = rate
+        self.adaptive = adaptive
+        self._successes = deque(maxlen=4096)  # times of recent successful responses
+        self._last_decrease = 0.0
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        # Counters for reporting
+        self.requests = 0
+        self.retried = 0
+        self.throttled = 0
+
+    def acquire(self) -> float:
+        """Check the breaker and take a rate-limit token; returns the seconds to wait."""
+        self.breaker.before_request()
+        self.requests += 1
+        return self.limiter.reserve() if self.limiter is not None else 0.0
+
+    def _throttled(self, retry_after: Optional[float]):
+        """Slow down after a 429: lower the rate and pause the limiter for ``retry_after``."""
+        self.throttled += 1
+        if not self.adaptive:
+            return
+        now = time.monotonic()
+        if self.limiter is None:
+            recent = sum(1 for t in self._successes if now - t <= 1.0)
+            self.limiter = TokenBucket(max(1.0, recent), burst=1)
+            self._last_decrease = now
+            logger.info("Throttled by the API, limiting to %.1f requests/s", self.limiter.rate)
+        elif now - self._last_decrease >= 1.0 / self.limiter.rate + 0.5:
+            # Once per burst of 429s, not once per rejected request
+            self.limiter.set_rate(max(1.0, self.limiter.rate * DECREASE_FACTOR))
+            self._last_decrease = now
+            logger.info("Throttled by the API, limiting to %.1f requests/s", self.limiter.rate)
+        if retry_after:
+            self.limiter.pause(retry_after)
+
+    def _succeeded(self):
+        self._successes.append(time.monotonic())
+        limiter = self.limiter
+        if self.adaptive and limiter is not None:
+            # +INCREASE_STEP per success is about +10% per second at any rate
+            rate = limiter.rate + INCREASE_STEP
+            if self.max_rate is None or rate <= self.max_rate:
+                limiter.rate = rate
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def on_response(self, attempt: int, status_code: int, headers, idempotent: bool) -> Optional[float]:
+        """
+        Record a response; returns the delay before retrying it, or None to return it.
+        """
+        if status_code in UNHEALTHY_STATUS_CODES:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        if status_code < 400:
+            self._succeeded()
+            return None
+        if status_code != 429 and not (status_code in RETRYABLE_STATUS_CODES and idempotent):
+            return None
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        too_long = retry_after is not None and retry_after > self.max_retry_after
+        if status_code == 429:
+            # A wait beyond max_retry_after fails this request instead of pausing every caller
+            self._throttled(None if too_long else retry_after)
+            if too_long:
+                return None
+            if self.limiter is not None and self.adaptive:
+                # The limiter now holds everyone back, this request included
+                return 0.0 if attempt <= self.retries else None
+        if attempt > self.retries or too_long:
+            return None
+        return retry_after if retry_after is not None else self._backoff(attempt)
+
+    def on_error(self, attempt: int, connect_failed: bool, idempotent: bool) -> Optional[float]:
+        """Record a transport error; returns the delay before retrying, or None to raise it."""
+        self.breaker.record_failure()
+        if attempt > self.retries or not (connect_failed or idempotent):
+            return None
+        return self._backoff(attempt)
+
+    def send(self, send: Callable[[], object], method: str, *, idempotent: Optional[bool] = None,
+             replayable: bool = True, errors: Tuple[Type[BaseException], ...] = (),
+             connect_errors: Tuple[Type[BaseException], ...] = ()):
+        """
+        Blocking retry loop around ``send()`` for HTTP libraries other than httpx.
+
+        Args:
+            send: Sends the request and returns a response with ``status_code`` and ``headers``
+            method: HTTP method
+            idempotent: Safe to repeat (default: by method)
+            replayable: The body can be sent again; if not, only the breaker and limiter apply
+            errors: Exceptions of ``send`` that are transport failures
+            connect_errors: Subset of ``errors`` raised before the request reached the server
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            attempt += 1
+            wait = self.acquire()
+            try:
+                time.sleep(wait)
+                response = send()
+            except errors as e:
+                delay = self.on_error(attempt, isinstance(e, connect_errors), idempotent)
+                if delay is None or not replayable:
+                    raise
+                self.retried += 1
+                logger.warning("%s failed (%r), retrying in %.1fs", method, e, delay)
+                time.sleep(delay)
+                continue
+            except BaseException:
+                self.breaker.release_probe()
+                raise
+            delay = self.on_response(attempt, response.status_code, response.headers, idempotent)
+            if delay is None or not replayable:
+                return response
+            self.retried += 1
+            logger.warning("%s got HTTP %d, retrying in %.1fs", method, response.status_code, delay)
+            time.sleep(delay)
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    def __init__(self, policy: Optional[TransportPolicy] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 hosts: Optional[Collection[str]] = None, **transport_kwargs):
+        """
+        Args:
+            policy: Shared policy (default: a new ``TransportPolicy()``)
+            transport: Transport that sends the requests (default: ``httpx.AsyncHTTPTransport(**transport_kwargs)``)
+            hosts: Apply the policy only to these hosts, e.g. the API host but not
+                presigned S3 download URLs (default: every request)
+        """
+        self.policy = policy if policy is not None else TransportPolicy()
+        self.transport = transport if transport is not None else httpx.AsyncHTTPTransport(**transport_kwargs)
+        self.hosts = frozenset(hosts) if hosts is not None else None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.hosts is not None and request.url.host not in self.hosts:
+            return await self.transport.handle_async_request(request)
+        policy = self.policy
+        idempotent = request.method in IDEMPOTENT_METHODS or "idempotency-key" in request.headers
+        # Health probes set this extension to False: one attempt, no retries
+        replayable = isinstance(request.stream, REPLAYABLE_STREAMS) and request.extensions.get("lingopal.retry", True)
+        attempt = 0
+        while True:
+            attempt += 1
+            wait = policy.acquire()
+            try:
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                response = await self.transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                connect_failed = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+                delay = policy.on_error(attempt, connect_failed, idempotent)
+                if delay is None or not replayable:
+                    raise
+                policy.retried += 1
+                logger.warning("%s %s failed (%r), retrying in %.1fs", request.method, request.url.path, e, delay)
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled, or failed outside httpx: neither success nor failure
+                policy.breaker.release_probe()
+                raise
+            delay = policy.on_response(attempt, response.status_code, response.headers, idempotent)
+            if delay is None or not replayable:
+                response.extensions["attempts"] = attempt
+                return response
+            await response.aclose()
+            policy.retried += 1
+            logger.warning("%s %s got HTTP %d, retrying in %.1fs", request.method, request.url.path,
+                           response.status_code, delay)
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self.transport.aclose()
@@ -0,0 +1,171 @@
+"""
+Resumable, chunked uploads of large audio files.
+
+A file is sent through an upload session in fixed-size chunks::
+
+    POST /api/v1/uploads        {"filename", "size"}        -> {"upload_id", "offset"}
+    PUT  /api/v1/uploads/<id>   Upload-Offset: <n> + chunk  -> {"offset"}
+    GET  /api/v1/uploads/<id>                               -> {"offset", ...}
+
+and the finished upload is referenced by ``upload_id`` when the job starts.
+A failed chunk is retried from the offset the server reports, so an
+interruption costs at most one chunk instead of the whole file. Each chunk is
+streamed from disk in small blocks, so memory use does not depend on file or
+chunk size.
+
+benchmarks/mock_api.py implements these endpoints for local testing.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 8 << 20
+READ_BLOCK_SIZE = 1 << 16
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+class UploadError(Exception):
+    pass
+
+
+@dataclass
+class UploadStats:
+    bytes_sent: int = 0
+    chunks: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second."""
+        return self.bytes_sent / self.seconds if self.seconds else 0.0
+
+    def add(self, other: "UploadStats"):
+        self.bytes_sent += other.bytes_sent
+        self.chunks += other.chunks
+        self.retries += other.retries
+        self.seconds += other.seconds
+
+    def as_dict(self) -> dict:
+        return {"bytes_sent": self.bytes_sent, "chunks": self.chunks, "retries": self.retries,
+                "seconds": round(self.seconds, 3), "mb_per_sec": round(self.throughput / 1e6, 2)}
+
+
+async def _read_chunk(path: str, offset: int, length: int):
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while length:
+            block = f.read(min(READ_BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+class ChunkedUploader:
+    def __init__(self, http: httpx.AsyncClient, api_base_url: str, headers: Optional[Dict[str, str]] = None, *,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, retries: int = 5, backoff: float = 0.5):
+        """
+        Args:
+            http: Client to upload with
+            api_base_url: Base URL of the API
+            headers: Headers for every request (API key)
+            chunk_size: Bytes per PUT
+            retries: Consecutive failed attempts allowed per chunk
+            backoff: Seconds before the first retry, doubling each time
+        """
+        self.http = http
+        self.api_base_url = api_base_url.rstrip("/")
+        self.headers = headers or {}
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.backoff = backoff
+        # Totals over every upload made by this uploader
+        self.totals = UploadStats()
+
+    async def _request(self, method: str, path: str, **kwargs) -> dict:
+        response = await self.http.request(method, f"{self.api_base_url}{path}",
+                                           headers={**kwargs.pop("headers", {}), **self.headers}, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    async def create(self, path: str) -> str:
+        """Open an upload session for ``path``; returns the upload ID."""
+        session = await self._request("POST", "/api/v1/uploads",
+                                      json={"filename": os.path.basename(path), "size": os.path.getsize(path)})
+        return session["upload_id"]
+
+    async def offset(self, upload_id: str) -> int:
+        """Bytes of ``upload_id`` the server has received."""
+        return (await self._request("GET", f"/api/v1/uploads/{upload_id}"))["offset"]
+
+    async def upload(self, path: str, upload_id: Optional[str] = None,
+                     on_progress: Optional[Callable[[int, int], None]] = None) -> tuple:
+        """
+        Upload ``path`` chunk by chunk.
+
+        Args:
+            path: Local file
+            upload_id: Continue an earlier session instead of starting a new one
+            on_progress: Called as ``on_progress(bytes_uploaded, total_bytes)`` after each chunk
+
+        Returns:
+            (upload_id, UploadStats)
+
+        Raises:
+            UploadError: A chunk still failed after ``retries`` attempts
+        """
+        size = os.path.getsize(path)
+        stats = UploadStats()
+        started = time.monotonic()
+        if upload_id is None:
+            upload_id = await self.create(path)
+            offset = 0
+        else:
+            offset = await self.offset(upload_id)
+        failures = 0
+        try:
+            while offset < size:
+                length = min(self.chunk_size, size - offset)
+                try:
+                    result = await self._request(
+                        "PUT", f"/api/v1/uploads/{upload_id}",
+                        headers={"Upload-Offset": str(offset), "Content-Length": str(length),
+                                 "Content-Type": "application/offset+octet-stream"},
+                        content=_read_chunk(path, offset, length))
+                except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                    if isinstance(e, httpx.HTTPStatusError) and e.response.status_code not in RETRYABLE_STATUS_CODES:
+                        raise UploadError(f"Uploading {path} failed at byte {offset}: "
+                                          f"HTTP {e.response.status_code}") from e
+                    failures += 1
+                    stats.retries += 1
+                    if failures > self.retries:
+                        raise UploadError(f"Uploading {path} failed at byte {offset}: {e!r}") from e
+                    await asyncio.sleep(self.backoff * 2 ** (failures - 1))
+                    # The server may have kept part of the chunk: continue from what it has
+                    try:
+                        offset = await self.offset(upload_id)
+                    except httpx.HTTPError:
+                        pass
+                    logger.warning("Chunk upload of %s failed (%r), resuming at byte %d", path, e, offset)
+                    continue
+                stats.bytes_sent += result["offset"] - offset
+                stats.chunks += 1
+                offset = result["offset"]
+                failures = 0
+                if on_progress is not None:
+                    on_progress(offset, size)
+        finally:
+            stats.seconds = time.monotonic() - started
+            self.totals.add(stats)
+        logger.info("Uploaded %s (%d bytes, %d chunks, %d retries, %.1f MB/s)",
+                    path, size, stats.chunks, stats.retries, stats.throughput / 1e6)
+        return upload_id, stats
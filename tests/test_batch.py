@@ -0,0 +1,73 @@
+"""Journalled batches against the mock job API in benchmarks/mock_api.py."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from mock_api import MockAPIServer  # noqa: E402
+
+from lingopal_ws_client.batch import BatchItem, resume, run_batch  # noqa: E402
+from lingopal_ws_client.jobs import AsyncTranscribeTranslateClient  # noqa: E402
+from lingopal_ws_client.journal import JobJournal  # noqa: E402
+from lingopal_ws_client.poller import PollSchedule  # noqa: E402
+
+FAST_POLLS = PollSchedule(initial_interval=0.05, min_interval=0.05, max_interval=0.1, jitter=0)
+URL = "https://bucket.example.com/talk.mp3?X-Amz-Signature=abc"
+
+
+@pytest.fixture
+def server():
+    with MockAPIServer(port=0, job_seconds=3600, job_jitter=0) as server:
+        yield server
+
+
+def run(server, coroutine_function, *args, **kwargs):
+    async def main():
+        async with AsyncTranscribeTranslateClient(server.base_url, poll_schedule=FAST_POLLS) as client:
+            return await coroutine_function(client, *args, **kwargs)
+
+    return asyncio.run(main())
+
+
+def read_results(path: Path) -> list:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_timed_out_job_stays_in_flight_and_resume_polls_it(server, tmp_path):
+    journal_path, results = tmp_path / "batch.journal", tmp_path / "results.jsonl"
+    with JobJournal(str(journal_path)) as journal:
+        summary = run(server, run_batch, [BatchItem("talk", None, URL)], str(results),
+                      journal=journal, timeout_minutes=0.002)
+    assert summary.timed_out == 1 and summary.failed == 0
+    (record,) = read_results(results)
+    assert record["status"] == "timeout"
+    entry = JobJournal.load(str(journal_path))["talk"]
+    assert entry.status == "timeout" and entry.in_flight
+
+    # The job finishes on the server; --resume re-attaches without resubmitting
+    server.state.jobs[record["job_id"]]["duration"] = 0
+    with JobJournal(str(journal_path)) as journal:
+        summary = run(server, resume, journal, str(results), timeout_minutes=1)
+    assert summary.resumed == 1 and summary.completed == 1 and summary.submitted == 0
+    assert len(server.state.jobs) == 1
+    assert read_results(results)[-1]["status"] == "completed"
+    entry = JobJournal.load(str(journal_path))["talk"]
+    assert entry.done and not entry.in_flight
+
+
+def test_finished_items_are_skipped_on_rerun(server, tmp_path):
+    journal_path, results = tmp_path / "batch.journal", tmp_path / "results.jsonl"
+    server.state.job_seconds = 0
+    items = [BatchItem(f"talk-{i}", None, f"{URL}&n={i}") for i in range(3)]
+    with JobJournal(str(journal_path)) as journal:
+        summary = run(server, run_batch, items, str(results), journal=journal)
+    assert summary.completed == 3
+    with JobJournal(str(journal_path)) as journal:
+        summary = run(server, run_batch, items, str(results), journal=journal)
+    assert summary.skipped == 3 and summary.submitted == 0
+    assert len(server.state.jobs) == 3
@@ -0,0 +1,66 @@
+"""Cached jobs and partial artifact downloads against benchmarks/mock_api.py."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from mock_api import MockAPIServer  # noqa: E402
+
+from lingopal_ws_client.job_cache import JobCache  # noqa: E402
+from lingopal_ws_client.jobs import AsyncTranscribeTranslateClient  # noqa: E402
+from lingopal_ws_client.poller import PollSchedule  # noqa: E402
+
+FAST_POLLS = PollSchedule(initial_interval=0.05, min_interval=0.05, max_interval=0.1, jitter=0)
+URL = "https://bucket.example.com/talk.mp3?X-Amz-Signature=abc"
+
+
+@pytest.fixture
+def server():
+    with MockAPIServer(port=0, job_seconds=0, job_jitter=0, result_bytes=1024) as server:
+        yield server
+
+
+def transcribe(server, cache: JobCache, output_dir: Path, file_types=None) -> tuple:
+    async def main():
+        async with AsyncTranscribeTranslateClient(server.base_url, cache=cache, poll_schedule=FAST_POLLS) as client:
+            job_id = await client.start_transcription(s3_presigned_url=URL)
+            assert await client.wait_for_job_completion(job_id, "transcription")
+            return job_id, await client.download_job_results(job_id, str(output_dir), file_types=file_types)
+
+    return asyncio.run(main())
+
+
+def downloads(server) -> int:
+    return server.state.requests["/files"]
+
+
+def test_cache_hit_downloads_file_types_missing_from_the_cache(server, tmp_path):
+    cache = JobCache(str(tmp_path / "cache"))
+    job_id, files = transcribe(server, cache, tmp_path / "first", ["transcript"])
+    assert set(files) == {"transcript"}
+    fetched = downloads(server)
+
+    # Same input: the cached job is reused, and only vtt is fetched
+    hit_id, files = transcribe(server, cache, tmp_path / "second", ["vtt"])
+    assert hit_id == job_id and len(server.state.jobs) == 1
+    assert set(files) == {"vtt"} and Path(files["vtt"]).exists()
+    assert downloads(server) == fetched + 1
+
+    # Every type: transcript and vtt come from the cache, json is downloaded
+    _, files = transcribe(server, cache, tmp_path / "third")
+    assert set(files) == {"transcript", "vtt", "json"}
+    assert all(Path(path).parent == tmp_path / "third" / job_id for path in files.values())
+    assert downloads(server) == fetched + 2
+
+
+def test_cache_hit_with_every_wanted_type_downloads_nothing(server, tmp_path):
+    cache = JobCache(str(tmp_path / "cache"))
+    transcribe(server, cache, tmp_path / "first")
+    fetched = downloads(server)
+    _, files = transcribe(server, cache, tmp_path / "second", ["transcript", "json"])
+    assert set(files) == {"transcript", "json"}
+    assert downloads(server) == fetched
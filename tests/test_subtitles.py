@@ -0,0 +1,86 @@
+"""SRT / WebVTT / JSON parsing and conversion in lingopal_ws_client.subtitles."""
+
+import io
+
+import pytest
+
+from lingopal_ws_client import subtitles
+from lingopal_ws_client.subtitles import Cue, Cues, iter_cues, iter_json
+
+CUES = [
+    Cue(0, 1500, "Hello"),
+    Cue(1500, 3723004, "Two\nlines"),
+    Cue(3723004, 3725000, 'Ünïcode "quoted" --> arrow'),
+]
+
+
+class TrickleReader(io.StringIO):
+    """Returns at most ``size`` characters per read, however many are asked for."""
+
+    def __init__(self, text: str, size: int):
+        super().__init__(text)
+        self.size = size
+
+    def read(self, n=-1):
+        return super().read(self.size)
+
+
+def written(writer, cues=CUES) -> str:
+    out = io.StringIO()
+    writer(cues, out)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("fmt", ["srt", "vtt", "json"])
+def test_round_trip(fmt):
+    text = written(subtitles.WRITERS[fmt])
+    parse = iter_json if fmt == "json" else iter_cues
+    assert list(parse(io.StringIO(text))) == CUES
+
+
+@pytest.mark.parametrize("fmt", ["srt", "vtt", "json"])
+@pytest.mark.parametrize("size", [1, 3, 17])
+def test_parsing_across_small_reads(fmt, size):
+    text = written(subtitles.WRITERS[fmt])
+    parse = iter_json if fmt == "json" else iter_cues
+    assert list(parse(TrickleReader(text, size))) == CUES
+
+
+def test_vtt_headers_settings_and_crlf():
+    text = ("WEBVTT - demo\r\n\r\nNOTE a comment\r\n\r\nSTYLE\r\n::cue { color: red }\r\n\r\n"
+            "intro\r\n00:01.250 --> 00:02.000 align:start\r\nHi\r\n")
+    assert list(iter_cues(io.StringIO(text))) == [Cue(1250, 2000, "Hi")]
+
+
+def test_timestamps():
+    assert subtitles.parse_timestamp("01:02:03,004") == 3723004
+    assert subtitles.parse_timestamp("2:03.5") == 123500
+    assert subtitles.format_timestamp(3723004, ".") == "01:02:03.004"
+    with pytest.raises(ValueError):
+        subtitles.parse_timestamp("soon")
+
+
+@pytest.mark.parametrize("text", ['{"start_ms": 0}', '[{"start_ms": 0, "end_ms": 1, "text": "a"} {}]',
+                                  '[{"start_ms": 0, "end_ms": 1, "text": "a"},', '[{"start_ms": 0, "end_'])
+def test_invalid_json(text):
+    with pytest.raises(ValueError):
+        list(iter_json(TrickleReader(text, 4)))
+
+
+def test_cues_store_and_shift():
+    cues = Cues(CUES)
+    assert len(cues) == 3 and list(cues) == CUES
+    assert cues[-1] == CUES[-1] and cues.text(1) == "Two\nlines"
+    cues.shift(500)
+    assert list(cues) == [cue.shifted(500) for cue in CUES]
+    with pytest.raises(IndexError):
+        cues[3]
+
+
+def test_derive_writes_other_formats(tmp_path):
+    source = tmp_path / "talk.srt"
+    subtitles.save(CUES, str(source))
+    derived = subtitles.derive(str(source))
+    assert set(derived) == {"vtt", "json"}
+    for path in derived.values():
+        assert list(subtitles.load(path)) == CUES
@@ -0,0 +1,119 @@
+"""Retries, Retry-After handling and circuit breaking in lingopal_ws_client.transport."""
+
+import asyncio
+import email.utils
+import time
+
+import httpx
+import pytest
+
+from lingopal_ws_client.transport import (CircuitBreaker, CircuitOpenError, ResilientTransport,
+                                          TransportPolicy, parse_retry_after)
+
+
+def serve(*responses):
+    """MockTransport answering with ``responses`` in order; records the requests it saw."""
+    seen = []
+    remaining = list(responses)
+
+    def handler(request):
+        seen.append(request)
+        status, headers = remaining.pop(0) if len(remaining) > 1 else remaining[0]
+        return httpx.Response(status, headers=headers)
+
+    return httpx.MockTransport(handler), seen
+
+
+def request(policy, transport, method="GET", headers=None) -> httpx.Response:
+    async def main():
+        async with httpx.AsyncClient(transport=ResilientTransport(policy, transport)) as http:
+            return await http.request(method, "https://api.example.com/jobs", headers=headers, content=b"{}")
+
+    return asyncio.run(main())
+
+
+def test_server_errors_are_retried_for_idempotent_requests():
+    transport, seen = serve((503, {}), (503, {}), (200, {}))
+    response = request(TransportPolicy(backoff=0), transport)
+    assert response.status_code == 200 and len(seen) == 3
+    assert response.extensions["attempts"] == 3
+
+
+def test_server_errors_are_not_retried_for_plain_posts():
+    transport, seen = serve((503, {}), (200, {}))
+    assert request(TransportPolicy(backoff=0), transport, "POST").status_code == 503
+    assert len(seen) == 1
+
+    transport, seen = serve((503, {}), (200, {}))
+    response = request(TransportPolicy(backoff=0), transport, "POST", {"Idempotency-Key": "abc"})
+    assert response.status_code == 200 and len(seen) == 2
+
+
+def test_retry_after_is_honoured():
+    transport, seen = serve((429, {"Retry-After": "0.3"}), (200, {}))
+    start = time.monotonic()
+    response = request(TransportPolicy(backoff=0, adaptive=False), transport, "POST")
+    assert response.status_code == 200 and len(seen) == 2
+    assert time.monotonic() - start >= 0.3
+
+
+def test_retry_after_beyond_the_limit_fails_the_request():
+    policy = TransportPolicy(backoff=0, max_retry_after=5)
+    transport, seen = serve((429, {"Retry-After": "600"}), (200, {}))
+    start = time.monotonic()
+    assert request(policy, transport).status_code == 429
+    assert len(seen) == 1 and time.monotonic() - start < 1
+    # The rejected wait does not pause other callers either
+    assert policy.acquire() == 0.0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after(None) is None and parse_retry_after("soon") is None
+    when = email.utils.formatdate(time.time() + 60, usegmt=True)
+    assert 55 < parse_retry_after(when) <= 60
+
+
+def test_breaker_opens_and_fails_fast():
+    policy = TransportPolicy(retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    transport, seen = serve((500, {}))
+    for _ in range(2):
+        assert request(policy, transport).status_code == 500
+    with pytest.raises(CircuitOpenError):
+        request(policy, transport)
+    assert len(seen) == 2
+
+
+def test_breaker_allows_one_probe_and_closes_on_success():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    time.sleep(0.06)
+    breaker.before_request()  # the probe
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_request()
+
+
+def test_cancelled_probe_lets_another_request_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+
+    async def hang(request):
+        await asyncio.sleep(10)
+
+    async def main():
+        policy = TransportPolicy(breaker=breaker)
+        async with httpx.AsyncClient(transport=ResilientTransport(policy, httpx.MockTransport(hang))) as http:
+            probe = asyncio.create_task(http.get("https://api.example.com/health"))
+            await asyncio.sleep(0.05)
+            probe.cancel()
+            await asyncio.gather(probe, return_exceptions=True)
+
+    asyncio.run(main())
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_request()
@@ -0,0 +1,108 @@
+"""ChunkedUploader against the mock job API in benchmarks/mock_api.py."""
+
+import asyncio
+import random
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from mock_api import MockAPIServer  # noqa: E402
+
+from lingopal_ws_client.jobs import AsyncTranscribeTranslateClient  # noqa: E402
+from lingopal_ws_client.uploads import ChunkedUploader, UploadError  # noqa: E402
+
+CHUNK_SIZE = 64 << 10
+FILE_SIZE = 5 * CHUNK_SIZE + 1234
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture
+def audio(tmp_path) -> Path:
+    path = tmp_path / "talk.wav"
+    path.write_bytes(random.Random(0).randbytes(FILE_SIZE))
+    return path
+
+
+@pytest.fixture
+def server():
+    with MockAPIServer(port=0) as server:
+        yield server
+
+
+def uploaded(server, upload_id: str) -> bytes:
+    return Path(server.state.uploads[upload_id]["path"]).read_bytes()
+
+
+async def upload(server, path, upload_id=None, on_progress=None, **options):
+    async with httpx.AsyncClient() as http:
+        uploader = ChunkedUploader(http, server.base_url, chunk_size=CHUNK_SIZE, backoff=0, **options)
+        return await uploader.upload(str(path), upload_id, on_progress=on_progress)
+
+
+def test_upload_sends_every_chunk(server, audio):
+    upload_id, stats = asyncio.run(upload(server, audio))
+    assert uploaded(server, upload_id) == audio.read_bytes()
+    assert stats.chunks == 6
+    assert stats.bytes_sent == FILE_SIZE
+    assert stats.retries == 0
+
+
+def test_interrupted_upload_resumes_from_server_offset(server, audio):
+    sessions = []
+
+    def interrupt(offset, total):
+        if offset >= 2 * CHUNK_SIZE:
+            raise Interrupted
+
+    async def create_then_interrupt():
+        async with httpx.AsyncClient() as http:
+            uploader = ChunkedUploader(http, server.base_url, chunk_size=CHUNK_SIZE)
+            sessions.append(await uploader.create(str(audio)))
+            await uploader.upload(str(audio), sessions[0], on_progress=interrupt)
+
+    with pytest.raises(Interrupted):
+        asyncio.run(create_then_interrupt())
+    assert server.state.uploads[sessions[0]]["offset"] == 2 * CHUNK_SIZE
+
+    upload_id, stats = asyncio.run(upload(server, audio, upload_id=sessions[0]))
+    assert upload_id == sessions[0]
+    assert stats.bytes_sent == FILE_SIZE - 2 * CHUNK_SIZE
+    assert stats.chunks == 4
+    assert uploaded(server, upload_id) == audio.read_bytes()
+
+
+def test_failed_chunks_are_retried_from_server_offset(server, audio):
+    server.state.chunk_failure_rate = 0.4
+    server.state.random = random.Random(3)
+    upload_id, stats = asyncio.run(upload(server, audio, retries=20))
+    assert server.state.chunk_failures > 0
+    assert stats.retries == server.state.chunk_failures
+    # Bytes a dropped connection kept are not sent again
+    assert stats.bytes_sent <= FILE_SIZE
+    assert uploaded(server, upload_id) == audio.read_bytes()
+
+
+def test_upload_gives_up_after_retries(server, audio):
+    server.state.chunk_failure_rate = 1.0
+    with pytest.raises(UploadError):
+        asyncio.run(upload(server, audio, retries=2))
+
+
+def test_transcription_starts_from_finished_upload(server, audio):
+    async def start():
+        async with AsyncTranscribeTranslateClient(server.base_url, upload_chunk_size=CHUNK_SIZE) as client:
+            job_id = await client.start_transcription(audio_file_path=str(audio))
+            return job_id, client.uploader.totals
+
+    job_id, totals = asyncio.run(start())
+    assert job_id in server.state.jobs
+    assert totals.bytes_sent == FILE_SIZE
+    (upload,) = server.state.uploads.values()
+    assert upload["offset"] == upload["size"] == FILE_SIZE